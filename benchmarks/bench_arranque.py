@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque en frío del dashboard (time-to-first-paint).
+Cada muestra es un proceso nuevo, como tras un reinicio del contenedor o un
+autoscale: importa Streamlit (lo que el servidor ya hizo antes de aceptar la
+primera conexión) y corre el primer rerun de una sesión con AppTest, sin
+navegador. Páginas:
+- login: Supabase configurado (cliente sin red) y sesión sin autenticar
+- dashboard: modo local (sin Supabase), que entra directo al dashboard
+Reporta la mediana del tiempo hasta el primer elemento enviado al navegador,
+hasta la página completa y qué módulos pesados quedaron cargados.
+
+Uso: python benchmarks/bench_arranque.py [--muestras N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+RUTA_APP = BASE_DIR / "dashboard" / "app.py"
+
+# Cliente de Supabase válido pero sin servidor: la página de login no hace llamadas hasta enviar el formulario
+ENTORNOS = {
+    "login": {"SUPABASE_URL": "http://127.0.0.1:9", "SUPABASE_KEY": "clave-de-prueba"},
+    "dashboard": {"SUPABASE_URL": "", "SUPABASE_KEY": ""},
+}
+MODULOS_PESADOS = ("supabase", "pandas", "numpy", "plotly.express")  # plotly.graph_objects lo carga Streamlit
+
+# ============================================================
+# PROCESO HIJO (UN ARRANQUE)
+# ============================================================
+
+def arrancar(ruta_app: str) -> dict:
+    """Primer rerun de una sesión en este proceso; tiempos en ms desde que empieza el script"""
+    from streamlit.testing.v1 import AppTest, app_test
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    marcas = {}
+
+    class RunnerConPrimerElemento(LocalScriptRunner):
+        """LocalScriptRunner que anota el inicio del script y el primer delta (primer elemento visible)"""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            encolar = self.forward_msg_queue.enqueue
+
+            def encolar_con_marca(mensaje):
+                if "primer_elemento" not in marcas and mensaje.WhichOneof("type") == "delta":
+                    marcas["primer_elemento"] = time.perf_counter()
+                encolar(mensaje)
+            self.forward_msg_queue.enqueue = encolar_con_marca
+
+        def _run_script(self, rerun_data):
+            marcas.setdefault("inicio", time.perf_counter())
+            return super()._run_script(rerun_data)
+
+        def _on_script_finished(self, *args, **kwargs):
+            marcas.setdefault("fin", time.perf_counter())
+            return super()._on_script_finished(*args, **kwargs)
+
+    app_test.LocalScriptRunner = RunnerConPrimerElemento
+    app = AppTest.from_file(ruta_app, default_timeout=600)
+    app.run()
+    if app.exception:
+        raise SystemExit(f"ERROR: el dashboard falló en AppTest: {app.exception}")
+    return {
+        "primer_elemento_ms": (marcas["primer_elemento"] - marcas["inicio"]) * 1e3,
+        "pagina_ms": (marcas["fin"] - marcas["inicio"]) * 1e3,
+        "login": any(t.label == "Contraseña" for t in app.text_input),
+        "modulos": [m for m in MODULOS_PESADOS if m in sys.modules]
+    }
+
+# ============================================================
+# MEDICION
+# ============================================================
+
+def medir_pagina(pagina: str, muestras: int, ruta_app: Path) -> dict:
+    entorno = dict(os.environ, **ENTORNOS[pagina])
+    corridas = []
+    for _ in range(muestras):
+        salida = subprocess.run([sys.executable, __file__, "--hijo", str(ruta_app.resolve())], env=entorno,
+                                cwd=BASE_DIR, capture_output=True, text=True)
+        if salida.returncode:
+            raise SystemExit(f"ERROR: falló el arranque de '{pagina}':\n{salida.stderr or salida.stdout}")
+        corridas.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+    if any(c["login"] != (pagina == "login") for c in corridas):
+        raise SystemExit(f"ERROR: el primer rerun de '{pagina}' no mostró la página esperada")
+    return {
+        "primer_elemento_ms": statistics.median(c["primer_elemento_ms"] for c in corridas),
+        "pagina_ms": statistics.median(c["pagina_ms"] for c in corridas),
+        "modulos": corridas[-1]["modulos"]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arranque en frío de las páginas de login y dashboard")
+    parser.add_argument("--muestras", type=int, default=5, help="Procesos nuevos por página")
+    parser.add_argument("--app", type=Path, default=RUTA_APP, help=argparse.SUPPRESS)
+    parser.add_argument("--hijo", metavar="RUTA_APP", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.hijo:
+        print(json.dumps(arrancar(args.hijo)))
+        return
+
+    print("=" * 78)
+    print("BENCHMARK ARRANQUE EN FRIO")
+    print("=" * 78)
+    print(f"Procesos nuevos por página: {args.muestras}")
+    print(f"\n{'Página':<11} {'Primer elemento':>16} {'Página completa':>16}  Módulos pesados cargados")
+    for pagina in ENTORNOS:
+        r = medir_pagina(pagina, args.muestras, args.app)
+        print(f"{pagina:<11} {r['primer_elemento_ms']:>13.0f} ms {r['pagina_ms']:>13.0f} ms  "
+              f"{', '.join(r['modulos']) or 'ninguno'}")
+    print("\nTiempos desde que empieza el script del primer rerun (Streamlit ya importado y los")
+    print("componentes registrados, como en el servidor antes de la primera conexión).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark de reruns parciales del dashboard (fragmentos de st.fragment).
+Para cada interacción con un widget que vive en un fragmento (formulario de
+gastos, guardar configuración, inflación estocástica, Mi Presupuesto) mide
+con AppTest de Streamlit, sin navegador:
+- el rerun completo de la app (lo que pasaba antes de los fragmentos)
+- el rerun solo del fragmento (lo que hace el navegador ahora)
+Reporta la latencia mediana por interacción y el payload enviado al
+navegador: bytes serializados de los ForwardMsg que irían por el websocket.
+
+El rerun de fragmento se pide igual que lo hace el navegador (RerunData con
+fragment_id_queue); AppTest no lo expone, así que se reemplaza su runner.
+La latencia incluye el costo fijo de AppTest (un hilo por run).
+
+Uso: python benchmarks/bench_fragmentos.py [--repeticiones N]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+
+import trazas  # noqa: E402
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData  # noqa: E402
+from streamlit.testing.v1 import app_test  # noqa: E402
+from streamlit.testing.v1.element_tree import parse_tree_from_messages  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner, require_widgets_deltas  # noqa: E402
+
+# Fragmento activo para el próximo run (None = app completa) y mensajes del último run
+_estado = {"fragmento": None, "mensajes": []}
+
+
+class RunnerConFragmentos(LocalScriptRunner):
+    """LocalScriptRunner que puede correr un solo fragmento y guarda los mensajes enviados"""
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        if _estado["fragmento"] is None:
+            arbol = super().run(widget_state, query_params, timeout, page_hash)
+        else:
+            # Reemplaza el rerun completo que el constructor deja pendiente
+            self._requests._rerun_data = RerunData(
+                widget_states=widget_state, page_script_hash=page_hash,
+                fragment_id_queue=[_estado["fragmento"]], is_fragment_scoped_rerun=True)
+            try:
+                if not self._script_thread:
+                    self.start()
+                require_widgets_deltas(self, timeout)
+            finally:
+                self.join()
+            arbol = parse_tree_from_messages(self.forward_msgs())
+        _estado["mensajes"] = list(self.forward_msgs())
+        return arbol
+
+
+app_test.LocalScriptRunner = RunnerConFragmentos
+
+
+def _buscar(widgets, etiqueta: str):
+    return next(w for w in widgets if w.label.startswith(etiqueta))
+
+def _activar_inflacion_estocastica(app):
+    _buscar(app.toggle, "🎲 Inflación estocástica").set_value(True)
+    app.run()
+
+# (nombre, fragmento, preparación, interacción i-ésima sobre el AppTest)
+INTERACCIONES = [
+    ("Escribir nombre de gasto", "gastos_personalizados", None,
+     lambda app, i: _buscar(app.text_input, "Nombre").set_value(f"Gasto {i}")),
+    ("Guardar configuración", "guardar_configuracion", None,
+     lambda app, i: _buscar(app.button, "💾 Guardar").click()),
+    ("Inflación estocástica", "inflacion_estocastica", _activar_inflacion_estocastica,
+     lambda app, i: _buscar(app.toggle, "Distinta por categoría").set_value(i % 2 == 0)),
+    ("Presupuesto objetivo", "mi_presupuesto", None,
+     lambda app, i: _buscar(app.number_input, "Presupuesto total").set_value(150_000.0 + 1_000 * (i % 2))),
+]
+
+
+def ids_fragmentos(app) -> dict:
+    """fragmento -> id de Streamlit, emparejando el orden de los tramos con el de los deltas"""
+    trazas.limpiar()
+    trazas.activar()
+    app.run()
+    trazas.desactivar()
+    nombres = [t["nombre"].split(":", 1)[1] for t in sorted(trazas.tramos(), key=lambda t: t["inicio_ns"])
+               if t["categoria"] == "fragmento"]
+    ids = []
+    for mensaje in _estado["mensajes"]:
+        if mensaje.WhichOneof("type") == "delta" and mensaje.delta.fragment_id not in ("", *ids):
+            ids.append(mensaje.delta.fragment_id)
+    return dict(zip(nombres, ids))
+
+
+def medir(app, preparar, interaccion, fragmento, repeticiones: int) -> dict:
+    if preparar:
+        preparar(app)
+    _estado["fragmento"] = fragmento
+    tiempos, bytes_enviados, mensajes = [], [], []
+    for i in range(repeticiones):
+        interaccion(app, i)
+        inicio = time.perf_counter()
+        app.run()
+        tiempos.append(time.perf_counter() - inicio)
+        if app.exception:
+            raise SystemExit(f"ERROR: el dashboard falló en AppTest: {app.exception}")
+        bytes_enviados.append(sum(m.ByteSize() for m in _estado["mensajes"]))
+        mensajes.append(len(_estado["mensajes"]))
+    if fragmento is not None:
+        # Tras un rerun de fragmento el árbol de AppTest solo tiene ese fragmento (y el
+        # próximo run solo envía el estado de sus widgets): se vuelve a la app completa
+        _estado["fragmento"] = None
+        app.run()
+    return {"ms": statistics.median(tiempos) * 1e3, "bytes": statistics.median(bytes_enviados),
+            "mensajes": statistics.median(mensajes)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latencia y payload de reruns completos vs. fragmentos")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    app = app_test.AppTest.from_file(str(BASE_DIR / "dashboard" / "app.py"), default_timeout=600)
+    app.run()  # Primer run: imports, cachés de datos y sesión
+    ids = ids_fragmentos(app)
+
+    print("=" * 92)
+    print("BENCHMARK RERUNS PARCIALES (FRAGMENTOS)")
+    print("=" * 92)
+    print(f"Repeticiones por interacción: {args.repeticiones}")
+    print(f"\n{'Interacción':<26} {'Completo':>10} {'Fragmento':>10} {'Acel.':>6} "
+          f"{'Bytes completo':>15} {'Bytes fragm.':>13} {'Reducción':>10}")
+    for nombre, fragmento, preparar, interaccion in INTERACCIONES:
+        if fragmento not in ids:
+            raise SystemExit(f"ERROR: el dashboard no tiene el fragmento '{fragmento}'")
+        completo = medir(app, preparar, interaccion, None, args.repeticiones)
+        parcial = medir(app, preparar, interaccion, ids[fragmento], args.repeticiones)
+        print(f"{nombre:<26} {completo['ms']:>8.1f}ms {parcial['ms']:>8.1f}ms {completo['ms'] / parcial['ms']:>5.1f}x "
+              f"{completo['bytes']:>9,.0f} ({completo['mensajes']:>3.0f}) {parcial['bytes']:>7,.0f} ({parcial['mensajes']:>2.0f}) "
+              f"{1 - parcial['bytes'] / completo['bytes']:>9.1%}")
+    print("\nBytes: ForwardMsg serializados por rerun (mensajes entre paréntesis).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escalabilidad de la simulacion Monte Carlo.
+Mide trayectorias/segundo con 1, 2, 4 y 8 trabajadores y verifica que el
+resultado sea identico con cualquier numero de procesos.
+
+Uso: python benchmarks/bench_montecarlo.py [--trayectorias N] [--bloque N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from montecarlo import resumir, simular  # noqa: E402
+
+TRABAJADORES = (1, 2, 4, 8)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Escalabilidad Monte Carlo por numero de procesos")
+    parser.add_argument("--trayectorias", type=int, default=1_000_000)
+    parser.add_argument("--bloque", type=int, default=25_000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("BENCHMARK MONTE CARLO - ESCALABILIDAD")
+    print("=" * 60)
+    print(f"Trayectorias: {args.trayectorias:,} | Bloque: {args.bloque:,} | "
+          f"Nucleos disponibles: {os.cpu_count()}")
+    print(f"\n{'Trabajadores':>12} {'Tiempo (s)':>12} {'Tray./s':>14} {'Aceleracion':>12}")
+
+    referencia = None
+    tiempo_base = None
+    for trabajadores in TRABAJADORES:
+        inicio = time.perf_counter()
+        resultado = simular(args.trayectorias, semilla=args.semilla, tam_bloque=args.bloque,
+                            trabajadores=trabajadores)
+        tiempo = time.perf_counter() - inicio
+        sketches = resumir(resultado)["sketches"]
+
+        if referencia is None:
+            referencia = sketches
+            tiempo_base = tiempo
+        elif referencia != sketches:
+            raise SystemExit(f"ERROR: resultado distinto con {trabajadores} trabajadores")
+
+        print(f"{trabajadores:>12} {tiempo:>12.2f} {args.trayectorias / tiempo:>14,.0f} "
+              f"{tiempo_base / tiempo:>11.2f}x")
+
+    print("\nResultados identicos para todos los numeros de trabajadores.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de la latencia de recálculo por rerun del dashboard.
+Compara el cálculo año a año original (float) con motor_proyeccion (núcleo
+en céntimos + caché) sobre una secuencia de reruns típica: movimientos de
+sliders y reruns de otros widgets (moneda, tasas, expanders) que no cambian
+la proyección. Verifica que el motor dé exactamente las cifras de
+generar_datos.evaluar_parametros (las del JSON/Excel), que el original no se
+aleje más de unos céntimos, y reporta la latencia por tipo. Si existe la
+grilla de sliders (generar_datos.py --grilla-sliders) compara además un
+fallo de caché calculado en vivo con uno respondido por índice.
+
+Uso: python benchmarks/bench_recalculo.py [--reruns N]
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "dashboard"))
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+
+from centimos import a_euros  # noqa: E402
+from generar_datos import evaluar_parametros  # noqa: E402
+from grilla_sliders import abrir_grilla  # noqa: E402
+from motor_proyeccion import info_caches, limpiar_caches, proyectar, usar_grilla  # noqa: E402
+
+with open(BASE_DIR / "output" / "datos_paulina.json", "r", encoding="utf-8") as f:
+    DATOS = json.load(f)
+
+CLAVES_NO_MENSUALES = ["vuelos_por_ano", "pct_emergencias", "gastos_personalizados"]
+
+
+def recalcular_original(ajustes, descuento_matricula, inflacion):
+    """Implementación previa del dashboard (referencia)"""
+    matricula_base = DATOS["costos_base"]["matricula"]["anual_base"]
+    descuento = DATOS["supuestos"]["descuento_matricula_disponible"] if descuento_matricula else 0
+    matricula_anual = matricula_base * (1 - descuento)
+
+    total_mensual = sum(v for k, v in ajustes.items() if k not in CLAVES_NO_MENSUALES)
+    total_mensual += ajustes.get("gastos_personalizados", 0)
+
+    costo_vuelo = DATOS["costos_base"]["vuelos_colombia"]["medio"]
+    vuelos_anual = costo_vuelo * ajustes.get("vuelos_por_ano", 2)
+    gastos_vida_anual = (total_mensual * 12) + vuelos_anual
+
+    pct_emergencias = ajustes.get("pct_emergencias", 0.05)
+    emergencias_anual = (gastos_vida_anual + matricula_anual) * pct_emergencias
+    total_anual = matricula_anual + gastos_vida_anual + emergencias_anual
+
+    anos = DATOS["perfil"]["duracion_anos"]
+    proyeccion = []
+    total_acumulado = 0
+
+    for i in range(anos):
+        factor = (1 + inflacion) ** i
+        mat = matricula_anual * factor
+        gastos = gastos_vida_anual * factor
+        emerg = emergencias_anual * factor
+        total = mat + gastos + emerg
+        total_acumulado += total
+        proyeccion.append({"ano": DATOS["perfil"]["ano_inicio"] + i, "matricula": mat,
+                           "gastos_vida": gastos, "emergencias": emerg, "total": total})
+
+    return {
+        "matricula_anual": matricula_anual, "ahorro_beca": (matricula_base - matricula_anual) * anos,
+        "total_mensual": total_mensual, "vuelos_anual": vuelos_anual, "emergencias_anual": emergencias_anual,
+        "total_anual_ano1": total_anual, "proyeccion": proyeccion, "total_4_anos": total_acumulado,
+        "promedio_mensual": total_acumulado / (anos * 12)
+    }
+
+
+def recalcular_motor(ajustes, descuento_matricula, inflacion):
+    """Mismo cálculo que dashboard/app.py::recalcular_con_ajustes"""
+    descuento = DATOS["supuestos"]["descuento_matricula_disponible"] if descuento_matricula else 0
+    total_mensual = sum(v for k, v in ajustes.items() if k not in CLAVES_NO_MENSUALES)
+    total_mensual += ajustes.get("gastos_personalizados", 0)
+    return proyectar(
+        matricula_base=DATOS["costos_base"]["matricula"]["anual_base"],
+        descuento=descuento,
+        total_mensual=total_mensual,
+        costo_vuelo=DATOS["costos_base"]["vuelos_colombia"]["medio"],
+        vuelos_por_ano=ajustes.get("vuelos_por_ano", 2),
+        pct_emergencias=ajustes.get("pct_emergencias", 0.05),
+        inflacion=inflacion,
+        anos=DATOS["perfil"]["duracion_anos"],
+        ano_inicio=DATOS["perfil"]["ano_inicio"]
+    )
+
+
+def secuencia_reruns(n: int, semilla: int = 7) -> list:
+    """
+    Interacciones típicas: (tipo, estado) por rerun. Los sliders toman valores
+    que se repiten; "otro_widget" vuelve a ejecutar el script sin cambiar la
+    proyección (cambio de moneda, tasas, expanders).
+    """
+    rng = random.Random(semilla)
+    costos = DATOS["costos_base"]
+    ajustes = {c: costos[c]["medio"] for c in ["vivienda", "electricidad", "gas_calefaccion", "agua",
+                                               "internet", "celular", "supermercado", "seguro_medico",
+                                               "ocio_cultura", "ropa_personal", "materiales_estudio"]}
+    ajustes.update({"transporte": 8, "vuelos_por_ano": 2, "pct_emergencias": 0.05,
+                    "gastos_personalizados": 0})
+    inflacion, descuento = 0.03, True
+
+    estados = []
+    for _ in range(n):
+        movimiento = rng.random()
+        tipo = "slider"
+        if movimiento < 0.3:
+            ajustes["vivienda"] = rng.randrange(600, 1101, 50)
+        elif movimiento < 0.4:
+            ajustes["supermercado"] = rng.randrange(200, 401, 25)
+        elif movimiento < 0.45:
+            inflacion = rng.randrange(0, 17) / 200
+        elif movimiento < 0.5:
+            ajustes["pct_emergencias"] = rng.randrange(0, 16) / 100
+        elif movimiento < 0.55:
+            descuento = not descuento
+        else:
+            tipo = "otro_widget"
+        estados.append((tipo, (dict(ajustes), descuento, inflacion)))
+    return estados
+
+
+def medir(funcion, estados) -> dict:
+    """µs por rerun, total y por tipo de interacción"""
+    tiempos = {}
+    reloj = time.perf_counter
+    for tipo, (ajustes, descuento, inflacion) in estados:
+        inicio = reloj()
+        funcion(ajustes, descuento, inflacion)
+        tiempos.setdefault(tipo, []).append(reloj() - inicio)
+    todos = [t for lista in tiempos.values() for t in lista]
+    resumen = {tipo: sum(lista) / len(lista) * 1e6 for tipo, lista in tiempos.items()}
+    resumen["total"] = sum(todos) / len(todos) * 1e6
+    return resumen
+
+
+def medir_fallos(estados) -> float:
+    """µs por proyección calculada (caché vacía en cada rerun)"""
+    reloj = time.perf_counter
+    total = 0.0
+    for _, (ajustes, descuento, inflacion) in estados:
+        limpiar_caches()
+        inicio = reloj()
+        recalcular_motor(ajustes, descuento, inflacion)
+        total += reloj() - inicio
+    return total / len(estados) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latencia de recálculo por rerun")
+    parser.add_argument("--reruns", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    estados = secuencia_reruns(args.reruns)
+
+    anos = DATOS["perfil"]["duracion_anos"]
+    for _, (ajustes, descuento, inflacion) in estados[:2000]:
+        a = recalcular_original(ajustes, descuento, inflacion)
+        b = recalcular_motor(ajustes, descuento, inflacion)
+        c = evaluar_parametros(b["total_mensual"], DATOS["costos_base"]["vuelos_colombia"]["medio"],
+                               ajustes.get("vuelos_por_ano", 2),
+                               DATOS["supuestos"]["descuento_matricula_disponible"] if descuento else 0,
+                               ajustes.get("pct_emergencias", 0.05), inflacion)
+        if b["total_4_anos"] != c["total_4_anos_eur"] or b["promedio_mensual"] != c["promedio_mensual"]:
+            raise SystemExit(f"ERROR: el motor difiere del JSON ({b['total_4_anos']} vs {c['total_4_anos_eur']})")
+        if [a_euros(t) for t in b["proyeccion_centimos"]["total"]] != c["proyeccion_anual"]["total_anual"].tolist():
+            raise SystemExit("ERROR: proyección del motor difiere del JSON")
+        # Un céntimo de redondeo por componente y año
+        if not math.isclose(a["total_4_anos"], b["total_4_anos"], abs_tol=0.03 * anos):
+            raise SystemExit(f"ERROR: total_4_anos difiere ({a['total_4_anos']} vs {b['total_4_anos']})")
+
+    original = medir(recalcular_original, estados)
+    limpiar_caches()
+    motor = medir(recalcular_motor, estados)
+
+    print("=" * 60)
+    print("BENCHMARK RECALCULO POR RERUN")
+    print("=" * 60)
+    print(f"Reruns simulados: {args.reruns:,}")
+    print(f"\n{'Interacción':<14} {'Original (µs)':>14} {'Motor (µs)':>12} {'Aceleración':>12}")
+    for tipo in ("slider", "otro_widget", "total"):
+        print(f"{tipo:<14} {original[tipo]:>14.2f} {motor[tipo]:>12.2f} "
+              f"{original[tipo] / motor[tipo]:>11.2f}x")
+    caches = info_caches()
+    proyecciones, series = caches["proyecciones"], caches["series"]
+    print(f"\nCaché de proyecciones: {proyecciones['hits']:,} aciertos por estado canónico, "
+          f"{proyecciones['misses']:,} calculadas ({proyecciones['evictions']:,} desalojadas); series reusadas: "
+          f"matrícula {series['matricula']['hits']:,}, gastos de vida {series['gastos_vida']['hits']:,}")
+
+    grilla = abrir_grilla()
+    if grilla is not None:
+        sliders = [e for e in estados if e[0] == "slider"][:2000]
+        usar_grilla(None)
+        en_vivo = medir_fallos(sliders)
+        resultados_vivo = [recalcular_motor(*estado) for _, estado in sliders]
+        usar_grilla(grilla)
+        por_indice = medir_fallos(sliders)
+        limpiar_caches()
+        if [recalcular_motor(*estado) for _, estado in sliders] != resultados_vivo:
+            raise SystemExit("ERROR: la grilla de sliders difiere del cálculo en vivo")
+        consultas = info_caches()["grilla"]["consultas"]
+        usar_grilla(None)
+        print(f"Fallo de caché: {en_vivo:.2f} µs en vivo, {por_indice:.2f} µs con la grilla "
+              f"({en_vivo / por_indice:.1f}x; {consultas:,} de {len(sliders):,} estados en la grilla)")
+    print("Motor idéntico al JSON al céntimo; original float a menos de 3 céntimos por año.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks de las rutas calientes, con baselines guardadas.
+Casos:
+- calcular_escenario (un preset) y generar_escenarios completo
+- calcular_escenarios_lote con 1, 1.000 y 100.000 escenarios
+- generar_excel.main (libro completo, guardado en un directorio temporal)
+- exportación write-only de la grilla de escenarios (10.560 filas)
+- recalcular_con_ajustes sin caché con 10 y 1.000 gastos personalizados
+- conversión a COP de una tabla mensual de 10.000 filas x 4 columnas
+- rerun del dashboard sin navegador (AppTest de Streamlit) con 10 y 1.000
+  gastos personalizados en la sesión
+
+Cada muestra repite el caso hasta sumar al menos 0,2 s (timeit.autorange)
+y se reporta la mediana por llamada. Con --guardar los tiempos quedan en
+baselines.json; sin --guardar se comparan con esas baselines y un caso más
+lento que baseline x (1 + tolerancia) es una regresión (código de salida 1).
+Las baselines dependen de la máquina: regenerarlas al cambiar de entorno.
+
+Uso: python benchmarks/suite.py [-k FILTRO] [--muestras N] [--tolerancia T] [--guardar]
+"""
+
+import argparse
+import atexit
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import timeit
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "dashboard"))
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+
+import generar_excel  # noqa: E402
+from bench_recalculo import recalcular_motor, secuencia_reruns  # noqa: E402
+from generar_datos import (PRESETS, MASCARA_TODOS, OUTPUT_DIR, calcular_escenario,  # noqa: E402
+                           calcular_escenarios_lote, generar_escenarios, grilla_parametros)
+from motor_proyeccion import limpiar_caches  # noqa: E402
+from vistas_moneda import convertir_valores  # noqa: E402
+
+RUTA_BASELINES = Path(__file__).parent / "baselines.json"
+
+ESCENARIOS_LOTE = (1, 1_000, 100_000)
+GASTOS_PERSONALIZADOS = (10, 1_000)
+FILAS_CONVERSION = 10_000
+TASAS_CONVERSION = {"EUR_USD": 1.08, "EUR_COP": 4500.0}
+TOLERANCIA = 0.25
+
+CASOS = {}
+
+# ============================================================
+# DATOS SINTETICOS
+# ============================================================
+
+def gastos_sinteticos(n: int) -> list:
+    """Gastos personalizados con la forma de st.session_state.gastos_personalizados"""
+    return [{"id": i, "nombre": f"Gasto {i}", "monto": 10 + i % 50,
+             "tipo": "anual" if i % 3 == 0 else "mensual", "activo": i % 5 != 0}
+            for i in range(n)]
+
+
+def total_gastos(gastos: list) -> float:
+    """Mismo cálculo que gastos_personalizados_mensual en app.py"""
+    return sum(g["monto"] if g["tipo"] == "mensual" else g["monto"] / 12 for g in gastos if g["activo"])
+
+# ============================================================
+# CASOS
+# ============================================================
+# Cada caso es una función de preparación que devuelve el callable a medir,
+# o None si no puede correr en este entorno.
+
+def caso(nombre):
+    def registrar(preparar):
+        CASOS[nombre] = preparar
+        return preparar
+    return registrar
+
+
+@caso("calcular_escenario")
+def preparar_escenario():
+    return partial(calcular_escenario, **PRESETS["moderado"])
+
+
+@caso("generar_escenarios")
+def preparar_generar_escenarios():
+    return generar_escenarios
+
+
+def preparar_lote(n: int):
+    rng = np.random.default_rng(0)
+    parametros = {
+        "niveles": rng.integers(0, 3, n),
+        "descuento_matricula": rng.random(n) < 0.5,
+        "opcionales": rng.integers(0, MASCARA_TODOS + 1, n),
+        "viajes_por_ano": rng.integers(0, 5, n)
+    }
+    return partial(calcular_escenarios_lote, **parametros)
+
+
+@caso("generar_excel.main")
+def preparar_excel():
+    # main() lee y escribe en OUTPUT_DIR: se apunta a una copia temporal
+    directorio = Path(tempfile.mkdtemp(prefix="bench_excel_"))
+    atexit.register(shutil.rmtree, directorio, True)
+    for nombre in ("datos_paulina.json", "escenarios_paulina.json", "sensibilidad_paulina.json"):
+        if (OUTPUT_DIR / nombre).exists():
+            shutil.copy(OUTPUT_DIR / nombre, directorio / nombre)
+    generar_excel.OUTPUT_DIR = directorio
+
+    def construir():
+        with contextlib.redirect_stdout(io.StringIO()):
+            generar_excel.main([])
+    return construir
+
+
+@caso("generar_excel.grilla[10560]")
+def preparar_excel_grilla():
+    grilla = grilla_parametros(inflaciones=np.linspace(0, 0.10, 11))
+
+    def construir():
+        generar_excel.crear_libro_grilla(grilla).save(io.BytesIO())
+    return construir
+
+
+def preparar_recalculo(n_gastos: int):
+    gastos = gastos_sinteticos(n_gastos)
+    _, (ajustes, descuento, inflacion) = secuencia_reruns(1)[0]
+
+    def recalcular():
+        limpiar_caches()  # Medir el recálculo, no un acierto de caché
+        ajustes["gastos_personalizados"] = total_gastos(gastos)
+        return recalcular_motor(ajustes, descuento, inflacion)
+    return recalcular
+
+
+@caso(f"convertir_moneda[{FILAS_CONVERSION}_filas]")
+def preparar_conversion():
+    # Granularidad mensual: una fila por mes y escenario, columnas como las de la proyección
+    tabla = np.random.default_rng(0).uniform(0, 20_000, (FILAS_CONVERSION, 4)).round(2)
+    return partial(convertir_valores, tabla, "COP", TASAS_CONVERSION)
+
+
+def preparar_dashboard(n_gastos: int):
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+    app = AppTest.from_file(str(BASE_DIR / "dashboard" / "app.py"), default_timeout=600)
+    app.session_state["gastos_personalizados"] = gastos_sinteticos(n_gastos)
+    app.run()  # Primer run: imports, cachés de datos y sesión
+    if app.exception:
+        raise SystemExit(f"ERROR: el dashboard falló en AppTest: {app.exception}")
+    return app.run
+
+
+for _n in ESCENARIOS_LOTE:
+    CASOS[f"calcular_escenarios_lote[{_n}]"] = partial(preparar_lote, _n)
+for _n in GASTOS_PERSONALIZADOS:
+    CASOS[f"recalcular_con_ajustes[{_n}_gastos]"] = partial(preparar_recalculo, _n)
+for _n in GASTOS_PERSONALIZADOS:
+    CASOS[f"dashboard_rerun[{_n}_gastos]"] = partial(preparar_dashboard, _n)
+
+# ============================================================
+# MEDICION Y BASELINES
+# ============================================================
+
+def medir(funcion, muestras: int) -> float:
+    """Mediana de segundos por llamada"""
+    temporizador = timeit.Timer(funcion)
+    llamadas, tiempo = temporizador.autorange()
+    tiempos = [tiempo] + temporizador.repeat(repeat=muestras - 1, number=llamadas)
+    return statistics.median(tiempos) / llamadas
+
+
+def entorno() -> dict:
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "plataforma": platform.platform(), "cpus": os.cpu_count()}
+
+
+def cargar_baselines() -> dict:
+    if not RUTA_BASELINES.exists():
+        return {"entorno": None, "casos": {}}
+    with open(RUTA_BASELINES, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def guardar_baselines(baselines: dict):
+    with open(RUTA_BASELINES, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def formato_tiempo(segundos: float) -> str:
+    if segundos < 1e-3:
+        return f"{segundos * 1e6:.1f} µs"
+    if segundos < 1:
+        return f"{segundos * 1e3:.2f} ms"
+    return f"{segundos:.2f} s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de rutas calientes con baselines")
+    parser.add_argument("-k", dest="filtro", default="", help="Solo casos cuyo nombre contenga FILTRO")
+    parser.add_argument("--muestras", type=int, default=5)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="Fracción de más sobre la baseline que cuenta como regresión")
+    parser.add_argument("--guardar", action="store_true", help="Guardar los tiempos como nuevas baselines")
+    args = parser.parse_args(argv)
+
+    casos = [nombre for nombre in CASOS if args.filtro in nombre]
+    if not casos:
+        parser.error(f"Ningún caso coincide con '{args.filtro}'")
+
+    baselines = cargar_baselines()
+    if not args.guardar and baselines["entorno"] and baselines["entorno"] != entorno():
+        print("Aviso: las baselines se guardaron en otro entorno; las comparaciones son orientativas.")
+
+    print("=" * 78)
+    print("SUITE DE BENCHMARKS")
+    print("=" * 78)
+    print(f"{'Caso':<36} {'Mediana':>11} {'Baseline':>11} {'Relación':>9}  Estado")
+
+    resultados, regresiones = {}, []
+    for nombre in casos:
+        funcion = CASOS[nombre]()
+        if funcion is None:
+            print(f"{nombre:<36} {'-':>11} {'-':>11} {'-':>9}  omitido")
+            continue
+        tiempo = medir(funcion, args.muestras)
+        resultados[nombre] = tiempo
+
+        referencia = baselines["casos"].get(nombre)
+        if referencia is None:
+            print(f"{nombre:<36} {formato_tiempo(tiempo):>11} {'-':>11} {'-':>9}  sin baseline")
+            continue
+        relacion = tiempo / referencia
+        if relacion > 1 + args.tolerancia:
+            estado = "REGRESION"
+            regresiones.append(nombre)
+        elif relacion < 1 / (1 + args.tolerancia):
+            estado = "mejora"
+        else:
+            estado = "ok"
+        print(f"{nombre:<36} {formato_tiempo(tiempo):>11} {formato_tiempo(referencia):>11} "
+              f"{relacion:>8.2f}x  {estado}")
+
+    if args.guardar:
+        baselines["entorno"] = entorno()
+        baselines["casos"].update({nombre: round(t, 9) for nombre, t in resultados.items()})
+        guardar_baselines(baselines)
+        print(f"\nBaselines guardadas en {RUTA_BASELINES}")
+    elif regresiones:
+        print(f"\n{len(regresiones)} regresión(es) sobre {args.tolerancia:.0%} de tolerancia: "
+              f"{', '.join(regresiones)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
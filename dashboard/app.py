@@ -2,17 +2,21 @@
 """
 Dashboard Interactivo - Presupuesto Paulina Madrid IE
 Con autenticación Supabase y persistencia de datos
+
+La página de login solo carga Streamlit y el cliente de Supabase: pandas,
+numpy, plotly y los motores de cálculo se importan después de verificar la
+sesión (benchmarks/bench_arranque.py mide el arranque en frío de ambas páginas).
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import json
+import sys
+from collections import deque
+from functools import wraps
 from pathlib import Path
-from supabase import create_client, Client
 import os
 
+
 # ============================================================
 # CONFIGURACION
 # ============================================================
@@ -31,10 +35,19 @@ except (KeyError, FileNotFoundError):
     SUPABASE_URL = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
 
-# Inicializar cliente Supabase
+# Emails (separados por coma) que pueden abrir el panel de rendimiento; en modo local, cualquiera
+try:
+    ADMIN_EMAILS = st.secrets["ADMIN_EMAILS"]
+except (KeyError, FileNotFoundError):
+    ADMIN_EMAILS = os.getenv("ADMIN_EMAILS", "")
+ADMIN_EMAILS = {e.strip().lower() for e in ADMIN_EMAILS.split(",") if e.strip()}
+RERUNS_PANEL = 200  # Reruns de la sesión que guarda el panel de rendimiento
+
+# Inicializar cliente Supabase (el import solo se paga si está configurado)
 @st.cache_resource
 def init_supabase():
     if SUPABASE_KEY:
+        from supabase import create_client
         return create_client(SUPABASE_URL, SUPABASE_KEY)
     return None
 
@@ -44,6 +57,16 @@ supabase = init_supabase()
 BASE_DIR = Path(__file__).parent.parent
 OUTPUT_DIR = BASE_DIR / "output"
 
+# trazas solo usa la biblioteca estándar: se importa antes del login
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+from trazas import (contadores, contar, etapa, iniciar_recoleccion, medido, recolectando,  # noqa: E402
+                    resumen, terminar_recoleccion, tramo)
+
+# Con el panel de rendimiento activo, este rerun recolecta sus propios tramos (ver trazas.py)
+if st.session_state.get("panel_rendimiento"):
+    iniciar_recoleccion()
+etapa("etapa:inicio")
+
 # ============================================================
 # AUTENTICACION
 # ============================================================
@@ -168,6 +191,7 @@ def logout():
 # ============================================================
 # PERSISTENCIA EN SUPABASE
 # ============================================================
+@medido("supabase:load_user_data", "supabase")
 def load_user_data(email):
     """Carga datos del usuario desde Supabase"""
     try:
@@ -192,6 +216,7 @@ def load_user_data(email):
     except Exception as e:
         st.warning(f"No se pudieron cargar datos: {e}")
 
+@medido("supabase:save_gasto", "supabase")
 def save_gasto(email, nombre, monto, tipo):
     """Guarda un nuevo gasto en Supabase"""
     try:
@@ -208,6 +233,7 @@ def save_gasto(email, nombre, monto, tipo):
         st.error(f"Error al guardar: {e}")
     return None
 
+@medido("supabase:update_gasto", "supabase")
 def update_gasto(gasto_id, activo):
     """Actualiza estado de un gasto"""
     try:
@@ -215,6 +241,7 @@ def update_gasto(gasto_id, activo):
     except Exception as e:
         st.error(f"Error al actualizar: {e}")
 
+@medido("supabase:delete_gasto", "supabase")
 def delete_gasto(gasto_id):
     """Elimina un gasto"""
     try:
@@ -222,6 +249,7 @@ def delete_gasto(gasto_id):
     except Exception as e:
         st.error(f"Error al eliminar: {e}")
 
+@medido("supabase:save_user_settings", "supabase")
 def save_user_settings(email, settings):
     """Guarda configuración del usuario"""
     try:
@@ -253,26 +281,107 @@ elif not st.session_state.authenticated:
     login_page()
     st.stop()
 
+# ============================================================
+# IMPORTS DEL DASHBOARD (DIFERIDOS HASTA DESPUES DEL LOGIN)
+# ============================================================
+# Solo el primer rerun autenticado del proceso paga estos imports (después quedan en sys.modules)
+etapa("etapa:imports")
+import pandas as pd  # noqa: E402
+import numpy as np  # noqa: E402
+import plotly.express as px  # noqa: E402
+import plotly.graph_objects as go  # noqa: E402
+
+# Motores de cálculo compartidos con los scripts (índice de gastos, flujo mensual, objetivo)
+from motor_proyeccion import info_caches, proyectar, usar_grilla  # noqa: E402
+from vistas_moneda import convertir_valores, info_vistas, proyeccion_en_moneda  # noqa: E402
+from flujo_mensual import construir_flujo, etiquetas_meses, serie_categoria, totales_mensuales  # noqa: E402
+from objetivo_presupuesto import monto_mensual_maximo, presupuesto_en_eur, repartir, tabla_presets  # noqa: E402
+from generar_datos import calcular_gastos_mensuales  # noqa: E402
+from almacen_columnar import abrir_almacen, preset_desde_almacen  # noqa: E402
+from grilla_sliders import abrir_grilla  # noqa: E402
+import inflacion_estocastica  # noqa: E402
+etapa("etapa:inicio")
+
 # ============================================================
 # CARGA DE DATOS (SOLO LECTURA DE JSONs)
 # ============================================================
+# medido() va por fuera de la caché: los tramos incluyen los aciertos (copia de st.cache_data)
+@medido("datos:cargar_datos_base", "datos", contar_llamadas=True)
 @st.cache_data
 def cargar_datos_base():
+    contar("datos:cargar_datos_base:fallos")
     with open(OUTPUT_DIR / "datos_paulina.json", "r", encoding="utf-8") as f:
         return json.load(f)
 
+@medido("datos:cargar_escenarios", "datos", contar_llamadas=True)
 @st.cache_data
 def cargar_escenarios():
+    contar("datos:cargar_escenarios:fallos")
     with open(OUTPUT_DIR / "escenarios_paulina.json", "r", encoding="utf-8") as f:
         return json.load(f)
 
+@medido("datos:cargar_almacen", "datos")
+@st.cache_resource
+def cargar_almacen():
+    """Escenarios en formato columnar mapeados en memoria (opcional: generar_datos.py --columnar)"""
+    return abrir_almacen()
+
+@medido("datos:cargar_grilla_sliders", "datos")
+@st.cache_resource
+def cargar_grilla_sliders():
+    """Proyecciones precalculadas por posición de sliders, mapeadas en memoria (opcional: generar_datos.py --grilla-sliders)"""
+    return abrir_grilla()
+
+@st.cache_resource
+def choques_inflacion(anos):
+    """Choques de inflación sorteados una vez por proceso; el slider solo mueve el centro"""
+    return inflacion_estocastica.sortear_choques(inflacion_estocastica.TRAYECTORIAS, anos, semilla=42)
+
+@medido("datos:cargar_montecarlo", "datos")
+@st.cache_data
+def cargar_montecarlo():
+    """Bandas de percentiles de la simulación (opcional: generar_datos.py --montecarlo N)"""
+    ruta = OUTPUT_DIR / "montecarlo_paulina.json"
+    if not ruta.exists():
+        return None
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@medido("datos:cargar_cambio", "datos")
+@st.cache_data
+def cargar_cambio():
+    """Bandas con tasas de cambio simuladas (opcional: generar_datos.py --cambio N)"""
+    ruta = OUTPUT_DIR / "cambio_paulina.json"
+    if not ruta.exists():
+        return None
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@medido("datos:cargar_sensibilidad", "datos")
+@st.cache_data
+def cargar_sensibilidad():
+    """Datos de tornado (opcional: generar_datos.py --sensibilidad)"""
+    ruta = OUTPUT_DIR / "sensibilidad_paulina.json"
+    if not ruta.exists():
+        return None
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+ALMACEN = cargar_almacen()
+usar_grilla(cargar_grilla_sliders())
+
 try:
     DATOS = cargar_datos_base()
-    ESCENARIOS = cargar_escenarios()
+    # Con almacén columnar no hace falta parsear escenarios_paulina.json
+    ESCENARIOS = None if ALMACEN else cargar_escenarios()
 except FileNotFoundError as e:
     st.error(f"Error: No se encontraron los archivos JSON.")
     st.stop()
 
+MONTECARLO = cargar_montecarlo()
+CAMBIO = cargar_cambio()
+SENSIBILIDAD = cargar_sensibilidad()
+
 # ============================================================
 # ESTILOS
 # ============================================================
@@ -296,50 +405,70 @@ def formato_moneda(valor, moneda="EUR"):
     return f"{simbolo}{valor:,.0f}"
 
 def convertir_moneda(valor_eur, moneda, tasas):
-    if moneda == "EUR":
-        return valor_eur
-    elif moneda == "USD":
-        return valor_eur * tasas["EUR_USD"]
-    elif moneda == "COP":
-        return valor_eur * tasas["EUR_COP"]
-    return valor_eur
+    # Misma conversión al céntimo que total_4_anos_usd/cop del JSON y del Excel (arrays en una sola operación)
+    return convertir_valores(valor_eur, moneda, tasas)
 
+@medido("calculo:recalcular_con_ajustes", "calculo")
 def recalcular_con_ajustes(escenario_base, ajustes, descuento_matricula, inflacion, tasas_cambio):
-    matricula_base = DATOS["costos_base"]["matricula"]["anual_base"]
     descuento = DATOS["supuestos"]["descuento_matricula_disponible"] if descuento_matricula else 0
-    matricula_anual = matricula_base * (1 - descuento)
 
     total_mensual = sum(v for k, v in ajustes.items() if k not in ["vuelos_por_ano", "pct_emergencias", "gastos_personalizados"])
     total_mensual += ajustes.get("gastos_personalizados", 0)
 
-    costo_vuelo = DATOS["costos_base"]["vuelos_colombia"]["medio"]
-    vuelos_anual = costo_vuelo * ajustes.get("vuelos_por_ano", 2)
-    gastos_vida_anual = (total_mensual * 12) + vuelos_anual
-
-    pct_emergencias = ajustes.get("pct_emergencias", 0.05)
-    emergencias_anual = (gastos_vida_anual + matricula_anual) * pct_emergencias
-    total_anual = matricula_anual + gastos_vida_anual + emergencias_anual
-
-    anos = DATOS["perfil"]["duracion_anos"]
-    proyeccion = []
-    total_acumulado = 0
-
-    for i in range(anos):
-        factor = (1 + inflacion) ** i
-        mat = matricula_anual * factor
-        gastos = gastos_vida_anual * factor
-        emerg = emergencias_anual * factor
-        total = mat + gastos + emerg
-        total_acumulado += total
-        proyeccion.append({"ano": DATOS["perfil"]["ano_inicio"] + i, "matricula": mat,
-                          "gastos_vida": gastos, "emergencias": emerg, "total": total})
-
-    return {
-        "matricula_anual": matricula_anual, "ahorro_beca": (matricula_base - matricula_anual) * anos,
-        "total_mensual": total_mensual, "vuelos_anual": vuelos_anual, "emergencias_anual": emergencias_anual,
-        "total_anual_ano1": total_anual, "proyeccion": proyeccion, "total_4_anos": total_acumulado,
-        "promedio_mensual": total_acumulado / (anos * 12)
-    }
+    return proyectar(
+        matricula_base=DATOS["costos_base"]["matricula"]["anual_base"],
+        descuento=descuento,
+        total_mensual=total_mensual,
+        costo_vuelo=DATOS["costos_base"]["vuelos_colombia"]["medio"],
+        vuelos_por_ano=ajustes.get("vuelos_por_ano", 2),
+        pct_emergencias=ajustes.get("pct_emergencias", 0.05),
+        inflacion=inflacion,
+        anos=DATOS["perfil"]["duracion_anos"],
+        ano_inicio=DATOS["perfil"]["ano_inicio"]
+    )
+
+# ============================================================
+# FRAGMENTOS (RERUNS PARCIALES)
+# ============================================================
+# Los sliders alimentan todo el cálculo, así que siguen corriendo la app completa.
+# Los widgets de efecto local (formulario de gastos, guardar, inflación estocástica,
+# Mi Presupuesto) viven en fragmentos: solo se vuelve a correr y enviar esa sección.
+def fragmento(nombre):
+    """st.fragment con un tramo "fragmento:<nombre>" en cada ejecución"""
+    def decorar(funcion):
+        @st.fragment
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            # Dentro de un rerun completo, o sin panel de rendimiento, basta el tramo
+            if recolectando() or not st.session_state.get("panel_rendimiento"):
+                with tramo(f"fragmento:{nombre}", "fragmento"):
+                    return funcion(*args, **kwargs)
+            # Rerun parcial con el panel activo: se guarda aparte de los reruns completos
+            iniciar_recoleccion()
+            try:
+                with tramo(f"fragmento:{nombre}", "fragmento"):
+                    return funcion(*args, **kwargs)
+            finally:
+                historial = st.session_state.setdefault("rendimiento_fragmentos", deque(maxlen=RERUNS_PANEL))
+                historial.append({"fragmento": nombre, "duracion_ms": terminar_recoleccion()["duracion_ms"]})
+        return envoltura
+    return decorar
+
+CATEGORIAS_MENSUALES = ["vivienda", "electricidad", "gas_calefaccion", "agua", "internet", "celular",
+                        "supermercado", "transporte", "seguro_medico", "ocio_cultura", "ropa_personal",
+                        "materiales_estudio", "gastos_personalizados"]
+
+def flujo_mensual_ajustes(ajustes, resultados, inflacion):
+    """Flujo de caja mes a mes (1 escenario) con los valores actuales de los sliders"""
+    return construir_flujo(
+        [[ajustes.get(c, 0) for c in CATEGORIAS_MENSUALES]], CATEGORIAS_MENSUALES,
+        matricula_anual=resultados["matricula_anual"],
+        costo_vuelo=DATOS["costos_base"]["vuelos_colombia"]["medio"],
+        viajes_por_ano=ajustes.get("vuelos_por_ano", 2),
+        pct_emergencias=ajustes.get("pct_emergencias", 0.05),
+        inflacion=inflacion,
+        duracion_anos=DATOS["perfil"]["duracion_anos"]
+    )
 
 # ============================================================
 # HEADER CON USUARIO
@@ -359,13 +488,14 @@ st.markdown("---")
 # ============================================================
 # SIDEBAR - CONTROLES
 # ============================================================
+etapa("etapa:sidebar")
 st.sidebar.markdown("## 🎛️ Panel de Control")
 
 # Escenario
 st.sidebar.markdown("### 📊 Escenario Base")
 escenario_sel = st.sidebar.selectbox("Cargar preset", ["Moderado", "Austero", "Comodo"], index=0)
 escenario_key = escenario_sel.lower()
-escenario_actual = ESCENARIOS["escenarios"][escenario_key]
+escenario_actual = preset_desde_almacen(ALMACEN, escenario_key) if ALMACEN else ESCENARIOS["escenarios"][escenario_key]
 
 # Botón para aplicar el escenario seleccionado (resetear valores guardados)
 if st.sidebar.button(f"🔄 Aplicar {escenario_sel}", use_container_width=True):
@@ -405,8 +535,10 @@ st.sidebar.markdown("---")
 
 # Gastos mensuales
 st.sidebar.markdown("### 🏠 Gastos Mensuales")
-desglose = escenario_actual["desglose_mensual"]
 costos = DATOS["costos_base"]
+# Desglose del preset desde el índice precalculado (nivel x opcionales) sobre los costos del JSON
+desglose = calcular_gastos_mensuales(escenario_actual["nivel"], escenario_actual["configuracion"]["incluir_opcionales"],
+                                     costos=costos)
 ajustes = {}
 
 ajustes["vivienda"] = st.sidebar.slider("Vivienda", costos["vivienda"]["min"], costos["vivienda"]["max"],
@@ -474,34 +606,41 @@ st.sidebar.markdown("---")
 
 # Botón para guardar configuración
 st.sidebar.markdown("### 💾 Guardar Cambios")
-if st.sidebar.button("💾 Guardar mi configuración", use_container_width=True, type="primary"):
-    config_to_save = {
-        "vivienda": ajustes["vivienda"],
-        "electricidad": ajustes.get("electricidad", desglose["electricidad"]["valor"]),
-        "gas_calefaccion": ajustes.get("gas_calefaccion", desglose["gas_calefaccion"]["valor"]),
-        "agua": ajustes.get("agua", desglose["agua"]["valor"]),
-        "internet": ajustes.get("internet", desglose["internet"]["valor"]),
-        "celular": ajustes["celular"],
-        "supermercado": ajustes["supermercado"],
-        "seguro_medico": ajustes["seguro_medico"],
-        "ocio_cultura": ajustes["ocio_cultura"],
-        "ropa_personal": ajustes["ropa_personal"],
-        "materiales_estudio": ajustes["materiales_estudio"],
-        "incluir_ocio": incluir_ocio,
-        "incluir_ropa": incluir_ropa,
-        "incluir_materiales": incluir_materiales,
-        "incluir_vuelos": incluir_vuelos,
-        "vuelos_por_ano": ajustes["vuelos_por_ano"],
-        "incluir_emergencias": incluir_emergencias,
-        "pct_emergencias_int": int(ajustes.get("pct_emergencias", 0.05) * 100),
-        "inflacion_pct": inflacion * 100
-    }
-    if supabase:
-        save_user_settings(st.session_state.user_email, {"ajustes": config_to_save})
-        st.session_state.ajustes_guardados = config_to_save
-        st.sidebar.success("✅ Configuración guardada")
-    else:
-        st.sidebar.warning("Modo local - no se puede guardar")
+config_actual = {
+    "vivienda": ajustes["vivienda"],
+    "electricidad": ajustes.get("electricidad", desglose["electricidad"]["valor"]),
+    "gas_calefaccion": ajustes.get("gas_calefaccion", desglose["gas_calefaccion"]["valor"]),
+    "agua": ajustes.get("agua", desglose["agua"]["valor"]),
+    "internet": ajustes.get("internet", desglose["internet"]["valor"]),
+    "celular": ajustes["celular"],
+    "supermercado": ajustes["supermercado"],
+    "seguro_medico": ajustes["seguro_medico"],
+    "ocio_cultura": ajustes["ocio_cultura"],
+    "ropa_personal": ajustes["ropa_personal"],
+    "materiales_estudio": ajustes["materiales_estudio"],
+    "incluir_ocio": incluir_ocio,
+    "incluir_ropa": incluir_ropa,
+    "incluir_materiales": incluir_materiales,
+    "incluir_vuelos": incluir_vuelos,
+    "vuelos_por_ano": ajustes["vuelos_por_ano"],
+    "incluir_emergencias": incluir_emergencias,
+    "pct_emergencias_int": int(ajustes.get("pct_emergencias", 0.05) * 100),
+    "inflacion_pct": inflacion * 100
+}
+
+@fragmento("guardar_configuracion")
+def guardar_configuracion(config_to_save):
+    """Guardar no cambia el cálculo: el click solo vuelve a correr este botón"""
+    if st.button("💾 Guardar mi configuración", use_container_width=True, type="primary"):
+        if supabase:
+            save_user_settings(st.session_state.user_email, {"ajustes": config_to_save})
+            st.session_state.ajustes_guardados = config_to_save
+            st.success("✅ Configuración guardada")
+        else:
+            st.warning("Modo local - no se puede guardar")
+
+with st.sidebar:
+    guardar_configuracion(config_actual)
 
 st.sidebar.markdown("---")
 
@@ -511,50 +650,57 @@ st.sidebar.markdown("---")
 st.sidebar.markdown("### ➕ Gastos Personalizados")
 st.sidebar.caption("Se guardan automáticamente")
 
-with st.sidebar.expander("Agregar nuevo gasto", expanded=False):
-    nuevo_nombre = st.text_input("Nombre", placeholder="Ej: Gimnasio, Spotify...")
-    col_m, col_t = st.columns(2)
-    with col_m:
-        nuevo_monto = st.number_input("Monto (€)", min_value=0, max_value=5000, value=0, step=10)
-    with col_t:
-        nuevo_tipo = st.selectbox("Frecuencia", ["Mensual", "Anual"])
-
-    if st.button("➕ Agregar", use_container_width=True):
-        if nuevo_nombre and nuevo_monto > 0:
-            if supabase:
-                result = save_gasto(st.session_state.user_email, nuevo_nombre, nuevo_monto, nuevo_tipo.lower())
-                if result:
+@fragmento("gastos_personalizados")
+def gestor_gastos():
+    """Escribir en el formulario solo corre este fragmento; agregar, activar o borrar cambia el total y corre la app"""
+    with st.expander("Agregar nuevo gasto", expanded=False):
+        nuevo_nombre = st.text_input("Nombre", placeholder="Ej: Gimnasio, Spotify...")
+        col_m, col_t = st.columns(2)
+        with col_m:
+            nuevo_monto = st.number_input("Monto (€)", min_value=0, max_value=5000, value=0, step=10)
+        with col_t:
+            nuevo_tipo = st.selectbox("Frecuencia", ["Mensual", "Anual"])
+
+        if st.button("➕ Agregar", use_container_width=True):
+            if nuevo_nombre and nuevo_monto > 0:
+                if supabase:
+                    result = save_gasto(st.session_state.user_email, nuevo_nombre, nuevo_monto, nuevo_tipo.lower())
+                    if result:
+                        st.session_state.gastos_personalizados.append({
+                            "id": result["id"], "nombre": nuevo_nombre, "monto": nuevo_monto,
+                            "tipo": nuevo_tipo.lower(), "activo": True
+                        })
+                else:
                     st.session_state.gastos_personalizados.append({
-                        "id": result["id"], "nombre": nuevo_nombre, "monto": nuevo_monto,
-                        "tipo": nuevo_tipo.lower(), "activo": True
+                        "id": len(st.session_state.gastos_personalizados),
+                        "nombre": nuevo_nombre, "monto": nuevo_monto, "tipo": nuevo_tipo.lower(), "activo": True
                     })
-            else:
-                st.session_state.gastos_personalizados.append({
-                    "id": len(st.session_state.gastos_personalizados),
-                    "nombre": nuevo_nombre, "monto": nuevo_monto, "tipo": nuevo_tipo.lower(), "activo": True
-                })
-            st.rerun()
-
-# Mostrar gastos existentes
-if st.session_state.gastos_personalizados:
-    st.sidebar.markdown("**Tus gastos:**")
-    for i, gasto in enumerate(st.session_state.gastos_personalizados):
-        col_info, col_toggle, col_del = st.sidebar.columns([3, 1, 1])
-        with col_info:
-            freq = "/mes" if gasto["tipo"] == "mensual" else "/año"
-            st.caption(f"{gasto['nombre']}: €{gasto['monto']:.0f}{freq}")
-        with col_toggle:
-            new_activo = st.checkbox("", value=gasto["activo"], key=f"gasto_{i}", label_visibility="collapsed")
-            if new_activo != gasto["activo"]:
-                gasto["activo"] = new_activo
-                if supabase:
-                    update_gasto(gasto["id"], new_activo)
-        with col_del:
-            if st.button("🗑️", key=f"del_{i}"):
-                if supabase:
-                    delete_gasto(gasto["id"])
-                st.session_state.gastos_personalizados.pop(i)
-                st.rerun()
+                st.rerun(scope="app")
+
+    # Mostrar gastos existentes
+    if st.session_state.gastos_personalizados:
+        st.markdown("**Tus gastos:**")
+        for i, gasto in enumerate(st.session_state.gastos_personalizados):
+            col_info, col_toggle, col_del = st.columns([3, 1, 1])
+            with col_info:
+                freq = "/mes" if gasto["tipo"] == "mensual" else "/año"
+                st.caption(f"{gasto['nombre']}: €{gasto['monto']:.0f}{freq}")
+            with col_toggle:
+                new_activo = st.checkbox("", value=gasto["activo"], key=f"gasto_{i}", label_visibility="collapsed")
+                if new_activo != gasto["activo"]:
+                    gasto["activo"] = new_activo
+                    if supabase:
+                        update_gasto(gasto["id"], new_activo)
+                    st.rerun(scope="app")
+            with col_del:
+                if st.button("🗑️", key=f"del_{i}"):
+                    if supabase:
+                        delete_gasto(gasto["id"])
+                    st.session_state.gastos_personalizados.pop(i)
+                    st.rerun(scope="app")
+
+with st.sidebar:
+    gestor_gastos()
 
 # Calcular totales personalizados
 gastos_personalizados_mensual = sum(
@@ -567,16 +713,23 @@ if gastos_personalizados_mensual > 0:
 
 ajustes["gastos_personalizados"] = gastos_personalizados_mensual
 
+if not supabase or st.session_state.user_email.lower() in ADMIN_EMAILS:
+    st.sidebar.markdown("---")
+    st.sidebar.toggle("⏱️ Panel de rendimiento", key="panel_rendimiento",
+                      help="Tiempos por etapa de cada rerun de esta sesión y aciertos de caché")
+
 # ============================================================
 # CALCULOS
 # ============================================================
+etapa("etapa:calculo")
 resultados = recalcular_con_ajustes(escenario_actual, ajustes, descuento_matricula, inflacion, tasas)
 
 # ============================================================
 # KPIs PRINCIPALES
 # ============================================================
+etapa("etapa:visualizacion")
 total_4_anos = convertir_moneda(resultados["total_4_anos"], moneda, tasas)
-promedio_anual = convertir_moneda(resultados["total_4_anos"] / 4, moneda, tasas)
+promedio_anual = convertir_moneda(resultados["promedio_anual"], moneda, tasas)
 promedio_mensual = convertir_moneda(resultados["promedio_mensual"], moneda, tasas)
 ahorro_beca = convertir_moneda(resultados["ahorro_beca"], moneda, tasas)
 
@@ -592,10 +745,114 @@ with col4:
 
 st.markdown("---")
 
+# ============================================================
+# SECCIONES CON WIDGETS PROPIOS (FRAGMENTOS)
+# ============================================================
+@fragmento("inflacion_estocastica")
+def seccion_inflacion_estocastica(ajustes, resultados, inflacion, moneda, tasas, df_proy):
+    """Los toggles de inflación estocástica solo recalculan y redibujan esta sección (df_proy ya en moneda)"""
+    col_estocastica, col_categoria = st.columns(2)
+    with col_estocastica:
+        inflacion_variable = st.toggle("🎲 Inflación estocástica", value=False,
+                                       help="Sortea la inflación de cada año alrededor del valor del slider")
+    with col_categoria:
+        inflacion_por_categoria = st.toggle("Distinta por categoría", value=True, disabled=not inflacion_variable,
+                                            help="El alquiler, la energía o los vuelos no suben igual que el IPC")
+    if inflacion_variable:
+        tasas_inflacion = inflacion_estocastica.tasas_inflacion(
+            choques_inflacion(DATOS["perfil"]["duracion_anos"]), inflacion, inflacion_por_categoria)
+        totales_inflacion = inflacion_estocastica.proyectar_trayectorias(
+            inflacion_estocastica.factores_acumulados(tasas_inflacion),
+            inflacion_estocastica.componentes_por_grupo(
+                {c: ajustes.get(c, 0) for c in CATEGORIAS_MENSUALES},
+                resultados["matricula_anual"], resultados["vuelos_anual"]),
+            ajustes.get("pct_emergencias", 0.05))
+        bandas_inflacion = inflacion_estocastica.bandas(totales_inflacion)
+
+        col_p10, col_p50, col_p90 = st.columns(3)
+        for col, clave, etiqueta in ((col_p10, "p10", "P10"), (col_p50, "p50", "P50 - Mediana"), (col_p90, "p90", "P90")):
+            with col:
+                valor = bandas_inflacion["total"][clave]
+                st.metric(f"{etiqueta} - Total 4 Años", formato_moneda(convertir_moneda(valor, moneda, tasas), moneda),
+                          formato_moneda(convertir_moneda(valor - resultados["total_4_anos"], moneda, tasas), moneda),
+                          delta_color="inverse")
+
+        with tramo("grafico:inflacion", "grafico"):
+            fig_inflacion = go.Figure()
+            p10, p50, p90 = convertir_moneda(np.array([bandas_inflacion["por_ano"][c] for c in ("p10", "p50", "p90")]),
+                                             moneda, tasas)
+            for serie, nombre, relleno in ((p90, "P90", None), (p10, "P10-P90", "tonexty")):
+                fig_inflacion.add_trace(go.Scatter(x=df_proy["ano"], y=serie,
+                                                   name=nombre, mode="lines", line=dict(width=0), fill=relleno,
+                                                   fillcolor="rgba(229,62,62,0.2)", showlegend=relleno is not None))
+            fig_inflacion.add_trace(go.Scatter(x=df_proy["ano"], y=p50,
+                                               name="P50", mode="lines+markers", line=dict(color="#e53e3e", width=3)))
+            fig_inflacion.add_trace(go.Scatter(x=df_proy["ano"], y=df_proy["total"],
+                                               name=f"Inflación fija {inflacion:.1%}", mode="lines", line=dict(color="#1a365d", dash="dash")))
+            fig_inflacion.update_layout(title=f"Costo Anual con Inflación Estocástica ({moneda})", height=350)
+            st.plotly_chart(fig_inflacion, use_container_width=True)
+        st.caption(f"{len(totales_inflacion):,} trayectorias de inflación centradas en {inflacion:.1%}"
+                   + (" con diferencial por grupo (vivienda, energía, educación, vuelos...)" if inflacion_por_categoria else "")
+                   + ". El año 1 usa los precios actuales.")
+
+@fragmento("mi_presupuesto")
+def mi_presupuesto(ajustes, resultados, descuento_matricula, inflacion, moneda, tasas, cat_nombres):
+    """Presupuesto y categorías a ajustar solo recalculan esta pestaña"""
+    col_pres, col_cats = st.columns([1, 2])
+    with col_pres:
+        presupuesto = st.number_input(f"Presupuesto total 4 años ({moneda})", min_value=0.0,
+                                      value=float(round(convertir_moneda(resultados["total_4_anos"], moneda, tasas), -3)),
+                                      step=1000.0 if moneda != "COP" else 1_000_000.0, format="%.0f")
+    with col_cats:
+        categorias_objetivo = st.multiselect("Categorías a ajustar", list(cat_nombres), default=["vivienda"],
+                                             format_func=cat_nombres.get)
+
+    if categorias_objetivo:
+        actuales = [ajustes.get(c, 0) for c in categorias_objetivo]
+        disponible = float(monto_mensual_maximo(
+            presupuesto_en_eur(presupuesto, moneda, tasas),
+            otros_mensual=resultados["total_mensual"] - sum(actuales),
+            costo_vuelo=DATOS["costos_base"]["vuelos_colombia"]["medio"],
+            viajes_por_ano=ajustes.get("vuelos_por_ano", 2),
+            descuento=DATOS["supuestos"]["descuento_matricula_disponible"] if descuento_matricula else 0,
+            pct_emergencias=ajustes.get("pct_emergencias", 0.05),
+            inflacion=inflacion
+        ))
+
+        if disponible < 0:
+            st.error("El presupuesto no alcanza a cubrir el resto de gastos con la configuración actual.")
+        else:
+            cols_obj = st.columns(len(categorias_objetivo))
+            for col, cat, actual, maximo in zip(cols_obj, categorias_objetivo, actuales, repartir(disponible, actuales)):
+                with col:
+                    st.metric(f"{cat_nombres[cat]} (máx./mes)", formato_moneda(convertir_moneda(maximo, moneda, tasas), moneda),
+                              f"{formato_moneda(convertir_moneda(maximo - actual, moneda, tasas), moneda)} vs. actual")
+            st.caption("Con el resto de sliders como están. Si eliges varias categorías, el monto se reparte "
+                       "en proporción a sus valores actuales.")
+
+        st.markdown("#### Por escenario, beca e inflación")
+        filas_obj = tabla_presets(presupuesto, categorias_objetivo, moneda, tasas_cambio=tasas)
+        df_obj = pd.DataFrame([{
+            "Escenario": f["preset"].capitalize(),
+            "Beca": "Sí" if f["descuento_matricula"] else "No",
+            "Inflación": f"{f['inflacion']:.0%}",
+            "Máximo mensual": formato_moneda(convertir_moneda(f["disponible_mensual"], moneda, tasas), moneda) if f["alcanza"] else "No alcanza",
+            "Nivel del escenario": formato_moneda(convertir_moneda(f["actual_mensual"], moneda, tasas), moneda)
+        } for f in filas_obj])
+        st.dataframe(df_obj, hide_index=True, use_container_width=True)
+
+        if ALMACEN:
+            grilla = ALMACEN["grilla"]
+            en_inflacion = np.isclose(grilla["inflacion"], inflacion)
+            caben = en_inflacion & (grilla["total_4_anos_eur"] <= float(presupuesto_en_eur(presupuesto, moneda, tasas)))
+            st.caption(f"{int(caben.sum()):,} de {int(en_inflacion.sum()):,} combinaciones precalculadas "
+                       f"(nivel, beca, opcionales, viajes) caben en el presupuesto con inflación {inflacion:.1%}.")
+
 # ============================================================
 # TABS DE VISUALIZACION
 # ============================================================
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Desglose", "📈 Proyección", "🥧 Distribución", "📋 Detalle"])
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📊 Desglose", "📈 Proyección", "🥧 Distribución", "📋 Detalle",
+                                              "🌪️ Sensibilidad", "🎯 Mi Presupuesto"])
 
 with tab1:
     col_chart, col_table = st.columns([2, 1])
@@ -609,27 +866,29 @@ with tab1:
         }
 
         categorias_chart = []
-        valores_chart = []
+        montos_chart = []
 
         for cat, nombre in cat_nombres.items():
             if cat in ajustes and ajustes[cat] > 0:
                 categorias_chart.append(nombre)
-                valores_chart.append(convertir_moneda(ajustes[cat], moneda, tasas))
+                montos_chart.append(ajustes[cat])
 
         for gasto in st.session_state.gastos_personalizados:
             if gasto["activo"]:
                 monto_mensual = gasto["monto"] if gasto["tipo"] == "mensual" else gasto["monto"] / 12
                 categorias_chart.append(f"✨ {gasto['nombre']}")
-                valores_chart.append(convertir_moneda(monto_mensual, moneda, tasas))
+                montos_chart.append(monto_mensual)
 
         mat_mensual = resultados["matricula_anual"] / 12
         categorias_chart.append("Matrícula")
-        valores_chart.append(convertir_moneda(mat_mensual, moneda, tasas))
+        montos_chart.append(mat_mensual)
+        valores_chart = convertir_moneda(montos_chart, moneda, tasas)
 
-        fig_barras = go.Figure(go.Bar(x=valores_chart, y=categorias_chart, orientation='h', marker_color='#667eea',
-                                      text=[formato_moneda(v, moneda) for v in valores_chart], textposition='auto'))
-        fig_barras.update_layout(title=f"Desglose Mensual ({moneda})", height=450, showlegend=False)
-        st.plotly_chart(fig_barras, use_container_width=True)
+        with tramo("grafico:barras", "grafico"):
+            fig_barras = go.Figure(go.Bar(x=valores_chart, y=categorias_chart, orientation='h', marker_color='#667eea',
+                                          text=[formato_moneda(v, moneda) for v in valores_chart], textposition='auto'))
+            fig_barras.update_layout(title=f"Desglose Mensual ({moneda})", height=450, showlegend=False)
+            st.plotly_chart(fig_barras, use_container_width=True)
 
     with col_table:
         st.markdown("#### Resumen Mensual")
@@ -637,16 +896,104 @@ with tab1:
         st.markdown(f"**TOTAL: {formato_moneda(convertir_moneda(total_con_mat, moneda, tasas), moneda)}**")
 
 with tab2:
-    df_proy = pd.DataFrame(resultados["proyeccion"])
-    fig_proy = go.Figure()
-    fig_proy.add_trace(go.Bar(x=df_proy["ano"], y=df_proy["matricula"].apply(lambda x: convertir_moneda(x, moneda, tasas)),
-                              name="Matrícula", marker_color="#1a365d"))
-    fig_proy.add_trace(go.Bar(x=df_proy["ano"], y=df_proy["gastos_vida"].apply(lambda x: convertir_moneda(x, moneda, tasas)),
-                              name="Gastos de Vida", marker_color="#667eea"))
-    fig_proy.add_trace(go.Scatter(x=df_proy["ano"], y=df_proy["total"].apply(lambda x: convertir_moneda(x, moneda, tasas)),
-                                  name="Total", mode="lines+markers", line=dict(color="#e53e3e", width=3)))
-    fig_proy.update_layout(title=f"Proyección {DATOS['perfil']['duracion_anos']} Años", barmode="stack", height=400)
-    st.plotly_chart(fig_proy, use_container_width=True)
+    # Vista en caché por (resultado, moneda, tasa): compartida, no modificar
+    df_proy = proyeccion_en_moneda(resultados, moneda, tasas)
+    with tramo("grafico:proyeccion", "grafico"):
+        fig_proy = go.Figure()
+        fig_proy.add_trace(go.Bar(x=df_proy["ano"], y=df_proy["matricula"],
+                                  name="Matrícula", marker_color="#1a365d"))
+        fig_proy.add_trace(go.Bar(x=df_proy["ano"], y=df_proy["gastos_vida"],
+                                  name="Gastos de Vida", marker_color="#667eea"))
+        fig_proy.add_trace(go.Scatter(x=df_proy["ano"], y=df_proy["total"],
+                                      name="Total", mode="lines+markers", line=dict(color="#e53e3e", width=3)))
+        fig_proy.update_layout(title=f"Proyección {DATOS['perfil']['duracion_anos']} Años", barmode="stack", height=400)
+        st.plotly_chart(fig_proy, use_container_width=True)
+
+    seccion_inflacion_estocastica(ajustes, resultados, inflacion, moneda, tasas, df_proy)
+
+    st.markdown("#### 📅 Flujo de Caja Mensual")
+    flujo = flujo_mensual_ajustes(ajustes, resultados, inflacion)
+    total_mes = totales_mensuales(flujo)[0]
+    componentes_flujo = {"Matrícula": serie_categoria(flujo, "matricula")[0],
+                         "Vuelos": serie_categoria(flujo, "vuelos_colombia")[0],
+                         "Emergencias": serie_categoria(flujo, "emergencias")[0]}
+    componentes_flujo = {"Gastos Mensuales": total_mes - sum(componentes_flujo.values()), **componentes_flujo}
+    colores_flujo = {"Gastos Mensuales": "#667eea", "Matrícula": "#1a365d", "Vuelos": "#ed8936", "Emergencias": "#a0aec0"}
+    with tramo("grafico:flujo", "grafico"):
+        fig_flujo = go.Figure()
+        series_flujo = convertir_moneda(np.vstack(list(componentes_flujo.values())), moneda, tasas)
+        for nombre, serie in zip(componentes_flujo, series_flujo):
+            fig_flujo.add_trace(go.Bar(x=flujo["meses"], y=serie,
+                                       name=nombre, marker_color=colores_flujo[nombre]))
+        fig_flujo.update_layout(title=f"Salida de Caja Mes a Mes ({moneda})", barmode="stack", height=400)
+        st.plotly_chart(fig_flujo, use_container_width=True)
+    mes_pico = int(total_mes.argmax())
+    st.caption(f"Mes de mayor gasto: {flujo['meses'][mes_pico]} "
+               f"({formato_moneda(convertir_moneda(total_mes[mes_pico], moneda, tasas), moneda)}). "
+               "Matrícula en plazos de septiembre y enero, vuelos en diciembre/junio y calefacción en invierno.")
+
+    if MONTECARLO:
+        conf_mc = MONTECARLO["configuracion"]
+        bandas = MONTECARLO["total_4_anos_eur"]
+        st.markdown("#### 🎲 Incertidumbre de Costos (Monte Carlo)")
+        col_p10, col_p50, col_p90 = st.columns(3)
+        with col_p10:
+            st.metric("P10 - Optimista", formato_moneda(convertir_moneda(bandas["p10"], moneda, tasas), moneda))
+        with col_p50:
+            st.metric("P50 - Mediana", formato_moneda(convertir_moneda(bandas["p50"], moneda, tasas), moneda))
+        with col_p90:
+            st.metric("P90 - Pesimista", formato_moneda(convertir_moneda(bandas["p90"], moneda, tasas), moneda))
+
+        anos_mc = [p["ano"] for p in MONTECARLO["por_ano"]]
+        p10_mc, p50_mc, p90_mc = convertir_moneda(
+            np.array([[p[c] for p in MONTECARLO["por_ano"]] for c in ("p10", "p50", "p90")]), moneda, tasas)
+        with tramo("grafico:montecarlo", "grafico"):
+            fig_mc = go.Figure()
+            fig_mc.add_trace(go.Scatter(x=anos_mc, y=p90_mc,
+                                        name="P90", mode="lines", line=dict(width=0), showlegend=False))
+            fig_mc.add_trace(go.Scatter(x=anos_mc, y=p10_mc,
+                                        name="P10-P90", mode="lines", line=dict(width=0), fill="tonexty",
+                                        fillcolor="rgba(102,126,234,0.3)"))
+            fig_mc.add_trace(go.Scatter(x=anos_mc, y=p50_mc,
+                                        name="P50", mode="lines+markers", line=dict(color="#1a365d", width=3)))
+            fig_mc.update_layout(title=f"Banda de Costo Anual ({moneda})", height=350)
+            st.plotly_chart(fig_mc, use_container_width=True)
+        st.caption(f"{conf_mc['trayectorias']:,} trayectorias simuladas sobre el preset "
+                   f"{conf_mc.get('preset', '').capitalize()} (rangos mín/medio/máx de la guía IE)")
+
+    if CAMBIO:
+        conf_cambio = CAMBIO["configuracion"]
+        # En EUR no hay riesgo cambiario: se muestra lo que paga la familia en COP
+        moneda_cambio = moneda if moneda != "EUR" else "COP"
+        par = f"EUR_{moneda_cambio}"
+        bandas = CAMBIO[f"total_4_anos_{moneda_cambio.lower()}"]
+        st.markdown(f"#### 💱 Riesgo Cambiario ({moneda_cambio})")
+        col_p10, col_p50, col_p90, col_fija = st.columns(4)
+        with col_p10:
+            st.metric("P10", formato_moneda(bandas["p10"], moneda_cambio))
+        with col_p50:
+            st.metric("P50 - Mediana", formato_moneda(bandas["p50"], moneda_cambio))
+        with col_p90:
+            st.metric("P90", formato_moneda(bandas["p90"], moneda_cambio))
+        with col_fija:
+            st.metric("Con tasa fija", formato_moneda(bandas["tasa_fija"], moneda_cambio),
+                      f"{bandas['prob_supera_tasa_fija']:.0%} de probabilidad de superarlo", delta_color="off")
+
+        tasas_mes = CAMBIO["tasas_mensuales"][par]
+        meses_cambio = etiquetas_meses(len(tasas_mes["p50"]) // 12)
+        with tramo("grafico:cambio", "grafico"):
+            fig_cambio = go.Figure()
+            fig_cambio.add_trace(go.Scatter(x=meses_cambio, y=tasas_mes["p90"], name="P90", mode="lines",
+                                            line=dict(width=0), showlegend=False))
+            fig_cambio.add_trace(go.Scatter(x=meses_cambio, y=tasas_mes["p10"], name="P10-P90", mode="lines",
+                                            line=dict(width=0), fill="tonexty", fillcolor="rgba(237,137,54,0.3)"))
+            fig_cambio.add_trace(go.Scatter(x=meses_cambio, y=tasas_mes["p50"], name="P50", mode="lines",
+                                            line=dict(color="#c05621", width=3)))
+            fig_cambio.update_layout(title=f"Tasa {par.replace('_', '/')} Simulada", height=350)
+            st.plotly_chart(fig_cambio, use_container_width=True)
+        st.caption(f"{conf_cambio['trayectorias']:,} trayectorias ({conf_cambio['metodo']}) sobre el flujo mensual "
+                   f"del preset {conf_cambio.get('preset', '').capitalize()}, calibradas con tasas de "
+                   f"{CAMBIO['metadata']['historico']['desde']} a {CAMBIO['metadata']['historico']['hasta']}")
 
 with tab3:
     grupos = {
@@ -660,16 +1007,15 @@ with tab3:
     labels_pie = [k for k, v in grupos.items() if v > 0]
     values_pie = [v for v in grupos.values() if v > 0]
 
-    fig_pie = px.pie(values=values_pie, names=labels_pie, title="Distribución Mensual",
-                     color_discrete_sequence=px.colors.sequential.Blues_r, hole=0.4)
-    st.plotly_chart(fig_pie, use_container_width=True)
+    with tramo("grafico:pie", "grafico"):
+        fig_pie = px.pie(values=values_pie, names=labels_pie, title="Distribución Mensual",
+                         color_discrete_sequence=px.colors.sequential.Blues_r, hole=0.4)
+        st.plotly_chart(fig_pie, use_container_width=True)
 
 with tab4:
     st.markdown("### Proyección Completa")
-    df_export = pd.DataFrame(resultados["proyeccion"])
-    df_export.columns = ["Año", "Matrícula", "Gastos Vida", "Emergencias", "Total"]
-    for col in ["Matrícula", "Gastos Vida", "Emergencias", "Total"]:
-        df_export[col] = df_export[col].apply(lambda x: convertir_moneda(x, moneda, tasas))
+    df_export = proyeccion_en_moneda(resultados, moneda, tasas).set_axis(
+        ["Año", "Matrícula", "Gastos Vida", "Emergencias", "Total"], axis=1)
 
     total_row = pd.DataFrame([{"Año": "TOTAL", "Matrícula": df_export["Matrícula"].sum(),
                                "Gastos Vida": df_export["Gastos Vida"].sum(), "Emergencias": df_export["Emergencias"].sum(),
@@ -682,10 +1028,131 @@ with tab4:
     st.dataframe(df_display, hide_index=True, use_container_width=True)
 
     csv = df_export.to_csv(index=False)
-    st.download_button("📥 Descargar CSV", csv, f"paulina_proyeccion_{moneda}.csv", "text/csv")
+    # Descargar no cambia nada de la página: sin rerun
+    st.download_button("📥 Descargar CSV", csv, f"paulina_proyeccion_{moneda}.csv", "text/csv", on_click="ignore")
+
+with tab5:
+    if not SENSIBILIDAD:
+        st.info("Genera el análisis con `python scripts/generar_datos.py --sensibilidad`")
+    else:
+        # En COP el tornado incluye el efecto de la tasa EUR/COP
+        tornado = SENSIBILIDAD["tornado"][moneda.lower()]
+        base_tornado = tornado["base"]
+        barras = [b for b in tornado["barras"] if b["impacto"] > 0][::-1]
+        etiquetas = [b["etiqueta"] for b in barras]
+
+        with tramo("grafico:tornado", "grafico"):
+            fig_tornado = go.Figure()
+            fig_tornado.add_trace(go.Bar(y=etiquetas, x=[b["total_min"] - base_tornado for b in barras], base=base_tornado,
+                                         orientation="h", name="Variable en mínimo", marker_color="#48bb78"))
+            fig_tornado.add_trace(go.Bar(y=etiquetas, x=[b["total_max"] - base_tornado for b in barras], base=base_tornado,
+                                         orientation="h", name="Variable en máximo", marker_color="#e53e3e"))
+            fig_tornado.update_layout(title=f"Sensibilidad del Total 4 Años ({moneda}) - Preset {SENSIBILIDAD['preset'].capitalize()}",
+                                      barmode="overlay", height=550)
+            st.plotly_chart(fig_tornado, use_container_width=True)
+        st.caption(f"Base: {formato_moneda(base_tornado, moneda)}. Cada variable recorre su rango mín-máx "
+                   "con el resto en su valor medio (tasas de cambio del generador).")
+
+        if "sobol" in SENSIBILIDAD:
+            sobol = SENSIBILIDAD["sobol"]["metricas"][moneda.lower()]
+            indices = [f for f in sobol["indices"] if f["total"] > 0.001][::-1]
+            with tramo("grafico:sobol", "grafico"):
+                fig_sobol = go.Figure()
+                fig_sobol.add_trace(go.Bar(y=[f["etiqueta"] for f in indices], x=[f["primer_orden"] for f in indices],
+                                           orientation="h", name="Primer orden", marker_color="#667eea"))
+                fig_sobol.add_trace(go.Bar(y=[f["etiqueta"] for f in indices], x=[f["total"] for f in indices],
+                                           orientation="h", name="Total (con interacciones)", marker_color="#1a365d"))
+                fig_sobol.update_layout(title=f"Índices de Sobol - Varianza del Total ({moneda})", barmode="group",
+                                        height=500, xaxis_tickformat=".0%")
+                st.plotly_chart(fig_sobol, use_container_width=True)
+            st.caption(f"Interacciones entre variables: {sobol['interacciones']:.1%} de la varianza "
+                       f"({SENSIBILIDAD['sobol']['n_base']:,} muestras base)")
+
+with tab6:
+    st.markdown("### 🎯 ¿Qué cabe en mi presupuesto?")
+    mi_presupuesto(ajustes, resultados, descuento_matricula, inflacion, moneda, tasas, cat_nombres)
 
 # ============================================================
 # FOOTER
 # ============================================================
 st.markdown("---")
 st.caption(f"Dashboard privado | Usuario: {st.session_state.user_email} | Datos guardados en la nube ☁️")
+
+# ============================================================
+# PANEL DE RENDIMIENTO (ADMIN)
+# ============================================================
+# Muestra los reruns ya terminados; el tiempo de dibujar el panel no se cuenta
+if recolectando():
+    historial = st.session_state.setdefault("rendimiento_reruns", deque(maxlen=RERUNS_PANEL))
+    rerun = terminar_recoleccion()
+    historial.append({"duracion_ms": rerun["duracion_ms"], "tramos": resumen(rerun["tramos"])})
+
+    with st.expander("⏱️ Rendimiento de la sesión", expanded=True):
+        duraciones = np.array([r["duracion_ms"] for r in historial])
+        col_ult, col_p50, col_p95, col_n = st.columns(4)
+        with col_ult:
+            st.metric("Último rerun", f"{duraciones[-1]:,.1f} ms")
+        with col_p50:
+            st.metric("P50", f"{np.percentile(duraciones, 50):,.1f} ms")
+        with col_p95:
+            st.metric("P95", f"{np.percentile(duraciones, 95):,.1f} ms")
+        with col_n:
+            st.metric("Reruns medidos", f"{len(duraciones):,}")
+
+        col_etapas, col_hist = st.columns(2)
+        with col_etapas:
+            df_etapas = pd.DataFrame([
+                {"Rerun": i + 1, "Etapa": nombre.split(":", 1)[1], "ms": datos["total_ms"]}
+                for i, r in enumerate(historial) for nombre, datos in r["tramos"].items()
+                if datos["categoria"] == "etapa"
+            ])
+            if not df_etapas.empty:
+                fig_etapas = px.bar(df_etapas, x="Rerun", y="ms", color="Etapa", title="Tiempo por Etapa (ms)")
+                fig_etapas.update_layout(height=350)
+                st.plotly_chart(fig_etapas, use_container_width=True)
+        with col_hist:
+            fig_hist = px.histogram(x=duraciones, nbins=30, title=f"Latencia de los Últimos {len(duraciones)} Reruns")
+            fig_hist.update_layout(height=350, xaxis_title="ms", yaxis_title="Reruns", showlegend=False)
+            st.plotly_chart(fig_hist, use_container_width=True)
+
+        st.markdown("#### Desglose del último rerun")
+        st.dataframe(pd.DataFrame([
+            {"Tramo": nombre, "Categoría": datos["categoria"], "Llamadas": datos["llamadas"],
+             "Total (ms)": round(datos["total_ms"], 2), "Máx. (ms)": round(datos["max_ms"], 2)}
+            for nombre, datos in historial[-1]["tramos"].items()
+        ]), hide_index=True, use_container_width=True)
+
+        fragmentos = st.session_state.get("rendimiento_fragmentos")
+        if fragmentos:
+            st.markdown("#### Reruns parciales (fragmentos)")
+            por_fragmento = pd.DataFrame(list(fragmentos)).groupby("fragmento")["duracion_ms"]
+            st.dataframe(pd.DataFrame({
+                "Reruns": por_fragmento.size(), "P50 (ms)": por_fragmento.median().round(2),
+                "Máx. (ms)": por_fragmento.max().round(2)
+            }).rename_axis("Fragmento").reset_index(), hide_index=True, use_container_width=True)
+
+        st.markdown("#### Cachés (todo el proceso)")
+        cuentas = contadores()
+        caches_motor = info_caches()
+        cache_proyecciones, cache_series = caches_motor["proyecciones"], caches_motor["series"]
+        filas_cache = [(nombre, cuentas.get(f"datos:{nombre}:llamadas", 0), cuentas.get(f"datos:{nombre}:fallos", 0))
+                       for nombre in ("cargar_datos_base", "cargar_escenarios")]
+        # Fallos de proyectar = proyecciones calculadas (estado canónico no visto o desalojado)
+        filas_cache.append(("proyectar", cache_proyecciones["hits"] + cache_proyecciones["misses"],
+                            cache_proyecciones["misses"]))
+        vistas = info_vistas()
+        filas_cache.append(("vistas_moneda", vistas["hits"] + vistas["misses"], vistas["misses"]))
+        for col, (nombre, llamadas, fallos) in zip(st.columns(len(filas_cache)), filas_cache):
+            with col:
+                st.metric(nombre, f"{(llamadas - fallos) / llamadas:.0%} aciertos" if llamadas else "Sin llamadas",
+                          f"{llamadas:,} llamadas, {fallos:,} fallos", delta_color="off")
+        st.caption(f"Proyecciones en caché: {cache_proyecciones['currsize']:,} de {cache_proyecciones['maxsize']:,} "
+                   f"estados, {cache_proyecciones['evictions']:,} desalojados. Series reusadas al calcular: "
+                   f"matrícula {cache_series['matricula']['hits']:,}, "
+                   f"gastos de vida {cache_series['gastos_vida']['hits']:,}.")
+        grilla_motor = caches_motor["grilla"]
+        st.caption(f"Proyecciones calculadas: {grilla_motor['consultas']:,} por índice en la grilla de sliders, "
+                   f"{grilla_motor['en_vivo']:,} en vivo"
+                   + ("." if grilla_motor["activa"] else " (sin grilla: generar_datos.py --grilla-sliders)."))
+        st.caption("Tiempos del servidor para esta sesión, sin el envío al navegador. Las cachés son "
+                   "compartidas por todas las sesiones del proceso.")
@@ -0,0 +1,150 @@
+"""
+Motor de proyección del dashboard - Presupuesto Paulina Madrid IE
+- Usa el mismo núcleo en céntimos que generar_datos.py (evaluar_centimos),
+  así que el dashboard muestra al céntimo las mismas cifras que el JSON y
+  el Excel (misma política de redondeo, ver scripts/centimos.py).
+- Un rerun cuyos inputs de proyección no cambiaron (moneda, tasas, expanders,
+  formularios) devuelve el resultado anterior sin recalcular.
+- La caché LRU (acotada a MAX_ESTADOS) se indexa por el estado canónico: las
+  entradas en las unidades enteras del núcleo (céntimos, puntos básicos).
+  Volver a un preset o a una posición de sliders ya vista, o la misma
+  configuración en otra sesión, es un acierto aunque los floats difieran
+  (p. ej. la suma de gastos personalizados en otro orden).
+La caché vive a nivel de proceso, así que sobrevive a los reruns de
+Streamlit y se comparte entre sesiones. Los resultados se comparten: no
+modificarlos.
+- Un fallo reusa las series por componente que no cambiaron: la matrícula
+  solo depende de (descuento, inflación) y los gastos de vida de (mensual,
+  vuelos, inflación). No hay forma cerrada para la serie: cada año se
+  redondea al céntimo (política de centimos.inflactar).
+- Con la grilla de sliders precalculada (usar_grilla, ver scripts/grilla_sliders.py)
+  un fallo de caché se responde por índice; los estados fuera de la grilla
+  (p. ej. gastos personalizados con céntimos) se calculan en vivo.
+Requiere scripts/ en sys.path (lo agrega app.py).
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+
+from centimos import CENTIMOS, a_centimos, a_puntos, dividir, escalar, serie_anual
+from grilla_sliders import consultar
+
+MAX_ESTADOS = 8192    # Proyecciones en caché por proceso (~3 KB cada una, ~24 MB en total)
+MAX_SERIES = 4096     # Series por componente en caché (tuplas de anos enteros)
+MAX_MONTOS = 1024     # Montos y tasas de los sliders ya pasados a céntimos / puntos básicos
+
+_proyecciones = OrderedDict()  # estado canónico -> resultado
+_estadisticas = {"hits": 0, "misses": 0, "evictions": 0}
+_grilla = {"grilla": None, "consultas": 0, "en_vivo": 0}
+
+# Los sliders repiten unos pocos montos y tasas: su conversión a enteros se recuerda
+_centimos = lru_cache(maxsize=MAX_MONTOS)(a_centimos)
+_puntos = lru_cache(maxsize=MAX_MONTOS)(a_puntos)
+
+# ============================================================
+# ESTADO CANONICO
+# ============================================================
+def estado_canonico(matricula_base, descuento, total_mensual, costo_vuelo, vuelos_por_ano,
+                    pct_emergencias, inflacion, anos, ano_inicio) -> tuple:
+    """Entradas de la proyección tal como las redondea evaluar_centimos: mismo estado, mismas cifras"""
+    return (_centimos(matricula_base), _puntos(descuento), _centimos(total_mensual), _centimos(costo_vuelo),
+            int(vuelos_por_ano), _puntos(pct_emergencias), _puntos(inflacion), int(anos), int(ano_inicio))
+
+# ============================================================
+# SERIES POR COMPONENTE
+# ============================================================
+# Cada componente se guarda solo con las entradas de las que depende: mover un slider
+# de gastos reusa la matrícula, y cambiar descuento o emergencias reusa los gastos de vida.
+# Mismas cuentas que evaluar_centimos + proyectar_lote (ver scripts/generar_datos.py).
+@lru_cache(maxsize=MAX_SERIES)
+def serie_matricula(matricula_base: int, descuento: int, inflacion: int, anos: int) -> tuple:
+    return serie_anual(matricula_base - escalar(matricula_base, descuento), inflacion, anos)
+
+@lru_cache(maxsize=MAX_SERIES)
+def serie_gastos_vida(mensual: int, costo_vuelo: int, vuelos_por_ano: int, inflacion: int, anos: int) -> tuple:
+    return serie_anual(mensual * 12 + costo_vuelo * vuelos_por_ano, inflacion, anos)
+
+def _componentes(estado) -> tuple:
+    matricula_base, descuento, mensual, costo_vuelo, vuelos_por_ano, pct_emergencias, inflacion, anos, _ = estado
+    if _grilla["grilla"] is not None:
+        componentes = consultar(_grilla["grilla"], *estado[:-1])
+        if componentes is not None:
+            _grilla["consultas"] += 1
+            return componentes
+    _grilla["en_vivo"] += 1
+    matricula = serie_matricula(matricula_base, descuento, inflacion, anos)
+    gastos_vida = serie_gastos_vida(mensual, costo_vuelo, vuelos_por_ano, inflacion, anos)
+    emergencias = serie_anual(escalar(matricula[0] + gastos_vida[0], pct_emergencias), inflacion, anos)
+    return matricula, gastos_vida, emergencias
+
+# ============================================================
+# PROYECCION COMPLETA
+# ============================================================
+def proyectar(matricula_base, descuento, total_mensual, costo_vuelo, vuelos_por_ano,
+              pct_emergencias, inflacion, anos, ano_inicio) -> dict:
+    """Mismas cifras que calcular_escenario, con la estructura que usa el dashboard"""
+    estado = estado_canonico(matricula_base, descuento, total_mensual, costo_vuelo, vuelos_por_ano,
+                             pct_emergencias, inflacion, anos, ano_inicio)
+    resultado = _proyecciones.get(estado)
+    if resultado is not None:
+        _proyecciones.move_to_end(estado)
+        _estadisticas["hits"] += 1
+        return resultado
+
+    _estadisticas["misses"] += 1
+    resultado = _proyectar_estado(estado)
+    _proyecciones[estado] = resultado
+    if len(_proyecciones) > MAX_ESTADOS:
+        _proyecciones.popitem(last=False)
+        _estadisticas["evictions"] += 1
+    return resultado
+
+def _proyectar_estado(estado) -> dict:
+    matricula_base, _, mensual, costo_vuelo, vuelos_por_ano, _, _, anos, ano_inicio = estado
+    matricula, gastos_vida, emergencias = _componentes(estado)
+
+    # Totales como en evaluar_centimos: suma exacta de los componentes ya redondeados
+    totales = tuple([m + g + e for m, g, e in zip(matricula, gastos_vida, emergencias)])
+    total = sum(totales)
+    # Todo son int de Python (series y grilla): a EUR dividiendo, como a_euros
+    return {
+        "matricula_anual": matricula[0] / CENTIMOS,
+        "ahorro_beca": (matricula_base - matricula[0]) * anos / CENTIMOS,
+        "total_mensual": mensual / CENTIMOS, "vuelos_anual": costo_vuelo * vuelos_por_ano / CENTIMOS,
+        "emergencias_anual": emergencias[0] / CENTIMOS, "total_anual_ano1": totales[0] / CENTIMOS,
+        "anos": tuple(range(ano_inicio, ano_inicio + anos)),
+        "proyeccion_centimos": {"matricula": matricula, "gastos_vida": gastos_vida, "emergencias": emergencias,
+                                "total": totales},
+        "total_4_anos": total / CENTIMOS,
+        "promedio_anual": dividir(total, anos) / CENTIMOS, "promedio_mensual": dividir(total, anos * 12) / CENTIMOS
+    }
+
+def usar_grilla(grilla):
+    """Grilla de grilla_sliders.abrir_grilla() para responder los fallos por índice (None: siempre en vivo)"""
+    _grilla["grilla"] = grilla
+
+# ============================================================
+# ESTADISTICAS
+# ============================================================
+def info_caches() -> dict:
+    """
+    Aciertos, fallos y ocupación de las cachés del motor (desde el último
+    limpiar_caches). Los fallos de "proyecciones" son las proyecciones
+    calculadas: por índice en la grilla ("consultas") o en vivo, reusando
+    las series por componente ya vistas.
+    """
+    proyecciones = {"hits": _estadisticas["hits"], "misses": _estadisticas["misses"],
+                    "currsize": len(_proyecciones), "maxsize": MAX_ESTADOS,
+                    "evictions": _estadisticas["evictions"]}
+    series = {"matricula": serie_matricula.cache_info()._asdict(),
+              "gastos_vida": serie_gastos_vida.cache_info()._asdict()}
+    grilla = {"activa": _grilla["grilla"] is not None, "consultas": _grilla["consultas"],
+              "en_vivo": _grilla["en_vivo"]}
+    return {"proyecciones": proyecciones, "series": series, "grilla": grilla}
+
+def limpiar_caches():
+    _proyecciones.clear()
+    _estadisticas["hits"] = _estadisticas["misses"] = _estadisticas["evictions"] = 0
+    serie_matricula.cache_clear()
+    serie_gastos_vida.cache_clear()
+    _grilla["consultas"] = _grilla["en_vivo"] = 0
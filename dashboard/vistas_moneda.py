@@ -0,0 +1,86 @@
+"""
+Conversión de moneda del dashboard - Presupuesto Paulina Madrid IE
+- Convierte escalares o arrays completos en una sola operación vectorizada,
+  con la misma conversión al céntimo que total_4_anos_usd/cop del JSON y
+  del Excel (scripts/centimos.py): céntimos de EUR x tasa en puntos
+  básicos, half-up.
+- proyeccion_en_moneda() guarda la tabla de proyección ya convertida por
+  (resultado, moneda, tasa) en una LRU acotada a MAX_VISTAS: cambiar entre
+  EUR/USD/COP y volver no recalcula nada, y una moneda o tasa nueva solo
+  cuesta una multiplicación de la matriz de céntimos.
+- motor_proyeccion devuelve el mismo objeto para el mismo estado, así que
+  la identidad del resultado sirve de clave; cada entrada guarda el
+  resultado para que su id no se reutilice mientras vive. Las vistas se
+  comparten entre reruns y sesiones: no modificarlas.
+Requiere scripts/ en sys.path (lo agrega app.py).
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from centimos import a_centimos, a_euros, a_puntos, escalar
+
+MAX_VISTAS = 256  # Tablas convertidas en caché por proceso
+MONEDAS_CONVERTIBLES = ("USD", "COP")
+COLUMNAS_PROYECCION = ["matricula", "gastos_vida", "emergencias", "total"]
+
+_vistas = OrderedDict()  # (id(resultado), moneda, puntos) -> (resultado, vista)
+_estadisticas = {"hits": 0, "misses": 0}
+
+# ============================================================
+# CONVERSION VECTORIZADA
+# ============================================================
+def puntos_cambio(moneda, tasas):
+    """Tasa EUR -> moneda en puntos básicos; None si no hay conversión (EUR)"""
+    if moneda not in MONEDAS_CONVERTIBLES:
+        return None
+    return int(a_puntos(tasas[f"EUR_{moneda}"]))
+
+def convertir_valores(valores, moneda, tasas):
+    """EUR -> moneda para un escalar o un array de cualquier forma (listas y tuplas incluidas)"""
+    puntos = puntos_cambio(moneda, tasas)
+    if isinstance(valores, (list, tuple)):
+        valores = np.asarray(valores, dtype=np.float64)
+    if puntos is None:
+        return valores
+    return a_euros(escalar(a_centimos(valores), puntos))
+
+# ============================================================
+# VISTAS CONVERTIDAS
+# ============================================================
+def proyeccion_en_moneda(resultados, moneda, tasas) -> pd.DataFrame:
+    """resultados["proyeccion_centimos"] como DataFrame (ano + COLUMNAS_PROYECCION) en la moneda pedida"""
+    puntos = puntos_cambio(moneda, tasas)
+    clave = (id(resultados), moneda if puntos is not None else "EUR", puntos)
+    entrada = _vistas.get(clave)
+    if entrada is not None and entrada[0] is resultados:
+        _vistas.move_to_end(clave)
+        _estadisticas["hits"] += 1
+        return entrada[1]
+
+    _estadisticas["misses"] += 1
+    proyeccion = resultados["proyeccion_centimos"]
+    centimos = np.array([proyeccion[c] for c in COLUMNAS_PROYECCION], dtype=np.int64).T
+    if puntos is not None:
+        centimos = escalar(centimos, puntos)
+    vista = pd.DataFrame(a_euros(centimos), columns=COLUMNAS_PROYECCION)
+    vista.insert(0, "ano", resultados["anos"])
+
+    _vistas[clave] = (resultados, vista)
+    if len(_vistas) > MAX_VISTAS:
+        _vistas.popitem(last=False)
+    return vista
+
+# ============================================================
+# ESTADISTICAS
+# ============================================================
+def info_vistas() -> dict:
+    """Aciertos, fallos y ocupación de la caché de vistas (desde el último limpiar_vistas)"""
+    return {"hits": _estadisticas["hits"], "misses": _estadisticas["misses"],
+            "currsize": len(_vistas), "maxsize": MAX_VISTAS}
+
+def limpiar_vistas():
+    _vistas.clear()
+    _estadisticas["hits"] = _estadisticas["misses"] = 0
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Almacen columnar de escenarios - alternativa binaria a escenarios_paulina.json.
+Cada columna es un .npy independiente que se abre con memoria mapeada
+(np.load(mmap_mode="r")): abrir el almacen no parsea ni copia datos, solo se
+leen del disco las paginas que se usan.
+
+El almacen se escribe completo en un directorio temporal y se pone en lugar
+del anterior con renombres (reemplazar): los .npy que un lector ya tiene
+mapeados no se truncan nunca, siguen siendo los del almacen viejo.
+
+Estructura de output/escenarios_columnar/:
+  esquema.json               version, fecha, tablas y columnas
+  <tabla>.<columna>.npy      un array por columna, primera dimension = filas
+
+Tablas:
+  presets  una fila por escenario predefinido (orden de PRESETS)
+  grilla   producto cartesiano nivel x descuento x opcionales x viajes x inflacion
+
+Columnas de ambas tablas:
+  nivel (int8, indice en NIVELES), descuento_matricula (bool),
+  opcionales (uint8, mascara segun OPCIONALES), viajes_por_ano (int8),
+  inflacion (float64) y los resultados de calcular_escenarios_lote sin
+  redondear (float64): matricula_anual, gastos_mensuales, vuelos_anual,
+  gastos_vida_anual, porcentaje_emergencias, emergencias_anual, total_anual,
+  total_4_anos_eur/usd/cop, promedio_anual, promedio_mensual y
+  proyeccion_<componente> con forma (filas x duracion_anos).
+  presets agrega clave (<U16, clave en PRESETS).
+Genera: escenarios_columnar/
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from generar_datos import (PERFIL, SUPUESTOS, PRESETS, NIVELES, OPCIONALES, OUTPUT_DIR,
+                           calcular_escenarios_lote, grilla_parametros, mascara_opcionales)
+
+VERSION_ALMACEN = 1
+DIRECTORIO_ALMACEN = OUTPUT_DIR / "escenarios_columnar"
+
+# Inflaciones de la grilla: 0% a 8% en pasos de 0,5 puntos (los del slider del dashboard)
+INFLACIONES_GRILLA = tuple(float(i) / 1000 for i in range(0, 81, 5))
+
+TIPOS_PARAMETROS = {
+    "nivel": np.int8,
+    "descuento_matricula": np.bool_,
+    "opcionales": np.uint8,
+    "viajes_por_ano": np.int8,
+    "inflacion": np.float64
+}
+
+# ============================================================
+# ESCRITURA
+# ============================================================
+
+def _columnas_escenarios(nivel, descuento_matricula, opcionales, viajes_por_ano, inflacion) -> dict:
+    """Parametros + resultados del modelo vectorizado como columnas planas"""
+    parametros = {"nivel": nivel, "descuento_matricula": descuento_matricula, "opcionales": opcionales,
+                  "viajes_por_ano": viajes_por_ano, "inflacion": inflacion}
+    columnas = {k: np.asarray(v).astype(TIPOS_PARAMETROS[k]) for k, v in parametros.items()}
+    n = len(columnas["nivel"])
+
+    resultado = calcular_escenarios_lote(niveles=nivel, descuento_matricula=descuento_matricula,
+                                         opcionales=opcionales, viajes_por_ano=viajes_por_ano,
+                                         inflacion=inflacion)
+    for componente, valores in resultado.pop("proyeccion_anual").items():
+        columnas[f"proyeccion_{componente}"] = valores
+    for clave, valores in resultado.items():
+        columnas[clave] = np.broadcast_to(np.asarray(valores, dtype=np.float64), (n,))
+    return columnas
+
+
+def columnas_presets() -> dict:
+    claves = list(PRESETS)
+    columnas = _columnas_escenarios(
+        nivel=[NIVELES.index(PRESETS[c]["nivel"]) for c in claves],
+        descuento_matricula=[PRESETS[c]["descuento_matricula"] for c in claves],
+        opcionales=[mascara_opcionales(PRESETS[c]["incluir_opcionales"]) for c in claves],
+        viajes_por_ano=[PRESETS[c]["viajes_por_ano"] for c in claves],
+        inflacion=[SUPUESTOS["inflacion_espana"]] * len(claves)
+    )
+    return {"clave": np.array(claves, dtype="<U16"), **columnas}
+
+
+def columnas_grilla(inflaciones=INFLACIONES_GRILLA) -> dict:
+    grilla = grilla_parametros(inflaciones=inflaciones)
+    return _columnas_escenarios(grilla["niveles"], grilla["descuento_matricula"], grilla["opcionales"],
+                                grilla["viajes_por_ano"], grilla["inflacion"])
+
+
+def reemplazar(temporal: Path, destino: Path):
+    """
+    Deja el artefacto nuevo en su lugar de una vez (archivo o directorio).
+    Un directorio existente se renombra a <destino>.viejo y se borra: los
+    archivos mapeados por otro proceso siguen vivos hasta que los cierre.
+    """
+    if temporal.is_dir() and destino.exists():
+        viejo = destino.with_name(destino.name + ".viejo")
+        shutil.rmtree(viejo, ignore_errors=True)
+        destino.rename(viejo)
+        temporal.rename(destino)
+        shutil.rmtree(viejo)
+    else:
+        os.replace(temporal, destino)
+
+
+def guardar_almacen(directorio=None, inflaciones=INFLACIONES_GRILLA):
+    """
+    Escribe las tablas presets y grilla en <directorio>.tmp y lo pone en
+    lugar del almacen anterior con reemplazar: nunca se escribe sobre un
+    .npy existente, que el dashboard puede tener mapeado en memoria.
+    """
+    directorio = Path(directorio or DIRECTORIO_ALMACEN)
+    temporal = directorio.with_name(directorio.name + ".tmp")
+    shutil.rmtree(temporal, ignore_errors=True)
+    temporal.mkdir(parents=True)
+
+    tablas = {}
+    for tabla, columnas in (("presets", columnas_presets()), ("grilla", columnas_grilla(inflaciones))):
+        descripcion = {}
+        for nombre, valores in columnas.items():
+            archivo = f"{tabla}.{nombre}.npy"
+            valores = np.ascontiguousarray(valores)
+            np.save(temporal / archivo, valores)
+            descripcion[nombre] = {"archivo": archivo, "dtype": valores.dtype.str, "forma": list(valores.shape)}
+        tablas[tabla] = {"filas": len(columnas["nivel"]), "columnas": descripcion}
+
+    esquema = {
+        "version": VERSION_ALMACEN,
+        "fecha_generacion": datetime.now().isoformat(),
+        "niveles": list(NIVELES),
+        "opcionales": list(OPCIONALES),
+        "ano_inicio": PERFIL["ano_inicio"],
+        "duracion_anos": PERFIL["duracion_anos"],
+        "tablas": tablas
+    }
+    with open(temporal / "esquema.json", "w", encoding="utf-8") as f:
+        json.dump(esquema, f, indent=2, ensure_ascii=False)
+    reemplazar(temporal, directorio)
+    return directorio
+
+# ============================================================
+# LECTURA
+# ============================================================
+
+def abrir_almacen(directorio=None, mmap: bool = True) -> dict:
+    """
+    {"esquema": ..., "<tabla>": {"<columna>": array}} con cada columna
+    mapeada en memoria (solo lectura). None si no hay almacen.
+    """
+    directorio = directorio or DIRECTORIO_ALMACEN
+    ruta_esquema = directorio / "esquema.json"
+    if not ruta_esquema.exists():
+        return None
+    with open(ruta_esquema, "r", encoding="utf-8") as f:
+        esquema = json.load(f)
+    if esquema["version"] != VERSION_ALMACEN:
+        return None
+
+    almacen = {"esquema": esquema}
+    for tabla, info in esquema["tablas"].items():
+        almacen[tabla] = {nombre: np.load(directorio / col["archivo"], mmap_mode="r" if mmap else None)
+                          for nombre, col in info["columnas"].items()}
+    return almacen
+
+
+def preset_desde_almacen(almacen: dict, clave: str) -> dict:
+    """Nivel y opcionales de un preset, con la forma de escenarios_paulina.json"""
+    presets = almacen["presets"]
+    fila = int(np.flatnonzero(presets["clave"] == clave)[0])
+    mascara = int(presets["opcionales"][fila])
+    return {
+        "nivel": almacen["esquema"]["niveles"][presets["nivel"][fila]],
+        "configuracion": {
+            "descuento_matricula": bool(presets["descuento_matricula"][fila]),
+            "viajes_por_ano": int(presets["viajes_por_ano"][fila]),
+            "incluir_opcionales": {c: bool(mascara & (1 << bit))
+                                   for bit, c in enumerate(almacen["esquema"]["opcionales"])}
+        },
+        "totales": {"total_4_anos_eur": float(presets["total_4_anos_eur"][fila])}
+    }
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Aritmetica de punto fijo para el modelo de costos - montos en centimos int64.
+El motor (calcular_escenario, evaluar_parametros y el motor del dashboard)
+hace todas las cuentas en enteros y solo convierte a EUR al final, asi que
+JSON, Excel y dashboard muestran exactamente las mismas cifras y las filas
+de una tabla suman exactamente su total.
+
+Politica de redondeo (unica, half-up al centimo en cada paso):
+- Montos de entrada: EUR -> centimos (a_centimos).
+- Tasas (descuento, emergencias, inflacion, tipo de cambio) en unidades de
+  1/ESCALA_TASA (puntos basicos: 0,01%); el tipo de cambio se cuantiza igual.
+- Descuento y % de emergencias: monto x tasa, redondeado al centimo.
+- Inflacion: cada componente del ano t es el del ano t-1 x (1 + i),
+  redondeado al centimo (actualizacion anual de precios, paso a paso).
+- Totales: suma exacta de los componentes ya redondeados.
+- Conversion a USD/COP y promedios: una sola division redondeada al final.
+"""
+
+import math
+
+import numpy as np
+
+ESCALA_TASA = 10_000  # 1 unidad = 1 punto basico (0,01%)
+CENTIMOS = 100
+
+# Cada funcion acepta escalares o arrays: con escalares usa enteros de Python
+# (el camino de calcular_escenario y del dashboard, sin costo fijo de numpy),
+# con arrays opera en int64 vectorizado. Ambos caminos dan las mismas cifras.
+
+
+_TIPOS_ARRAY = (np.ndarray, list, tuple)
+
+
+def _es_array(*valores) -> bool:
+    for valor in valores:
+        if isinstance(valor, _TIPOS_ARRAY):
+            return True
+    return False
+
+
+def _redondear(valores, escala: int):
+    # Un int ya es exacto (montos de los sliders): sin pasar por float
+    if type(valores) is int:
+        return valores * escala
+    # round(.., 6) absorbe el error binario (0.285 * 100 = 28.499999...) antes del half-up
+    if _es_array(valores):
+        return np.floor(np.round(np.asarray(valores, dtype=np.float64) * escala, 6) + 0.5).astype(np.int64)
+    return math.floor(round(float(valores) * escala, 6) + 0.5)
+
+
+def a_centimos(euros):
+    """EUR (float) -> centimos enteros, half-up"""
+    return _redondear(euros, CENTIMOS)
+
+
+def a_puntos(tasa):
+    """Tasa (0.03) -> unidades enteras de 1/ESCALA_TASA (300), half-up"""
+    return _redondear(tasa, ESCALA_TASA)
+
+
+def a_euros(centimos):
+    """Centimos -> EUR float (siempre con a lo sumo 2 decimales exactos al imprimir)"""
+    if isinstance(centimos, int):
+        return centimos / CENTIMOS
+    if _es_array(centimos):
+        return np.asarray(centimos) / CENTIMOS
+    return int(centimos) / CENTIMOS
+
+
+def entero(valores):
+    """Cantidades enteras (viajes): int o array int64"""
+    return np.asarray(valores, dtype=np.int64) if _es_array(valores) else int(valores)
+
+
+def escalar(centimos, numerador, denominador: int = ESCALA_TASA):
+    """centimos x numerador / denominador con redondeo half-up, en enteros"""
+    if type(centimos) is int and type(numerador) is int:
+        return (centimos * numerador + denominador // 2) // denominador
+    if _es_array(centimos, numerador):
+        centimos = np.asarray(centimos, dtype=np.int64)
+        numerador = np.asarray(numerador, dtype=np.int64)
+    else:
+        centimos, numerador = int(centimos), int(numerador)
+    return (centimos * numerador + denominador // 2) // denominador
+
+
+def aplicar_tasa(centimos, tasa):
+    """Porcentaje de un monto (descuento, emergencias), redondeado al centimo"""
+    return escalar(centimos, a_puntos(tasa))
+
+
+def inflactar(centimos, inflacion, anos: int):
+    """
+    Valor de cada ano: el ano 1 es el monto dado y cada ano siguiente es el
+    anterior x (1 + inflacion), redondeado al centimo. Con escalares devuelve
+    una tupla de anos enteros; con arrays, un array (... x anos) int64.
+    """
+    puntos = a_puntos(inflacion)
+    if not _es_array(centimos, puntos):
+        return serie_anual(int(centimos), puntos, anos)
+
+    factor = ESCALA_TASA + puntos
+    valor = np.asarray(centimos, dtype=np.int64)
+    forma = np.broadcast(valor, factor).shape
+    anual = np.empty(forma + (anos,), dtype=np.int64)
+    valor = np.broadcast_to(valor, forma)
+    for i in range(anos):
+        anual[..., i] = valor
+        valor = escalar(valor, factor)
+    return anual
+
+
+def serie_anual(centimos: int, inflacion_puntos: int, anos: int) -> tuple:
+    """Camino escalar de inflactar con la inflacion ya en puntos (enteros de Python, sin validar)"""
+    factor = ESCALA_TASA + inflacion_puntos
+    valores = [centimos]
+    for _ in range(anos - 1):
+        valores.append((valores[-1] * factor + ESCALA_TASA // 2) // ESCALA_TASA)  # escalar()
+    return tuple(valores)
+
+
+def convertir(centimos, tasa_cambio):
+    """Centimos de EUR -> centimos de otra moneda (tasa cuantizada a 1/ESCALA_TASA)"""
+    return escalar(centimos, a_puntos(tasa_cambio))
+
+
+def dividir(centimos, divisor):
+    """Division entera half-up (promedios anuales/mensuales)"""
+    return escalar(centimos, 1, divisor)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Resumenes estadisticos en streaming para simulaciones de gran tamano.
+- TDigest: cuantiles aproximados en memoria constante, combinable entre bloques.
+- EstadisticasCorrientes: media/varianza/min/max por componente (Chan et al.).
+Ambos se serializan a dict para guardarse en JSON y volver a combinarse.
+"""
+
+import numpy as np
+
+# ============================================================
+# T-DIGEST
+# ============================================================
+
+class TDigest:
+    """
+    t-digest con funcion de escala k1 y compresion vectorizada.
+    Cada centroide cubre a lo sumo una unidad del espacio k, por lo que las
+    colas quedan con centroides pequenos y los cuantiles extremos son precisos.
+    """
+
+    def __init__(self, compresion: float = 200):
+        self.compresion = compresion
+        self.medias = np.empty(0)
+        self.pesos = np.empty(0)
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+    @property
+    def n(self) -> float:
+        return float(self.pesos.sum())
+
+    def agregar(self, valores, pesos=None):
+        """Agrega un lote de observaciones y comprime"""
+        valores = np.asarray(valores, dtype=np.float64).ravel()
+        if valores.size == 0:
+            return self
+        pesos = np.ones_like(valores) if pesos is None else np.asarray(pesos, dtype=np.float64).ravel()
+        self.minimo = min(self.minimo, float(valores.min()))
+        self.maximo = max(self.maximo, float(valores.max()))
+        self._comprimir(np.concatenate([self.medias, valores]), np.concatenate([self.pesos, pesos]))
+        return self
+
+    def combinar(self, otro: "TDigest"):
+        """
+        Absorbe otro digest. La fusion es aproximada: otra particion en
+        bloques da otros centroides (y cuantiles algo distintos, dentro del
+        error del t-digest). Solo es reproducible con la misma particion.
+        """
+        if otro.pesos.size == 0:
+            return self
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self._comprimir(np.concatenate([self.medias, otro.medias]),
+                        np.concatenate([self.pesos, otro.pesos]))
+        return self
+
+    def _comprimir(self, medias, pesos):
+        orden = np.argsort(medias, kind="stable")
+        medias, pesos = medias[orden], pesos[orden]
+        total = pesos.sum()
+        q_centro = (np.cumsum(pesos) - pesos / 2) / total
+        k = self.compresion / (2 * np.pi) * np.arcsin(2 * q_centro - 1)
+        grupos = np.floor(k - k[0]).astype(np.int64)
+        inicios = np.flatnonzero(np.diff(grupos, prepend=-1))
+
+        self.pesos = np.add.reduceat(pesos, inicios)
+        self.medias = np.add.reduceat(medias * pesos, inicios) / self.pesos
+
+    def _posiciones(self):
+        """Eje (peso acumulado, valor) para interpolar, acotado por min y max"""
+        total = self.pesos.sum()
+        centros = np.cumsum(self.pesos) - self.pesos / 2
+        pos = np.concatenate([[0.0], centros, [total]])
+        val = np.concatenate([[self.minimo], self.medias, [self.maximo]])
+        return pos, val, total
+
+    def cuantil(self, q):
+        """Cuantil(es) aproximado(s), q en [0, 1]"""
+        pos, val, total = self._posiciones()
+        return np.interp(np.asarray(q, dtype=np.float64) * total, pos, val)
+
+    def percentil(self, p):
+        return self.cuantil(np.asarray(p, dtype=np.float64) / 100)
+
+    def cdf(self, x):
+        """Fraccion aproximada de observaciones <= x"""
+        pos, val, total = self._posiciones()
+        return np.interp(x, val, pos) / total
+
+    def a_dict(self) -> dict:
+        return {
+            "compresion": self.compresion,
+            "n": self.n,
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+            "medias": self.medias.tolist(),
+            "pesos": self.pesos.tolist()
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: dict) -> "TDigest":
+        digest = cls(datos["compresion"])
+        digest.medias = np.asarray(datos["medias"], dtype=np.float64)
+        digest.pesos = np.asarray(datos["pesos"], dtype=np.float64)
+        digest.minimo = datos["minimo"]
+        digest.maximo = datos["maximo"]
+        return digest
+
+# ============================================================
+# MEDIA Y VARIANZA CORRIENTES
+# ============================================================
+
+class EstadisticasCorrientes:
+    """
+    Media, varianza, minimo y maximo por componente de un vector
+    (p. ej. por ano o por categoria), actualizables por lotes y combinables.
+    """
+
+    def __init__(self, forma=()):
+        self.n = 0
+        self.media = np.zeros(forma)
+        self.m2 = np.zeros(forma)
+        self.minimo = np.full(forma, np.inf)
+        self.maximo = np.full(forma, -np.inf)
+
+    def agregar(self, lote):
+        """lote: array (m, *forma)"""
+        lote = np.asarray(lote, dtype=np.float64)
+        if len(lote) == 0:
+            return self
+        media = lote.mean(axis=0)
+        m2 = ((lote - media) ** 2).sum(axis=0)
+        return self._fusionar(len(lote), media, m2, lote.min(axis=0), lote.max(axis=0))
+
+    def combinar(self, otro: "EstadisticasCorrientes"):
+        return self._fusionar(otro.n, otro.media, otro.m2, otro.minimo, otro.maximo)
+
+    def _fusionar(self, n_b, media_b, m2_b, minimo_b, maximo_b):
+        if n_b == 0:
+            return self
+        n_a = self.n
+        n = n_a + n_b
+        delta = media_b - self.media
+        self.media = self.media + delta * (n_b / n)
+        self.m2 = self.m2 + m2_b + delta ** 2 * (n_a * n_b / n)
+        self.minimo = np.minimum(self.minimo, minimo_b)
+        self.maximo = np.maximum(self.maximo, maximo_b)
+        self.n = n
+        return self
+
+    @property
+    def varianza(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else np.zeros_like(self.m2)
+
+    @property
+    def desviacion(self):
+        return np.sqrt(self.varianza)
+
+    def a_dict(self) -> dict:
+        return {
+            "n": self.n,
+            "media": np.asarray(self.media).tolist(),
+            "m2": np.asarray(self.m2).tolist(),
+            "minimo": np.asarray(self.minimo).tolist(),
+            "maximo": np.asarray(self.maximo).tolist()
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: dict) -> "EstadisticasCorrientes":
+        stats = cls()
+        stats.n = datos["n"]
+        stats.media = np.asarray(datos["media"], dtype=np.float64)
+        stats.m2 = np.asarray(datos["m2"], dtype=np.float64)
+        stats.minimo = np.asarray(datos["minimo"], dtype=np.float64)
+        stats.maximo = np.asarray(datos["maximo"], dtype=np.float64)
+        return stats
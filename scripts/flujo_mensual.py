@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Flujo de caja mes a mes durante toda la carrera - Paulina en Madrid.
+- Matricula en plazos, vuelos agrupados en diciembre/junio y calefaccion
+  estacional; el resto de categorias se reparte igual en los 12 meses.
+- El resultado es un array contiguo (escenarios x meses x categorias) en vez
+  de dicts anidados: 48 meses x 15 categorias x 1.000 escenarios ocupan
+  ~5,8 MB en float64 (la mitad con dtype=np.float32) y se rebanan sin copias.
+Cada ano del modelo empieza en MES_INICIO (ano academico). Los montos
+anuales salen del nucleo en centimos (proyectar_lote, la misma proyeccion
+que calcular_escenario) y se reparten en enteros: los gastos de vida entre
+categorias y cada categoria entre sus 12 meses, con redondeo acumulado. Asi
+los 12 meses de un ano suman exactamente proyeccion_anual, por componente y
+en total (al centimo, con dtype float64).
+"""
+
+import numpy as np
+
+from centimos import a_centimos, a_euros, a_puntos, aplicar_tasa, entero, escalar
+from generar_datos import (PERFIL, SUPUESTOS, COSTOS_BASE, PRESETS, mascara_opcionales, parametros_lote,
+                           proyectar_lote)
+
+# ============================================================
+# CALENDARIO DE PAGOS
+# ============================================================
+
+MES_INICIO = 9  # Septiembre: primer mes de cada ano del modelo
+
+# Mes calendario -> fraccion de la matricula anual
+PLAZOS_MATRICULA = {9: 0.5, 1: 0.5}
+
+# Viaje j del ano -> MESES_VUELOS[j % 4] (navidad, verano, julio, semana santa)
+MESES_VUELOS = (12, 6, 7, 4)
+
+# Peso relativo por mes calendario (enero..diciembre); solo importa la proporcion
+ESTACIONALIDAD = {
+    "gas_calefaccion": (2.1, 1.8, 1.3, 0.8, 0.4, 0.2, 0.2, 0.2, 0.3, 0.8, 1.6, 2.3)
+}
+
+# Columnas que se agregan despues de las categorias mensuales
+CATEGORIAS_EXTRA = ("vuelos_colombia", "matricula", "emergencias")
+
+MESES_POR_ANO = SUPUESTOS["meses_por_ano"]
+
+
+def meses_calendario() -> np.ndarray:
+    """Mes calendario (1-12) de cada mes del ano del modelo"""
+    return (MES_INICIO - 1 + np.arange(MESES_POR_ANO)) % 12 + 1
+
+
+def _pesos_mensuales(categorias) -> np.ndarray:
+    """(categorias x 12): peso entero de cada mes del ano del modelo en el gasto anual"""
+    pesos = np.ones((len(categorias), MESES_POR_ANO), dtype=np.int64)
+    calendario = meses_calendario()
+    for j, categoria in enumerate(categorias):
+        if categoria in ESTACIONALIDAD:
+            pesos[j] = a_puntos(np.asarray(ESTACIONALIDAD[categoria])[calendario - 1])
+    return pesos
+
+
+def _viajes_por_mes(viajes_por_ano) -> np.ndarray:
+    """(escenarios x 12): numero de viajes que caen en cada mes del ano del modelo"""
+    viajes = np.asarray(viajes_por_ano, dtype=np.int64)
+    conteo = np.zeros(viajes.shape + (MESES_POR_ANO,), dtype=np.int64)
+    posicion = {mes: i for i, mes in enumerate(meses_calendario())}
+    for j in range(int(viajes.max(initial=0))):
+        conteo[..., posicion[MESES_VUELOS[j % len(MESES_VUELOS)]]] += viajes > j
+    return conteo
+
+
+def _repartir(totales, pesos) -> np.ndarray:
+    """
+    Reparte centimos enteros en proporcion a pesos enteros (ultimo eje) con
+    redondeo half-up acumulado: las partes suman exactamente su total. Una
+    fila sin peso se reparte en partes iguales (su total es 0).
+    """
+    pesos = np.asarray(pesos, dtype=np.int64)
+    pesos = np.where(pesos.sum(axis=-1, keepdims=True) > 0, pesos, 1)
+    acumulado = escalar(np.asarray(totales, dtype=np.int64)[..., None], np.cumsum(pesos, axis=-1),
+                        pesos.sum(axis=-1, keepdims=True))
+    return np.diff(acumulado, axis=-1, prepend=0)
+
+# ============================================================
+# MOTOR DE FLUJO MENSUAL
+# ============================================================
+
+def construir_flujo(mensuales, categorias, matricula_anual, costo_vuelo, viajes_por_ano,
+                    pct_emergencias, inflacion, duracion_anos: int = None,
+                    dtype=np.float64) -> dict:
+    """
+    Flujo mensual a partir de valores explicitos.
+    mensuales: (escenarios x categorias) gasto mensual base de cada categoria
+    resto: escalares o arrays por escenario
+
+    Devuelve {"flujo": array (escenarios x meses x categorias), "categorias",
+    "meses"}; las columnas son las categorias mensuales seguidas de
+    CATEGORIAS_EXTRA.
+    """
+    duracion_anos = duracion_anos or PERFIL["duracion_anos"]
+    mensuales = np.atleast_2d(np.asarray(mensuales, dtype=np.float64))
+    matricula_anual, costo_vuelo, viajes, pct_emergencias, inflacion = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (
+            matricula_anual, costo_vuelo, viajes_por_ano, pct_emergencias, inflacion)),
+        mensuales[:, 0])[:5]
+    k = mensuales.shape[1]
+    n = len(matricula_anual)
+    columnas = k + len(CATEGORIAS_EXTRA)
+
+    # Ano 1 en centimos, igual que evaluar_centimos, y proyeccion anual con inflacion
+    matricula = a_centimos(matricula_anual)
+    viajes = entero(viajes)
+    vuelos_anual = a_centimos(costo_vuelo) * viajes
+    gastos_vida_anual = a_centimos(mensuales.sum(axis=1)) * 12 + vuelos_anual
+    emergencias_anual = aplicar_tasa(gastos_vida_anual + matricula, pct_emergencias)
+    proyeccion = proyectar_lote(matricula, gastos_vida_anual, emergencias_anual, inflacion, duracion_anos)
+
+    # Gastos de vida de cada ano entre categorias y vuelos, en proporcion al ano 1
+    pesos_categorias = np.concatenate([a_centimos(mensuales) * 12, vuelos_anual[:, None]], axis=1)
+    anual = np.empty((n, duracion_anos, columnas), dtype=np.int64)
+    anual[:, :, :k + 1] = _repartir(proyeccion["gastos_vida"], pesos_categorias[:, None, :])
+    anual[:, :, k + 1] = proyeccion["matricula"]
+    anual[:, :, k + 2] = proyeccion["emergencias"]
+
+    # Cada columna entre los meses del ano: estacionalidad, viajes, plazos; emergencias en 12 cuotas
+    pesos_meses = np.ones((n, columnas, MESES_POR_ANO), dtype=np.int64)
+    pesos_meses[:, :k] = _pesos_mensuales(categorias)
+    pesos_meses[:, k] = _viajes_por_mes(viajes)
+    pesos_meses[:, k + 1] = [a_puntos(PLAZOS_MATRICULA.get(mes, 0.0)) for mes in meses_calendario()]
+    centimos = _repartir(anual, pesos_meses[:, None])  # (escenarios x anos x columnas x meses)
+    flujo = a_euros(centimos.transpose(0, 1, 3, 2)).astype(dtype, order="C")
+
+    return {
+        "flujo": flujo.reshape(n, duracion_anos * MESES_POR_ANO, columnas),
+        "categorias": list(categorias) + list(CATEGORIAS_EXTRA),
+        "meses": etiquetas_meses(duracion_anos)
+    }
+
+
+def flujo_escenarios_lote(niveles, descuento_matricula, opcionales, viajes_por_ano,
+                          inflacion=None, dtype=np.float64) -> dict:
+    """Flujo mensual para lotes de escenarios (mismos parametros que calcular_escenarios_lote)"""
+    parametros = parametros_lote(niveles, descuento_matricula, opcionales, viajes_por_ano, inflacion)
+    mensuales = parametros["mensuales"].reshape(-1, len(parametros["categorias"]))
+    matricula_base = a_centimos(COSTOS_BASE["matricula"]["anual_base"])
+    matricula_anual = a_euros(matricula_base - aplicar_tasa(matricula_base, parametros["descuento"].ravel()))
+    return construir_flujo(
+        mensuales, parametros["categorias"],
+        matricula_anual=matricula_anual,
+        costo_vuelo=parametros["costo_vuelo"].ravel(),
+        viajes_por_ano=parametros["viajes_por_ano"].ravel(),
+        pct_emergencias=parametros["pct_emergencias"].ravel(),
+        inflacion=parametros["inflacion"].ravel(),
+        dtype=dtype
+    )
+
+
+def flujo_presets(dtype=np.float64) -> dict:
+    """Flujo mensual de los escenarios predefinidos, un escenario por preset"""
+    claves = list(PRESETS)
+    flujo = flujo_escenarios_lote(
+        niveles=[PRESETS[c]["nivel"] for c in claves],
+        descuento_matricula=[PRESETS[c]["descuento_matricula"] for c in claves],
+        opcionales=[mascara_opcionales(PRESETS[c]["incluir_opcionales"]) for c in claves],
+        viajes_por_ano=[PRESETS[c]["viajes_por_ano"] for c in claves],
+        dtype=dtype
+    )
+    flujo["escenarios"] = claves
+    return flujo
+
+# ============================================================
+# CONSULTAS SOBRE EL FLUJO
+# ============================================================
+
+def etiquetas_meses(duracion_anos: int = None) -> list:
+    """'AAAA-MM' de cada mes del horizonte"""
+    duracion_anos = duracion_anos or PERFIL["duracion_anos"]
+    etiquetas = []
+    for i in range(duracion_anos * MESES_POR_ANO):
+        indice = MES_INICIO - 1 + i
+        etiquetas.append(f"{PERFIL['ano_inicio'] + indice // 12}-{indice % 12 + 1:02d}")
+    return etiquetas
+
+
+def serie_categoria(flujo: dict, categoria: str) -> np.ndarray:
+    """Vista (escenarios x meses) de una categoria, sin copiar"""
+    return flujo["flujo"][:, :, flujo["categorias"].index(categoria)]
+
+
+def totales_mensuales(flujo: dict) -> np.ndarray:
+    """(escenarios x meses): salida de caja total de cada mes"""
+    return flujo["flujo"].sum(axis=2)
+
+
+def totales_por_ano(flujo: dict) -> np.ndarray:
+    """(escenarios x anos x categorias): suma de los 12 meses de cada ano del modelo"""
+    n, meses, columnas = flujo["flujo"].shape
+    return flujo["flujo"].reshape(n, meses // MESES_POR_ANO, MESES_POR_ANO, columnas).sum(axis=2)
@@ -4,10 +4,16 @@ Generador de datos financieros para el modelo de permanencia de Paulina en Madri
 Genera: datos_paulina.json y escenarios_paulina.json
 """
 
+import argparse
 import json
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
+from centimos import a_centimos, a_euros, aplicar_tasa, convertir, dividir, entero, inflactar
+from trazas import medido
+
 # ============================================================
 # CONFIGURACION BASE
 # ============================================================
@@ -166,20 +172,72 @@ COSTOS_BASE = {
     }
 }
 
+# Configuracion de los escenarios predefinidos
+PRESETS = {
+    "austero": {
+        "nombre": "Austero",
+        "nivel": "min",
+        "descuento_matricula": True,
+        "incluir_opcionales": {
+            "ocio_cultura": False,
+            "ropa_personal": True,  # Minimo necesario
+            "materiales_estudio": True,
+            "vuelos_colombia": True,  # 1 viaje
+            "emergencias": True
+        },
+        "viajes_por_ano": 1
+    },
+    "moderado": {
+        "nombre": "Moderado",
+        "nivel": "medio",
+        "descuento_matricula": True,
+        "incluir_opcionales": {
+            "ocio_cultura": True,
+            "ropa_personal": True,
+            "materiales_estudio": True,
+            "vuelos_colombia": True,  # 2 viajes
+            "emergencias": True
+        },
+        "viajes_por_ano": 2
+    },
+    "comodo": {
+        "nombre": "Comodo",
+        "nivel": "max",
+        "descuento_matricula": True,
+        "incluir_opcionales": {
+            "ocio_cultura": True,
+            "ropa_personal": True,
+            "materiales_estudio": True,
+            "vuelos_colombia": True,  # 2 viajes
+            "emergencias": True
+        },
+        "viajes_por_ano": 2
+    }
+}
+
 # ============================================================
 # FUNCIONES DE CALCULO
 # ============================================================
 
-def calcular_gastos_mensuales(nivel: str, incluir_opcionales: dict) -> dict:
+def calcular_gastos_mensuales(nivel: str, incluir_opcionales: dict, costos: dict = None) -> dict:
     """
     Calcula gastos mensuales segun nivel (austero/moderado/comodo)
     nivel: 'min', 'medio', 'max'
     incluir_opcionales: dict con flags para cada categoria opcional
+    costos: por defecto COSTOS_BASE (el dashboard pasa los del JSON)
+    Se lee del indice precalculado (ver indice_mensual); devuelve una copia.
     """
+    indice = indice_mensual(costos)
+    gastos = indice["desgloses"][(_NIVEL_A_INDICE.get(nivel, 1), mascara_opcionales(incluir_opcionales))]
+    return {k: v.copy() if k[0] != "_" else v for k, v in gastos.items()}
+
+
+def _recorrer_gastos_mensuales(costos: dict, nivel: str, incluir_opcionales: dict) -> dict:
+    """Recorre los costos y arma el desglose mensual (lo usa el indice precalculado)"""
     gastos = {}
     total = 0
 
-    for categoria, datos in COSTOS_BASE.items():
+    for categoria, datos in costos.items():
         if categoria == "matricula":
             continue  # Se maneja aparte
         if categoria == "emergencias":
@@ -217,21 +275,36 @@ def calcular_gastos_mensuales(nivel: str, incluir_opcionales: dict) -> dict:
     return gastos
 
 
+def costos_para_perfil(perfil: dict) -> dict:
+    """
+    COSTOS_BASE ajustado al perfil: desde los 26 anos no aplica el Abono
+    Joven y el transporte cuesta el precio normal en todos los niveles.
+    """
+    if perfil.get("menor_26", True):
+        return COSTOS_BASE
+    precio = COSTOS_BASE["transporte"]["max"]
+    return {**COSTOS_BASE, "transporte": {**COSTOS_BASE["transporte"], "min": precio, "medio": precio, "max": precio}}
+
+
 def calcular_escenario(nombre: str, nivel: str, descuento_matricula: bool,
-                       incluir_opcionales: dict, viajes_por_ano: int) -> dict:
-    """Calcula un escenario completo con proyeccion de 4 anos"""
+                       incluir_opcionales: dict, viajes_por_ano: int, perfil: dict = None) -> dict:
+    """
+    Calcula un escenario completo con proyeccion de 4 anos
+    perfil: por defecto PERFIL (el modo lote pasa el de cada estudiante)
+    """
+    perfil = perfil or PERFIL
+    costos = costos_para_perfil(perfil)
 
     # Matricula
-    matricula_base = COSTOS_BASE["matricula"]["anual_base"]
+    matricula_base = costos["matricula"]["anual_base"]
     descuento = SUPUESTOS["descuento_matricula_disponible"] if descuento_matricula else 0
-    matricula_anual = matricula_base * (1 - descuento)
 
     # Gastos mensuales
-    gastos_mensuales = calcular_gastos_mensuales(nivel, incluir_opcionales)
+    gastos_mensuales = calcular_gastos_mensuales(nivel, incluir_opcionales, costos)
     total_mensual_base = gastos_mensuales["_total_sin_emergencias"]
 
     # Vuelos anuales
-    vuelo_datos = COSTOS_BASE["vuelos_colombia"]
+    vuelo_datos = costos["vuelos_colombia"]
     if nivel == "min":
         costo_vuelo = vuelo_datos["min"]
     elif nivel == "max":
@@ -240,52 +313,36 @@ def calcular_escenario(nombre: str, nivel: str, descuento_matricula: bool,
         costo_vuelo = vuelo_datos["medio"]
 
     incluir_vuelos = incluir_opcionales.get("vuelos_colombia", True)
-    vuelos_anual = costo_vuelo * viajes_por_ano if incluir_vuelos else 0
-
-    # Total anual sin emergencias
-    gastos_vida_anual = (total_mensual_base * 12) + vuelos_anual
 
     # Emergencias como % del total
     if incluir_opcionales.get("emergencias", True):
         if nivel == "min":
-            pct_emergencias = COSTOS_BASE["emergencias"]["min_porcentaje"]
+            pct_emergencias = costos["emergencias"]["min_porcentaje"]
         elif nivel == "max":
-            pct_emergencias = COSTOS_BASE["emergencias"]["max_porcentaje"]
+            pct_emergencias = costos["emergencias"]["max_porcentaje"]
         else:
-            pct_emergencias = COSTOS_BASE["emergencias"]["porcentaje_del_total"]
-
-        emergencias_anual = (gastos_vida_anual + matricula_anual) * pct_emergencias
+            pct_emergencias = costos["emergencias"]["porcentaje_del_total"]
     else:
-        emergencias_anual = 0
         pct_emergencias = 0
 
-    # Total ano 1
-    total_anual_ano1 = matricula_anual + gastos_vida_anual + emergencias_anual
-
-    # Proyeccion 4 anos con inflacion
+    # Ano 1 y proyeccion con inflacion, en centimos (ver politica de redondeo en centimos.py)
     inflacion = SUPUESTOS["inflacion_espana"]
-    proyeccion = []
-    total_acumulado = 0
-
-    for i in range(PERFIL["duracion_anos"]):
-        ano = PERFIL["ano_inicio"] + i
-        factor_inflacion = (1 + inflacion) ** i
-
-        mat = matricula_anual * factor_inflacion
-        gastos = gastos_vida_anual * factor_inflacion
-        emerg = emergencias_anual * factor_inflacion
-        total = mat + gastos + emerg
-        total_acumulado += total
+    c = evaluar_centimos(total_mensual_base, costo_vuelo, viajes_por_ano if incluir_vuelos else 0,
+                         descuento, pct_emergencias, inflacion, duracion_anos=perfil["duracion_anos"],
+                         matricula_base=matricula_base)
+    proy = c["proyeccion_anual"]
 
+    proyeccion = []
+    for i in range(perfil["duracion_anos"]):
         proyeccion.append({
-            "ano": ano,
+            "ano": perfil["ano_inicio"] + i,
             "numero_ano": i + 1,
-            "factor_inflacion": round(factor_inflacion, 4),
-            "matricula": round(mat, 2),
-            "gastos_vida": round(gastos, 2),
-            "emergencias": round(emerg, 2),
-            "total_anual": round(total, 2),
-            "total_mensual_promedio": round(total / 12, 2)
+            "factor_inflacion": round((1 + inflacion) ** i, 4),
+            "matricula": _eur(proy["matricula"][i]),
+            "gastos_vida": _eur(proy["gastos_vida"][i]),
+            "emergencias": _eur(proy["emergencias"][i]),
+            "total_anual": _eur(proy["total_anual"][i]),
+            "total_mensual_promedio": _eur(dividir(proy["total_anual"][i], 12))
         })
 
     return {
@@ -305,27 +362,330 @@ def calcular_escenario(nombre: str, nivel: str, descuento_matricula: bool,
         },
         "resumen_ano_1": {
             "matricula_base": matricula_base,
-            "matricula_con_descuento": round(matricula_anual, 2),
-            "ahorro_por_descuento": round(matricula_base - matricula_anual, 2),
-            "gastos_mensuales": round(total_mensual_base, 2),
-            "gastos_vida_anual": round(gastos_vida_anual, 2),
-            "vuelos_anual": round(vuelos_anual, 2),
-            "emergencias_anual": round(emergencias_anual, 2),
-            "total_anual": round(total_anual_ano1, 2),
-            "total_mensual_promedio": round(total_anual_ano1 / 12, 2)
+            "matricula_con_descuento": _eur(c["matricula_anual"]),
+            "ahorro_por_descuento": _eur(c["ahorro_descuento"]),
+            "gastos_mensuales": _eur(c["gastos_mensuales"]),
+            "gastos_vida_anual": _eur(c["gastos_vida_anual"]),
+            "vuelos_anual": _eur(c["vuelos_anual"]),
+            "emergencias_anual": _eur(c["emergencias_anual"]),
+            "total_anual": _eur(c["total_anual"]),
+            "total_mensual_promedio": _eur(dividir(c["total_anual"], 12))
         },
         "desglose_mensual": {k: v for k, v in gastos_mensuales.items() if not k.startswith("_")},
         "proyeccion_anual": proyeccion,
         "totales": {
-            "total_4_anos_eur": round(total_acumulado, 2),
-            "total_4_anos_usd": round(total_acumulado * SUPUESTOS["tasas_cambio"]["EUR_USD"], 2),
-            "total_4_anos_cop": round(total_acumulado * SUPUESTOS["tasas_cambio"]["EUR_COP"], 2),
-            "promedio_anual": round(total_acumulado / PERFIL["duracion_anos"], 2),
-            "promedio_mensual": round(total_acumulado / (PERFIL["duracion_anos"] * 12), 2)
+            "total_4_anos_eur": _eur(c["total_4_anos_eur"]),
+            "total_4_anos_usd": _eur(c["total_4_anos_usd"]),
+            "total_4_anos_cop": _eur(c["total_4_anos_cop"]),
+            "promedio_anual": _eur(c["promedio_anual"]),
+            "promedio_mensual": _eur(c["promedio_mensual"])
         }
     }
 
 
+# ============================================================
+# CALCULO VECTORIZADO (LOTES DE ESCENARIOS)
+# ============================================================
+
+NIVELES = ("min", "medio", "max")
+
+# Orden de bits de la mascara de opcionales: bit j -> OPCIONALES[j]
+OPCIONALES = ("ocio_cultura", "ropa_personal", "materiales_estudio",
+              "vuelos_colombia", "emergencias")
+
+MASCARA_TODOS = (1 << len(OPCIONALES)) - 1
+
+
+def mascara_opcionales(incluir_opcionales: dict) -> int:
+    """Convierte el dict de flags de opcionales en una mascara de bits"""
+    mascara = 0
+    for bit, categoria in enumerate(OPCIONALES):
+        if incluir_opcionales.get(categoria, True):
+            mascara |= 1 << bit
+    return mascara
+
+
+def _indices_nivel(niveles) -> np.ndarray:
+    """Acepta niveles como texto ('min'/'medio'/'max') o como indice 0/1/2"""
+    niveles = np.asarray(niveles)
+    if niveles.dtype.kind in "US":
+        indices = np.full(niveles.shape, NIVELES.index("medio"), dtype=np.int8)
+        indices[niveles == "min"] = NIVELES.index("min")
+        indices[niveles == "max"] = NIVELES.index("max")
+        return indices
+    return niveles.astype(np.int8)
+
+
+# ============================================================
+# INDICE PRECALCULADO DE GASTOS MENSUALES
+# ============================================================
+
+_NIVEL_A_INDICE = {"min": 0, "medio": 1, "max": 2}
+
+# COSTOS_BASE no se modifica en ejecucion: su indice se arma al importar y el camino por
+# defecto lo lee directo. Otros costos (los del JSON, que el dashboard recibe como copia
+# nueva en cada rerun, o los de costos_para_perfil) se buscan por su huella.
+_INDICES_MENSUALES = {}
+
+
+def _huella_costos(costos: dict) -> tuple:
+    """Categorias y valores de cada una (cambia si cambia cualquier costo)"""
+    return tuple(costos), tuple([tuple(datos.values()) for datos in costos.values()])
+
+
+def _construir_indice(costos: dict) -> dict:
+    totales = np.empty((len(NIVELES), MASCARA_TODOS + 1))
+    desgloses = {}
+    for i, nivel in enumerate(NIVELES):
+        for mascara in range(MASCARA_TODOS + 1):
+            flags = {c: bool(mascara & (1 << bit)) for bit, c in enumerate(OPCIONALES)}
+            gastos = _recorrer_gastos_mensuales(costos, nivel, flags)
+            desgloses[(i, mascara)] = gastos
+            totales[i, mascara] = gastos["_total_sin_emergencias"]
+    return {"totales": totales, "desgloses": desgloses}
+
+
+def indice_mensual(costos: dict = None) -> dict:
+    """
+    Desglose y total mensual de cada (nivel, mascara de opcionales):
+    "totales" es un array (niveles x 2^opcionales) y "desgloses" un dict
+    {(indice_nivel, mascara): gastos}. Se arma una vez por juego de costos y
+    se vuelve a armar si cambian (COSTOS_BASE se trata como constante).
+    No modificar lo que devuelve.
+    """
+    if costos is None or costos is COSTOS_BASE:
+        return _INDICE_BASE
+
+    huella = _huella_costos(costos)
+    indice = _INDICES_MENSUALES.get(huella)
+    if indice is None:
+        if len(_INDICES_MENSUALES) >= 8:
+            _INDICES_MENSUALES.clear()
+        indice = _INDICES_MENSUALES[huella] = _construir_indice(costos)
+    return indice
+
+
+# Se arma una vez al importar (y lo reusan los JSON con los mismos costos)
+_INDICE_BASE = _INDICES_MENSUALES[_huella_costos(COSTOS_BASE)] = _construir_indice(COSTOS_BASE)
+
+
+def _tabla_categorias_mensuales():
+    """
+    Matriz (niveles x categorias mensuales) con los valores de COSTOS_BASE,
+    mas el bit de opcional de cada categoria (-1 si no es opcional) y sus
+    nombres. Mismo orden y mismas reglas de nivel que calcular_gastos_mensuales.
+    """
+    valores, bits, categorias = [], [], []
+    for categoria, datos in COSTOS_BASE.items():
+        if categoria in ("matricula", "emergencias", "vuelos_colombia"):
+            continue
+        categorias.append(categoria)
+        valores.append([
+            datos.get("min", datos.get("medio", 0)),
+            datos.get("medio", 0),
+            datos.get("max", datos.get("medio", 0)),
+        ])
+        es_opcional = datos.get("opcional", False) and categoria in OPCIONALES
+        bits.append(OPCIONALES.index(categoria) if es_opcional else -1)
+    return np.array(valores, dtype=np.float64).T, bits, categorias
+
+
+def proyectar_lote(matricula_anual, gastos_vida_anual, emergencias_anual, inflacion,
+                   duracion_anos: int) -> dict:
+    """
+    Proyeccion anual con inflacion para arrays de escenarios, en centimos.
+    Cada componente se actualiza ano a ano redondeando al centimo y el total
+    anual es su suma exacta, igual que en calcular_escenario.
+    """
+    if not isinstance(inflacion, np.ndarray) and not any(
+            isinstance(v, np.ndarray) for v in (matricula_anual, gastos_vida_anual, emergencias_anual)):
+        # Un solo escenario: tuplas de enteros (mismas cifras, sin costo fijo de numpy)
+        proy_mat = inflactar(matricula_anual, inflacion, duracion_anos)
+        proy_gastos = inflactar(gastos_vida_anual, inflacion, duracion_anos)
+        proy_emerg = inflactar(emergencias_anual, inflacion, duracion_anos)
+        proy_total = tuple(map(sum, zip(proy_mat, proy_gastos, proy_emerg)))
+        return {"matricula": proy_mat, "gastos_vida": proy_gastos, "emergencias": proy_emerg,
+                "total_anual": proy_total, "total_acumulado": sum(proy_total)}
+
+    matricula_anual, gastos_vida_anual, emergencias_anual, inflacion = np.broadcast_arrays(
+        np.asarray(matricula_anual, dtype=np.int64), np.asarray(gastos_vida_anual, dtype=np.int64),
+        np.asarray(emergencias_anual, dtype=np.int64), np.asarray(inflacion, dtype=np.float64))
+
+    proy_mat = inflactar(matricula_anual, inflacion, duracion_anos)
+    proy_gastos = inflactar(gastos_vida_anual, inflacion, duracion_anos)
+    proy_emerg = inflactar(emergencias_anual, inflacion, duracion_anos)
+    proy_total = proy_mat + proy_gastos + proy_emerg
+
+    return {
+        "matricula": proy_mat,
+        "gastos_vida": proy_gastos,
+        "emergencias": proy_emerg,
+        "total_anual": proy_total,
+        "total_acumulado": proy_total.sum(axis=-1)
+    }
+
+
+def evaluar_centimos(total_mensual_base, costo_vuelo, viajes_por_ano, descuento, pct_emergencias,
+                     inflacion, tasas_cambio: dict = None, duracion_anos: int = None,
+                     matricula_base=None) -> dict:
+    """
+    Nucleo del modelo de costos en centimos int64 (escalares o arrays con
+    broadcasting). Montos en EUR y tasas como fracciones; todos los
+    resultados son centimos de su moneda, redondeados segun centimos.py.
+    """
+    tasas = tasas_cambio or SUPUESTOS["tasas_cambio"]
+    duracion = duracion_anos or PERFIL["duracion_anos"]
+
+    matricula_base = a_centimos(COSTOS_BASE["matricula"]["anual_base"] if matricula_base is None else matricula_base)
+    ahorro_descuento = aplicar_tasa(matricula_base, descuento)
+    matricula_anual = matricula_base - ahorro_descuento
+
+    gastos_mensuales = a_centimos(total_mensual_base)
+    vuelos_anual = a_centimos(costo_vuelo) * entero(viajes_por_ano)
+    gastos_vida_anual = (gastos_mensuales * 12) + vuelos_anual
+    emergencias_anual = aplicar_tasa(gastos_vida_anual + matricula_anual, pct_emergencias)
+    total_anual_ano1 = matricula_anual + gastos_vida_anual + emergencias_anual
+
+    proyeccion = proyectar_lote(matricula_anual, gastos_vida_anual, emergencias_anual,
+                                inflacion, duracion)
+    total_acumulado = proyeccion.pop("total_acumulado")
+
+    return {
+        "matricula_anual": matricula_anual,
+        "ahorro_descuento": ahorro_descuento,
+        "gastos_mensuales": gastos_mensuales,
+        "vuelos_anual": vuelos_anual,
+        "gastos_vida_anual": gastos_vida_anual,
+        "emergencias_anual": emergencias_anual,
+        "total_anual": total_anual_ano1,
+        "proyeccion_anual": proyeccion,
+        "total_4_anos_eur": total_acumulado,
+        "total_4_anos_usd": convertir(total_acumulado, tasas["EUR_USD"]),
+        "total_4_anos_cop": convertir(total_acumulado, tasas["EUR_COP"]),
+        "promedio_anual": dividir(total_acumulado, duracion),
+        "promedio_mensual": dividir(total_acumulado, duracion * 12)
+    }
+
+
+def _eur(centimos) -> float:
+    """Centimos -> EUR para el JSON (float con 2 decimales exactos)"""
+    return float(a_euros(centimos))
+
+
+def parametros_lote(niveles, descuento_matricula, opcionales, viajes_por_ano,
+                    inflacion=None, desglose: bool = True) -> dict:
+    """
+    Traduce niveles/flags de escenarios a valores explicitos por escenario:
+    gasto mensual de cada categoria (matriz escenarios x categorias, 0 si no
+    esta incluida), costo por vuelo, viajes, descuento, % de emergencias e
+    inflacion. Mismos parametros que calcular_escenarios_lote.
+    Con desglose=False solo se busca el total mensual en el indice precalculado.
+    """
+    if inflacion is None:
+        inflacion = SUPUESTOS["inflacion_espana"]
+
+    nivel, con_descuento, mascara, viajes, inflacion = np.broadcast_arrays(
+        _indices_nivel(niveles),
+        np.asarray(descuento_matricula, dtype=bool),
+        np.asarray(opcionales, dtype=np.int64),
+        np.asarray(viajes_por_ano, dtype=np.int64),
+        np.asarray(inflacion, dtype=np.float64)
+    )
+
+    if desglose:
+        # Gasto mensual por categoria (0 si es un opcional excluido)
+        tabla, bits, categorias = _tabla_categorias_mensuales()
+        mensuales = tabla[nivel]
+        for columna, bit in enumerate(bits):
+            if bit >= 0:
+                mensuales[..., columna] = np.where(mascara & (1 << bit), mensuales[..., columna], 0)
+        gastos = {"categorias": categorias, "mensuales": mensuales}
+    else:
+        gastos = {"total_mensual_base": indice_mensual()["totales"][nivel, mascara]}
+
+    # Vuelos y emergencias segun nivel (0 si la categoria no esta incluida)
+    vuelo_datos = COSTOS_BASE["vuelos_colombia"]
+    costos_vuelo = np.array([vuelo_datos["min"], vuelo_datos["medio"], vuelo_datos["max"]],
+                            dtype=np.float64)
+    incluir_vuelos = (mascara & (1 << OPCIONALES.index("vuelos_colombia"))) != 0
+
+    emerg_datos = COSTOS_BASE["emergencias"]
+    pcts = np.array([emerg_datos["min_porcentaje"], emerg_datos["porcentaje_del_total"],
+                     emerg_datos["max_porcentaje"]], dtype=np.float64)
+    incluir_emergencias = (mascara & (1 << OPCIONALES.index("emergencias"))) != 0
+
+    return {
+        **gastos,
+        "costo_vuelo": costos_vuelo[nivel],
+        "viajes_por_ano": np.where(incluir_vuelos, viajes, 0),
+        "descuento": np.where(con_descuento, SUPUESTOS["descuento_matricula_disponible"], 0),
+        "pct_emergencias": np.where(incluir_emergencias, pcts[nivel], 0),
+        "inflacion": inflacion
+    }
+
+
+def calcular_escenarios_lote(niveles, descuento_matricula, opcionales, viajes_por_ano,
+                             inflacion=None) -> dict:
+    """
+    Version vectorizada de calcular_escenario.
+
+    Todos los parametros aceptan escalares o arrays (se aplica broadcasting):
+    niveles: 'min'/'medio'/'max' o indices 0/1/2
+    descuento_matricula: bool
+    opcionales: mascara de bits segun OPCIONALES (ver mascara_opcionales)
+    viajes_por_ano: int
+    inflacion: tasa anual (por defecto SUPUESTOS["inflacion_espana"])
+
+    Devuelve un dict de arrays en EUR con las mismas cifras (al centimo)
+    que calcular_escenario.
+    """
+    parametros = parametros_lote(niveles, descuento_matricula, opcionales, viajes_por_ano, inflacion,
+                                 desglose=False)
+    return evaluar_parametros(**parametros)
+
+
+def evaluar_parametros(total_mensual_base, costo_vuelo, viajes_por_ano, descuento,
+                       pct_emergencias, inflacion, tasas_cambio: dict = None) -> dict:
+    """
+    Nucleo vectorizado del modelo de costos a partir de valores explicitos
+    (no de niveles). Lo usan calcular_escenarios_lote y los analisis de
+    sensibilidad. tasas_cambio acepta escalares o arrays por escenario.
+    Calcula en centimos (evaluar_centimos) y devuelve EUR float64.
+    """
+    centimos = evaluar_centimos(total_mensual_base, costo_vuelo, viajes_por_ano, descuento,
+                                pct_emergencias, inflacion, tasas_cambio)
+    proyeccion = {k: a_euros(v) for k, v in centimos.pop("proyeccion_anual").items()}
+    resultado = {k: a_euros(v) for k, v in centimos.items() if k != "ahorro_descuento"}
+
+    duracion = PERFIL["duracion_anos"]
+    inflacion = np.asarray(inflacion, dtype=np.float64)
+    proyeccion["factor_inflacion"] = np.broadcast_to(
+        (1 + inflacion[..., None]) ** np.arange(duracion), proyeccion["total_anual"].shape)
+    resultado["porcentaje_emergencias"] = np.asarray(pct_emergencias, dtype=np.float64)
+    resultado["proyeccion_anual"] = {"factor_inflacion": proyeccion.pop("factor_inflacion"), **proyeccion}
+    return resultado
+
+
+def grilla_parametros(niveles=NIVELES, descuentos=(True, False), mascaras=None,
+                      viajes=(0, 1, 2, 3, 4), inflaciones=None) -> dict:
+    """
+    Producto cartesiano de parametros como arrays planos, listo para
+    pasar a calcular_escenarios_lote(**grilla).
+    """
+    if mascaras is None:
+        mascaras = range(MASCARA_TODOS + 1)
+    if inflaciones is None:
+        inflaciones = (SUPUESTOS["inflacion_espana"],)
+
+    ejes = np.meshgrid(_indices_nivel(list(niveles)), np.asarray(descuentos, dtype=bool),
+                       np.asarray(list(mascaras), dtype=np.int64),
+                       np.asarray(viajes, dtype=np.int64),
+                       np.asarray(inflaciones, dtype=np.float64), indexing="ij")
+    nombres = ("niveles", "descuento_matricula", "opcionales", "viajes_por_ano", "inflacion")
+    return {nombre: eje.ravel() for nombre, eje in zip(nombres, ejes)}
+
+
+@medido("datos:generar_datos_base", "datos")
 def generar_datos_base() -> dict:
     """Genera el JSON de datos base"""
     return {
@@ -355,61 +715,16 @@ def generar_datos_base() -> dict:
     }
 
 
+@medido("datos:generar_escenarios", "datos")
 def generar_escenarios() -> dict:
     """Genera el JSON de escenarios"""
-
-    # Configuracion de opcionales por escenario
-    opcionales_austero = {
-        "ocio_cultura": False,
-        "ropa_personal": True,  # Minimo necesario
-        "materiales_estudio": True,
-        "vuelos_colombia": True,  # 1 viaje
-        "emergencias": True
-    }
-
-    opcionales_moderado = {
-        "ocio_cultura": True,
-        "ropa_personal": True,
-        "materiales_estudio": True,
-        "vuelos_colombia": True,  # 2 viajes
-        "emergencias": True
-    }
-
-    opcionales_comodo = {
-        "ocio_cultura": True,
-        "ropa_personal": True,
-        "materiales_estudio": True,
-        "vuelos_colombia": True,  # 2 viajes
-        "emergencias": True
-    }
-
     escenarios = {
         "metadata": {
             "fecha_generacion": datetime.now().isoformat(),
             "descripcion": "Tres escenarios financieros para la permanencia de Paulina en Madrid"
         },
         "escenarios": {
-            "austero": calcular_escenario(
-                nombre="Austero",
-                nivel="min",
-                descuento_matricula=True,
-                incluir_opcionales=opcionales_austero,
-                viajes_por_ano=1
-            ),
-            "moderado": calcular_escenario(
-                nombre="Moderado",
-                nivel="medio",
-                descuento_matricula=True,
-                incluir_opcionales=opcionales_moderado,
-                viajes_por_ano=2
-            ),
-            "comodo": calcular_escenario(
-                nombre="Comodo",
-                nivel="max",
-                descuento_matricula=True,
-                incluir_opcionales=opcionales_comodo,
-                viajes_por_ano=2
-            )
+            key: calcular_escenario(**preset) for key, preset in PRESETS.items()
         },
         "comparativa": {}
     }
@@ -420,34 +735,128 @@ def generar_escenarios() -> dict:
         escenarios["comparativa"][key] = {
             "total_4_anos": esc["totales"]["total_4_anos_eur"],
             "promedio_mensual": esc["totales"]["promedio_mensual"],
-            "ahorro_beca_4_anos": esc["resumen_ano_1"]["ahorro_por_descuento"] * 4
+            "ahorro_beca_4_anos": _eur(a_centimos(esc["resumen_ano_1"]["ahorro_por_descuento"]) * 4)
         }
 
     return escenarios
 
 
+@medido("datos:guardar_json", "datos")
+def guardar_json(contenido: dict, nombre: str, directorio=None):
+    """Escribe un JSON de output/ con el formato de siempre (indent=2, UTF-8)"""
+    ruta = (directorio or OUTPUT_DIR) / nombre
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(contenido, f, indent=2, ensure_ascii=False)
+    return ruta
+
+
 # ============================================================
 # MAIN
 # ============================================================
 
-if __name__ == "__main__":
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generador de datos financieros - Paulina Madrid")
+    parser.add_argument("--montecarlo", type=int, metavar="N", default=0,
+                        help="Simular N trayectorias Monte Carlo y generar montecarlo_paulina.json")
+    parser.add_argument("--preset", choices=list(PRESETS), default="moderado",
+                        help="Escenario base para la simulacion y la sensibilidad")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla de la simulacion")
+    parser.add_argument("--trabajadores", type=int, default=1,
+                        help="Procesos para la simulacion (0 = todos los nucleos)")
+    parser.add_argument("--cambio", type=int, metavar="N", default=0,
+                        help="Simular N trayectorias de tasas EUR/COP y EUR/USD y generar cambio_paulina.json")
+    parser.add_argument("--metodo-cambio", choices=("gbm", "bootstrap"), default="gbm",
+                        help="Modelo de las tasas: GBM historico o bootstrap por bloques")
+    parser.add_argument("--inflacion-estocastica", type=int, metavar="N", default=0,
+                        help="Simular N trayectorias de inflacion por ano y categoria y generar inflacion_paulina.json")
+    parser.add_argument("--sensibilidad", action="store_true",
+                        help="Generar sensibilidad_paulina.json (tornado por variable)")
+    parser.add_argument("--sobol", type=int, metavar="N", default=0,
+                        help="Agregar indices de Sobol con N muestras base (implica --sensibilidad)")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Escribir tambien escenarios_columnar/ (.npy que el dashboard mapea en memoria)")
+    parser.add_argument("--grilla-sliders", action="store_true",
+                        help="Escribir tambien grilla_sliders/ (proyecciones por posicion de sliders, ~65 MB)")
+    parser.add_argument("--perfiles", metavar="RUTA",
+                        help="Modo lote: archivo .csv/.jsonl de perfiles -> escenarios_lote.jsonl")
+    parser.add_argument("--salida", metavar="RUTA", help="Archivo de salida del modo lote")
+    args = parser.parse_args(argv)
+    args.sensibilidad = args.sensibilidad or bool(args.sobol)
+
+    if args.perfiles:
+        return main_lote(args)
+
+    pasos = (2 + args.columnar + args.grilla_sliders + bool(args.montecarlo) + bool(args.cambio) + bool(args.inflacion_estocastica)
+             + args.sensibilidad)
+    paso = 2
+
     print("=" * 60)
     print("GENERADOR DE DATOS FINANCIEROS - PAULINA MADRID")
     print("=" * 60)
 
     # Generar datos base
-    print("\n[1/2] Generando datos_paulina.json...")
-    datos = generar_datos_base()
-    with open(OUTPUT_DIR / "datos_paulina.json", "w", encoding="utf-8") as f:
-        json.dump(datos, f, indent=2, ensure_ascii=False)
-    print(f"      -> {OUTPUT_DIR / 'datos_paulina.json'}")
+    print(f"\n[1/{pasos}] Generando datos_paulina.json...")
+    print(f"      -> {guardar_json(generar_datos_base(), 'datos_paulina.json')}")
 
     # Generar escenarios
-    print("\n[2/2] Generando escenarios_paulina.json...")
+    print(f"\n[2/{pasos}] Generando escenarios_paulina.json...")
     escenarios = generar_escenarios()
-    with open(OUTPUT_DIR / "escenarios_paulina.json", "w", encoding="utf-8") as f:
-        json.dump(escenarios, f, indent=2, ensure_ascii=False)
-    print(f"      -> {OUTPUT_DIR / 'escenarios_paulina.json'}")
+    print(f"      -> {guardar_json(escenarios, 'escenarios_paulina.json')}")
+
+    # Almacen columnar (opcional)
+    if args.columnar:
+        from almacen_columnar import guardar_almacen
+
+        paso += 1
+        print(f"\n[{paso}/{pasos}] Generando escenarios_columnar/ (presets + grilla)...")
+        print(f"      -> {guardar_almacen()}")
+
+    # Grilla de sliders del dashboard (opcional)
+    if args.grilla_sliders:
+        from grilla_sliders import guardar_grilla
+
+        paso += 1
+        print(f"\n[{paso}/{pasos}] Generando grilla_sliders/ (total mensual x viajes x emergencias x inflacion x beca)...")
+        print(f"      -> {guardar_grilla()}")
+
+    # Simulacion Monte Carlo (opcional)
+    if args.montecarlo:
+        from montecarlo import generar_montecarlo, guardar_montecarlo
+
+        paso += 1
+        print(f"\n[{paso}/{pasos}] Simulando {args.montecarlo:,} trayectorias ({args.preset})...")
+        resumen_mc = generar_montecarlo(args.montecarlo, preset=args.preset, semilla=args.semilla,
+                                        trabajadores=args.trabajadores)
+        print(f"      -> {guardar_montecarlo(resumen_mc)}")
+
+    # Simulacion de tasas de cambio (opcional)
+    if args.cambio:
+        from tipo_cambio import generar_cambio, guardar_cambio
+
+        paso += 1
+        print(f"\n[{paso}/{pasos}] Simulando {args.cambio:,} trayectorias de tasas ({args.metodo_cambio}, {args.preset})...")
+        resumen_cambio = generar_cambio(args.cambio, preset=args.preset, metodo=args.metodo_cambio,
+                                        semilla=args.semilla)
+        print(f"      -> {guardar_cambio(resumen_cambio)}")
+
+    # Inflacion estocastica (opcional)
+    if args.inflacion_estocastica:
+        from inflacion_estocastica import generar_inflacion, guardar_inflacion
+
+        paso += 1
+        print(f"\n[{paso}/{pasos}] Simulando {args.inflacion_estocastica:,} trayectorias de inflacion...")
+        resumen_inflacion = generar_inflacion(args.inflacion_estocastica, semilla=args.semilla)
+        print(f"      -> {guardar_inflacion(resumen_inflacion)}")
+
+    # Analisis de sensibilidad (opcional)
+    if args.sensibilidad:
+        from sensibilidad import generar_sensibilidad, guardar_sensibilidad
+
+        paso += 1
+        print(f"\n[{paso}/{pasos}] Generando sensibilidad_paulina.json ({args.preset})...")
+        sensibilidad = generar_sensibilidad(preset=args.preset, n_sobol=args.sobol,
+                                            semilla=args.semilla)
+        print(f"      -> {guardar_sensibilidad(sensibilidad)}")
 
     # Resumen
     print("\n" + "=" * 60)
@@ -462,6 +871,52 @@ if __name__ == "__main__":
         print(f"  En USD: ${datos_esc['totales']['total_4_anos_usd']:,.0f}")
         print(f"  En COP: ${datos_esc['totales']['total_4_anos_cop']:,.0f}")
 
+    if args.montecarlo:
+        bandas = resumen_mc["total_4_anos_eur"]
+        print(f"\nMONTE CARLO ({args.preset.upper()}, {args.montecarlo:,} trayectorias):")
+        print(f"  P10: EUR {bandas['p10']:,.0f} | P50: EUR {bandas['p50']:,.0f} | P90: EUR {bandas['p90']:,.0f}")
+
+    if args.cambio:
+        bandas = resumen_cambio["total_4_anos_cop"]
+        print(f"\nTASAS DE CAMBIO ({args.preset.upper()}, {args.cambio:,} trayectorias {args.metodo_cambio}):")
+        print(f"  P10: COP {bandas['p10']:,.0f} | P50: COP {bandas['p50']:,.0f} | P90: COP {bandas['p90']:,.0f}")
+        print(f"  Con tasa fija: COP {bandas['tasa_fija']:,.0f} "
+              f"(probabilidad de superarlo: {bandas['prob_supera_tasa_fija']:.0%})")
+
+    if args.inflacion_estocastica:
+        print(f"\nINFLACION ESTOCASTICA ({args.inflacion_estocastica:,} trayectorias, total 4 anos EUR):")
+        for nombre, esc in resumen_inflacion["escenarios"].items():
+            bandas = esc["total_4_anos_eur"]
+            print(f"  {nombre.capitalize()}: P10 {bandas['p10']:,.0f} | P50 {bandas['p50']:,.0f} | "
+                  f"P90 {bandas['p90']:,.0f} (constante: {esc['inflacion_constante_eur']:,.0f})")
+
+    if args.sensibilidad:
+        print(f"\nSENSIBILIDAD ({args.preset.upper()}, impacto en total 4 anos EUR):")
+        for barra in sensibilidad["tornado"]["eur"]["barras"][:5]:
+            print(f"  {barra['etiqueta']}: EUR {barra['impacto']:,.0f}")
+        if args.sobol:
+            print("  Indices de Sobol (total) en EUR:")
+            for fila in sensibilidad["sobol"]["metricas"]["eur"]["indices"][:5]:
+                print(f"    {fila['etiqueta']}: {fila['total']:.3f}")
+
     print("\n" + "=" * 60)
     print("Generacion completada exitosamente!")
     print("=" * 60)
+
+
+def main_lote(args):
+    from lote_perfiles import generar_lote
+
+    print("=" * 60)
+    print("GENERADOR DE DATOS FINANCIEROS - MODO LOTE")
+    print("=" * 60)
+    print(f"\nProcesando perfiles de {args.perfiles} ({args.trabajadores or 'todos los'} procesos)...")
+    inicio = datetime.now()
+    resultado = generar_lote(args.perfiles, args.salida, trabajadores=args.trabajadores)
+    segundos = (datetime.now() - inicio).total_seconds()
+    print(f"      -> {resultado['ruta']}")
+    print(f"\n{resultado['perfiles']:,} perfiles en {segundos:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
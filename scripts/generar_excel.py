@@ -2,17 +2,30 @@
 """
 Generador de Excel profesional para compartir con la familia de Paulina.
 Lee de los JSONs y genera un Excel formateado y bonito.
+
+Con --grilla exporta en cambio una grilla grande de escenarios (y su flujo
+mensual con --flujo) en modo write-only: las filas se escriben a disco a
+medida que se calculan por bloques, con estilos con nombre compartidos, asi
+que 100k+ filas se generan con memoria acotada.
 """
 
+import argparse
 import json
 from pathlib import Path
+
+import numpy as np
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 from openpyxl.chart import BarChart, LineChart, PieChart, Reference
 from openpyxl.chart.series import DataPoint
 from openpyxl.chart.label import DataLabelList
 
+from flujo_mensual import etiquetas_meses, flujo_escenarios_lote, flujo_presets, serie_categoria, totales_mensuales
+from generar_datos import NIVELES, OPCIONALES, SUPUESTOS, calcular_escenarios_lote, grilla_parametros
+from trazas import medido, tramo
+
 # Rutas
 BASE_DIR = Path(__file__).parent.parent
 OUTPUT_DIR = BASE_DIR / "output"
@@ -33,6 +46,20 @@ THIN_BORDER = Border(
     bottom=Side(style='thin')
 )
 
+# Estilos con nombre de la exportacion streaming: se registran una vez por
+# libro y cada celda solo guarda el nombre (sin Border/Fill/Font propios)
+CENTRADO = Alignment(horizontal='center', vertical='center')
+ESTILOS = {
+    "encabezado": {"fill": HEADER_FILL, "font": HEADER_FONT, "alignment": CENTRADO, "border": THIN_BORDER},
+    "texto": {"border": THIN_BORDER},
+    "entero": {"border": THIN_BORDER, "number_format": '#,##0'},
+    "porcentaje": {"border": THIN_BORDER, "number_format": '0.00%'},
+    "moneda": {"border": THIN_BORDER, "number_format": CURRENCY_FORMAT},
+    "dolares": {"border": THIN_BORDER, "number_format": '$#,##0'},
+    "pesos": {"border": THIN_BORDER, "number_format": '#,##0'}
+}
+BLOQUE_FILAS = 5_000  # Escenarios calculados por bloque en la exportacion streaming
+
 def aplicar_estilo_header(cell):
     cell.fill = HEADER_FILL
     cell.font = HEADER_FONT
@@ -53,6 +80,7 @@ def aplicar_estilo_total(cell):
 def aplicar_borde(cell):
     cell.border = THIN_BORDER
 
+@medido("excel:cargar_datos", "excel")
 def cargar_datos():
     with open(OUTPUT_DIR / "datos_paulina.json", "r", encoding="utf-8") as f:
         datos = json.load(f)
@@ -60,6 +88,16 @@ def cargar_datos():
         escenarios = json.load(f)
     return datos, escenarios
 
+@medido("excel:cargar_sensibilidad", "excel")
+def cargar_sensibilidad():
+    """Datos de tornado (opcional: generar_datos.py --sensibilidad)"""
+    ruta = OUTPUT_DIR / "sensibilidad_paulina.json"
+    if not ruta.exists():
+        return None
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@medido("excel:crear_hoja_resumen", "excel")
 def crear_hoja_resumen(wb, datos, escenarios):
     """Crea la hoja de resumen ejecutivo"""
     ws = wb.active
@@ -155,6 +193,7 @@ def crear_hoja_resumen(wb, datos, escenarios):
 
     return ws
 
+@medido("excel:crear_hoja_escenario", "excel")
 def crear_hoja_escenario(wb, nombre, escenario, datos):
     """Crea una hoja detallada para cada escenario"""
     ws = wb.create_sheet(title=nombre.capitalize())
@@ -291,6 +330,7 @@ def crear_hoja_escenario(wb, nombre, escenario, datos):
 
     return ws
 
+@medido("excel:crear_hoja_costos_base", "excel")
 def crear_hoja_costos_base(wb, datos):
     """Crea hoja con referencia de costos base"""
     ws = wb.create_sheet(title="Referencia Costos")
@@ -342,7 +382,274 @@ def crear_hoja_costos_base(wb, datos):
 
     return ws
 
-def main():
+@medido("excel:crear_hoja_sensibilidad", "excel")
+def crear_hoja_sensibilidad(wb, sensibilidad):
+    """Crea hoja con el analisis de sensibilidad (tornado) del total 4 anos"""
+    ws = wb.create_sheet(title="Sensibilidad")
+    tornado = sensibilidad["tornado"]["eur"]
+    base = tornado["base"]
+
+    ws.merge_cells('A1:G1')
+    ws['A1'] = f"SENSIBILIDAD DEL TOTAL 4 ANOS - ESCENARIO {sensibilidad['preset'].upper()}"
+    ws['A1'].font = Font(bold=True, size=14, color="1a365d")
+
+    ws.merge_cells('A2:G2')
+    ws['A2'] = f"Cada variable se mueve entre su minimo y maximo; el resto queda en su valor medio. Base: €{base:,.0f}"
+    ws['A2'].font = Font(italic=True, color="666666")
+
+    row = 4
+    headers = ["Variable", "Valor Min", "Valor Max", "Total con Min", "Total con Max",
+               "Cambio Min", "Cambio Max"]
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=row, column=col, value=header)
+        aplicar_estilo_header(cell)
+
+    start_data_row = row + 1
+    for barra in tornado["barras"]:
+        row += 1
+        formato_valor = PERCENT_FORMAT if barra["unidad"] == "%" else '#,##0.00'
+        ws.cell(row=row, column=1, value=barra["etiqueta"])
+        ws.cell(row=row, column=2, value=barra["valor_min"]).number_format = formato_valor
+        ws.cell(row=row, column=3, value=barra["valor_max"]).number_format = formato_valor
+        ws.cell(row=row, column=4, value=barra["total_min"])
+        ws.cell(row=row, column=5, value=barra["total_max"])
+        ws.cell(row=row, column=6, value=f"=D{row}-{base}")
+        ws.cell(row=row, column=7, value=f"=E{row}-{base}")
+
+        for col in range(1, 8):
+            aplicar_borde(ws.cell(row=row, column=col))
+            if col >= 4:
+                ws.cell(row=row, column=col).number_format = CURRENCY_FORMAT
+
+    # Grafico tornado: barras horizontales superpuestas de cambio vs. base
+    chart = BarChart()
+    chart.type = "bar"
+    chart.grouping = "clustered"
+    chart.overlap = 100
+    chart.title = "Impacto en el total 4 anos (EUR)"
+    chart.y_axis.title = "Cambio vs. base (EUR)"
+    chart.x_axis.scaling.orientation = "maxMin"
+    datos_chart = Reference(ws, min_col=6, max_col=7, min_row=start_data_row - 1, max_row=row)
+    categorias = Reference(ws, min_col=1, min_row=start_data_row, max_row=row)
+    chart.add_data(datos_chart, titles_from_data=True)
+    chart.set_categories(categorias)
+    chart.height = 12
+    chart.width = 22
+    ws.add_chart(chart, f"A{row + 3}")
+    row += 28
+
+    # Indices de Sobol (si se generaron)
+    if "sobol" in sensibilidad:
+        sobol = sensibilidad["sobol"]
+        ws[f'A{row}'] = f"INDICES DE SOBOL ({sobol['n_base']:,} muestras base, {sobol['evaluaciones']:,} evaluaciones)"
+        aplicar_estilo_header(ws[f'A{row}'])
+        ws.merge_cells(f'A{row}:C{row}')
+
+        row += 1
+        for col, header in enumerate(["Variable", "Primer Orden", "Total"], 1):
+            aplicar_estilo_subheader(ws.cell(row=row, column=col, value=header))
+
+        for fila in sobol["metricas"]["eur"]["indices"]:
+            row += 1
+            ws.cell(row=row, column=1, value=fila["etiqueta"])
+            ws.cell(row=row, column=2, value=fila["primer_orden"]).number_format = PERCENT_FORMAT
+            ws.cell(row=row, column=3, value=fila["total"]).number_format = PERCENT_FORMAT
+            for col in range(1, 4):
+                aplicar_borde(ws.cell(row=row, column=col))
+
+    ws.column_dimensions['A'].width = 45
+    for letra in "BCDEFG":
+        ws.column_dimensions[letra].width = 15
+
+    return ws
+
+@medido("excel:crear_hoja_flujo_mensual", "excel")
+def crear_hoja_flujo_mensual(wb, flujo):
+    """Crea hoja con el flujo de caja mes a mes de los tres escenarios"""
+    ws = wb.create_sheet(title="Flujo Mensual")
+    escenarios = flujo["escenarios"]
+    totales = totales_mensuales(flujo)
+    detalle = escenarios.index("moderado")
+    columnas_detalle = [("Matricula", "matricula"), ("Vuelos", "vuelos_colombia"),
+                        ("Gas/Calefaccion", "gas_calefaccion"), ("Emergencias", "emergencias")]
+
+    ws.merge_cells('A1:I1')
+    ws['A1'] = "FLUJO DE CAJA MENSUAL (EUR)"
+    ws['A1'].font = Font(bold=True, size=14, color="1a365d")
+
+    ws.merge_cells('A2:I2')
+    ws['A2'] = "Matricula en plazos, vuelos en diciembre/junio y calefaccion estacional. Detalle: escenario Moderado"
+    ws['A2'].font = Font(italic=True, color="666666")
+
+    row = 4
+    headers = ["Mes"] + [e.capitalize() for e in escenarios] + [n for n, _ in columnas_detalle] + ["Otros Gastos"]
+    for col, header in enumerate(headers, 1):
+        aplicar_estilo_header(ws.cell(row=row, column=col, value=header))
+
+    series = [serie_categoria(flujo, c)[detalle] for _, c in columnas_detalle]
+    start_data_row = row + 1
+    for m, mes in enumerate(flujo["meses"]):
+        row += 1
+        ws.cell(row=row, column=1, value=mes)
+        valores = [float(totales[e, m]) for e in range(len(escenarios))] + [float(s[m]) for s in series]
+        valores.append(float(totales[detalle, m]) - sum(float(s[m]) for s in series))
+        for col, valor in enumerate(valores, 2):
+            ws.cell(row=row, column=col, value=round(valor, 2)).number_format = CURRENCY_FORMAT
+        for col in range(1, len(headers) + 1):
+            aplicar_borde(ws.cell(row=row, column=col))
+
+    row += 1
+    ws.cell(row=row, column=1, value="TOTAL")
+    for col in range(1, len(headers) + 1):
+        cell = ws.cell(row=row, column=col)
+        if col > 1:
+            letra = get_column_letter(col)
+            cell.value = f"=SUM({letra}{start_data_row}:{letra}{row - 1})"
+            cell.number_format = CURRENCY_FORMAT
+        aplicar_estilo_total(cell)
+
+    chart = LineChart()
+    chart.title = "Salida de caja mensual por escenario"
+    chart.y_axis.title = "EUR"
+    datos_chart = Reference(ws, min_col=2, max_col=1 + len(escenarios), min_row=start_data_row - 1, max_row=row - 1)
+    chart.add_data(datos_chart, titles_from_data=True)
+    chart.set_categories(Reference(ws, min_col=1, min_row=start_data_row, max_row=row - 1))
+    chart.height = 10
+    chart.width = 24
+    ws.add_chart(chart, f"K{start_data_row}")
+
+    ws.column_dimensions['A'].width = 10
+    for col in range(2, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(col)].width = 15
+
+    return ws
+
+# ============================================================
+# EXPORTACION STREAMING (GRILLAS GRANDES)
+# ============================================================
+
+def registrar_estilos(wb):
+    """Agrega ESTILOS al libro como estilos con nombre (NamedStyle no se comparte entre libros)"""
+    for nombre, atributos in ESTILOS.items():
+        if nombre not in wb.named_styles:
+            wb.add_named_style(NamedStyle(name=nombre, **atributos))
+
+def celdas_estilizadas(ws, estilos):
+    """
+    Una WriteOnlyCell por columna con su estilo ya resuelto. append() escribe
+    la fila en el momento, asi que las mismas celdas se reusan en cada fila.
+    """
+    celdas = []
+    for estilo in estilos:
+        celda = WriteOnlyCell(ws)
+        celda.style = estilo
+        celdas.append(celda)
+    return celdas
+
+def escribir_filas(ws, celdas, columnas):
+    """Escribe una fila por elemento de las columnas (listas de Python de igual largo)"""
+    for valores in zip(*columnas):
+        for celda, valor in zip(celdas, valores):
+            celda.value = valor
+        ws.append(celdas)
+
+def escribir_encabezado(ws, encabezados, anchos, fijar="A2"):
+    """Anchos de columna (antes de la primera fila, como exige write-only) y fila de encabezado"""
+    for col, ancho in enumerate(anchos, 1):
+        ws.column_dimensions[get_column_letter(col)].width = ancho
+    ws.freeze_panes = fijar
+    escribir_filas(ws, celdas_estilizadas(ws, ["encabezado"] * len(encabezados)), [[h] for h in encabezados])
+
+def _bloques(grilla: dict, tam_bloque: int):
+    n = len(grilla["niveles"])
+    for inicio in range(0, n, tam_bloque):
+        yield {k: v[inicio:inicio + tam_bloque] for k, v in grilla.items()}
+
+def _columnas_parametros(parte: dict) -> list:
+    """Nivel, beca, opcionales, viajes e inflacion como listas de Python"""
+    etiquetas_opcionales = [", ".join(o for j, o in enumerate(OPCIONALES) if mascara >> j & 1) or "-"
+                            for mascara in range(1 << len(OPCIONALES))]
+    return [
+        [NIVELES[i] for i in parte["niveles"].tolist()],
+        ["Si" if d else "No" for d in parte["descuento_matricula"].tolist()],
+        [etiquetas_opcionales[m] for m in parte["opcionales"].tolist()],
+        parte["viajes_por_ano"].tolist(),
+        parte["inflacion"].tolist()
+    ]
+
+ENCABEZADOS_PARAMETROS = ["Nivel", "Beca", "Opcionales", "Viajes/Ano", "Inflacion"]
+ESTILOS_PARAMETROS = ["texto", "texto", "texto", "entero", "porcentaje"]
+ANCHOS_PARAMETROS = [10, 8, 60, 11, 11]
+
+@medido("excel:crear_hoja_grilla", "excel")
+def crear_hoja_grilla(wb, grilla, tam_bloque=BLOQUE_FILAS):
+    """Una fila por escenario de la grilla con sus totales (modo write-only)"""
+    ws = wb.create_sheet(title="Grilla Escenarios")
+    encabezados = ENCABEZADOS_PARAMETROS + ["Total Ano 1 (EUR)", "Total 4 Anos (EUR)", "Total 4 Anos (USD)",
+                                            "Total 4 Anos (COP)", "Promedio Mensual (EUR)"]
+    escribir_encabezado(ws, encabezados, ANCHOS_PARAMETROS + [18, 18, 18, 20, 22])
+
+    celdas = celdas_estilizadas(ws, ESTILOS_PARAMETROS + ["moneda", "moneda", "dolares", "pesos", "moneda"])
+    for parte in _bloques(grilla, tam_bloque):
+        resultado = calcular_escenarios_lote(**parte)
+        totales = [resultado[clave].tolist() for clave in ("total_anual", "total_4_anos_eur", "total_4_anos_usd",
+                                                           "total_4_anos_cop", "promedio_mensual")]
+        escribir_filas(ws, celdas, _columnas_parametros(parte) + totales)
+    return ws
+
+@medido("excel:crear_hoja_flujo_grilla", "excel")
+def crear_hoja_flujo_grilla(wb, grilla, tam_bloque=BLOQUE_FILAS):
+    """Salida de caja de cada mes, una fila por escenario (modo write-only)"""
+    ws = wb.create_sheet(title="Flujo Mensual")
+    meses = etiquetas_meses()
+    encabezados = ENCABEZADOS_PARAMETROS + meses
+    escribir_encabezado(ws, encabezados, ANCHOS_PARAMETROS + [11] * len(meses), fijar="F2")
+
+    celdas = celdas_estilizadas(ws, ESTILOS_PARAMETROS + ["moneda"] * len(meses))
+    for parte in _bloques(grilla, tam_bloque):
+        # El flujo completo es (escenarios x meses x categorias): por bloques queda acotado
+        totales = np.round(totales_mensuales(flujo_escenarios_lote(**parte)), 2)
+        escribir_filas(ws, celdas, _columnas_parametros(parte) + totales.T.tolist())
+    return ws
+
+def crear_libro_grilla(grilla, flujo=False, tam_bloque=BLOQUE_FILAS):
+    """Libro write-only con la grilla (y opcionalmente su flujo mensual); se guarda una sola vez"""
+    wb = Workbook(write_only=True)
+    registrar_estilos(wb)
+    crear_hoja_grilla(wb, grilla, tam_bloque)
+    if flujo:
+        crear_hoja_flujo_grilla(wb, grilla, tam_bloque)
+    return wb
+
+def crear_libro(datos, escenarios, sensibilidad=None):
+    """Arma el workbook completo (sin guardarlo)"""
+    wb = Workbook()
+    crear_hoja_resumen(wb, datos, escenarios)
+
+    for nombre in ["moderado", "austero", "comodo"]:
+        crear_hoja_escenario(wb, nombre, escenarios["escenarios"][nombre], datos)
+
+    with tramo("excel:flujo_presets", "excel"):
+        flujo = flujo_presets()
+    crear_hoja_flujo_mensual(wb, flujo)
+    crear_hoja_costos_base(wb, datos)
+
+    if sensibilidad:
+        crear_hoja_sensibilidad(wb, sensibilidad)
+    return wb
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generador de Excel - Paulina Madrid")
+    parser.add_argument("--grilla", action="store_true",
+                        help="Exportar la grilla de escenarios (write-only) en vez del resumen familiar")
+    parser.add_argument("--inflaciones", type=int, default=1, metavar="N",
+                        help="Con --grilla: N tasas de inflacion entre 0%% y 10%% (1 = la de SUPUESTOS)")
+    parser.add_argument("--flujo", action="store_true", help="Con --grilla: agregar el flujo mensual")
+    parser.add_argument("--salida", metavar="RUTA", help="Con --grilla: archivo de salida")
+    args = parser.parse_args(argv)
+    if args.grilla:
+        return main_grilla(args)
+
     print("=" * 60)
     print("GENERADOR DE EXCEL PROFESIONAL - PAULINA MADRID")
     print("=" * 60)
@@ -351,23 +658,16 @@ def main():
     print("\n[1/4] Cargando datos de JSONs...")
     datos, escenarios = cargar_datos()
 
-    # Crear workbook
+    # Crear workbook y hojas
     print("[2/4] Creando Excel...")
-    wb = Workbook()
-
-    # Crear hojas
     print("[3/4] Generando hojas...")
-    crear_hoja_resumen(wb, datos, escenarios)
-
-    for nombre in ["moderado", "austero", "comodo"]:
-        crear_hoja_escenario(wb, nombre, escenarios["escenarios"][nombre], datos)
-
-    crear_hoja_costos_base(wb, datos)
+    wb = crear_libro(datos, escenarios, cargar_sensibilidad())
 
     # Guardar
     output_path = OUTPUT_DIR / "resumen_paulina.xlsx"
     print(f"[4/4] Guardando en {output_path}...")
-    wb.save(output_path)
+    with tramo("excel:guardar", "excel", ruta=str(output_path)):
+        wb.save(output_path)
 
     print("\n" + "=" * 60)
     print("Excel generado exitosamente!")
@@ -379,5 +679,20 @@ def main():
     for sheet in wb.sheetnames:
         print(f"  - {sheet}")
 
+def main_grilla(args):
+    inflaciones = (np.linspace(0, 0.10, args.inflaciones) if args.inflaciones > 1
+                   else (SUPUESTOS["inflacion_espana"],))
+    grilla = grilla_parametros(inflaciones=inflaciones)
+    output_path = Path(args.salida) if args.salida else OUTPUT_DIR / "grilla_escenarios.xlsx"
+
+    print("=" * 60)
+    print("GENERADOR DE EXCEL - GRILLA DE ESCENARIOS (WRITE-ONLY)")
+    print("=" * 60)
+    print(f"\nEscenarios: {len(grilla['niveles']):,}" + (" (con flujo mensual)" if args.flujo else ""))
+    wb = crear_libro_grilla(grilla, flujo=args.flujo)
+    with tramo("excel:guardar", "excel", ruta=str(output_path)):
+        wb.save(output_path)
+    print(f"Archivo: {output_path}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Grilla precalculada de los sliders del dashboard - respuesta por indice.
+Los sliders de gastos mensuales solo entran al modelo por su suma, asi que
+el espacio se factoriza en:
+  total mensual (EUR enteros, de la suma de minimos a la de maximos)
+  x viajes por ano (0-4) x % de emergencias (0-15) x inflacion (0-8%, pasos
+  de 0,5) x descuento de matricula (si/no)
+y cada componente se guarda solo con los ejes de los que depende:
+  matricula    [descuento, inflacion, ano]
+  gastos_vida  [mensual, viajes, inflacion, ano]
+  emergencias  [mensual, viajes, descuento, emergencias, inflacion, ano]
+Todo en centimos int32, calculado con evaluar_centimos (mismas cifras que el
+JSON, el Excel y el calculo en vivo del dashboard). Una consulta lee una fila
+de cada array mapeado en memoria; un estado fuera de la grilla (gastos
+personalizados con centimos o fuera de rango, costos base distintos) devuelve
+None y el dashboard calcula en vivo.
+
+La grilla se escribe completa en un directorio temporal y se pone en lugar
+de la anterior (almacen_columnar.reemplazar): un dashboard que ya la tiene
+mapeada sigue leyendo los arrays viejos aunque cambien de forma.
+
+Estructura de output/grilla_sliders/:
+  esquema.json        version, fecha, ejes en unidades enteras, arrays
+  <componente>.npy    un array por componente
+Genera: grilla_sliders/
+"""
+
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from almacen_columnar import reemplazar
+from centimos import a_centimos, a_puntos
+from generar_datos import PERFIL, SUPUESTOS, COSTOS_BASE, OUTPUT_DIR, evaluar_centimos
+
+VERSION_GRILLA = 1
+DIRECTORIO_GRILLA = OUTPUT_DIR / "grilla_sliders"
+
+# Dominios de los sliders de app.py (los montos mensuales salen de COSTOS_BASE)
+CATEGORIAS_SLIDERS = ["vivienda", "electricidad", "gas_calefaccion", "agua", "internet", "celular",
+                      "supermercado", "seguro_medico"]
+CATEGORIAS_OPCIONALES = ["ocio_cultura", "ropa_personal", "materiales_estudio"]
+VIAJES_GRILLA = tuple(range(0, 5))
+EMERGENCIAS_GRILLA = tuple(p / 100 for p in range(0, 16))
+INFLACIONES_GRILLA = tuple(float(i) / 1000 for i in range(0, 81, 5))
+
+# ============================================================
+# DOMINIO
+# ============================================================
+
+def rango_mensual(costos: dict = None, perfil: dict = None) -> tuple:
+    """(minimo, maximo) en EUR enteros del total mensual que pueden sumar los sliders"""
+    costos = costos or COSTOS_BASE
+    perfil = perfil or PERFIL
+    transporte = costos["transporte"]["min"] if perfil["menor_26"] else costos["transporte"]["max"]
+    minimo = sum(costos[c]["min"] for c in CATEGORIAS_SLIDERS) + transporte  # Opcionales apagados
+    maximo = sum(costos[c]["max"] for c in CATEGORIAS_SLIDERS + CATEGORIAS_OPCIONALES) + transporte
+    return int(minimo), int(maximo)
+
+
+def ejes_grilla() -> dict:
+    minimo, maximo = rango_mensual()
+    return {
+        "mensual": np.arange(minimo, maximo + 1, dtype=np.int64),
+        "viajes": np.array(VIAJES_GRILLA, dtype=np.int64),
+        "descuento": np.array([0.0, SUPUESTOS["descuento_matricula_disponible"]]),
+        "emergencias": np.array(EMERGENCIAS_GRILLA),
+        "inflacion": np.array(INFLACIONES_GRILLA)
+    }
+
+# ============================================================
+# ESCRITURA
+# ============================================================
+
+def calcular_grilla() -> tuple:
+    """(ejes, {componente: array int32}) evaluando una inflacion por vez"""
+    ejes = ejes_grilla()
+    anos = PERFIL["duracion_anos"]
+    n_m, n_v, n_d, n_p, n_i = (len(ejes[e]) for e in ("mensual", "viajes", "descuento", "emergencias", "inflacion"))
+    componentes = {
+        "matricula": np.empty((n_d, n_i, anos), dtype=np.int32),
+        "gastos_vida": np.empty((n_m, n_v, n_i, anos), dtype=np.int32),
+        "emergencias": np.empty((n_m, n_v, n_d, n_p, n_i, anos), dtype=np.int32)
+    }
+
+    for i, inflacion in enumerate(ejes["inflacion"]):
+        c = evaluar_centimos(ejes["mensual"].reshape(-1, 1, 1, 1).astype(np.float64),
+                             COSTOS_BASE["vuelos_colombia"]["medio"],
+                             ejes["viajes"].reshape(1, -1, 1, 1),
+                             ejes["descuento"].reshape(1, 1, -1, 1),
+                             ejes["emergencias"].reshape(1, 1, 1, -1),
+                             float(inflacion))
+        proy = {k: np.broadcast_to(v, (n_m, n_v, n_d, n_p, anos)) for k, v in c["proyeccion_anual"].items()}
+        componentes["matricula"][:, i] = proy["matricula"][0, 0, :, 0]
+        componentes["gastos_vida"][:, :, i] = proy["gastos_vida"][:, :, 0, 0]
+        componentes["emergencias"][:, :, :, :, i] = proy["emergencias"]
+    return ejes, componentes
+
+
+def guardar_grilla(directorio=None):
+    """
+    Escribe los arrays y esquema.json en <directorio>.tmp y lo pone en lugar
+    de la grilla anterior: nunca se escribe sobre un .npy que un lector
+    pueda tener mapeado.
+    """
+    directorio = Path(directorio or DIRECTORIO_GRILLA)
+    temporal = directorio.with_name(directorio.name + ".tmp")
+    shutil.rmtree(temporal, ignore_errors=True)
+    temporal.mkdir(parents=True)
+
+    ejes, componentes = calcular_grilla()
+    arrays = {}
+    for nombre, valores in componentes.items():
+        archivo = f"{nombre}.npy"
+        np.save(temporal / archivo, valores)
+        arrays[nombre] = {"archivo": archivo, "dtype": valores.dtype.str, "forma": list(valores.shape)}
+
+    # Ejes en las unidades enteras del nucleo (centimos, puntos basicos), como las consultas
+    esquema = {
+        "version": VERSION_GRILLA,
+        "fecha_generacion": datetime.now().isoformat(),
+        "duracion_anos": PERFIL["duracion_anos"],
+        "matricula_base": int(a_centimos(COSTOS_BASE["matricula"]["anual_base"])),
+        "costo_vuelo": int(a_centimos(COSTOS_BASE["vuelos_colombia"]["medio"])),
+        "ejes": {
+            "mensual": {"inicio": int(a_centimos(int(ejes["mensual"][0]))), "paso": 100, "n": len(ejes["mensual"])},
+            "viajes": {"inicio": 0, "paso": 1, "n": len(ejes["viajes"])},
+            "emergencias": {"inicio": 0, "paso": 100, "n": len(ejes["emergencias"])},
+            "inflacion": {"inicio": 0, "paso": 50, "n": len(ejes["inflacion"])},
+            "descuento": [int(a_puntos(d)) for d in ejes["descuento"]]
+        },
+        "arrays": arrays
+    }
+    with open(temporal / "esquema.json", "w", encoding="utf-8") as f:
+        json.dump(esquema, f, indent=2, ensure_ascii=False)
+    reemplazar(temporal, directorio)
+    return directorio
+
+# ============================================================
+# LECTURA
+# ============================================================
+
+def abrir_grilla(directorio=None) -> dict:
+    """{"esquema": ..., "<componente>": array mapeado en memoria}; None si no hay grilla"""
+    directorio = directorio or DIRECTORIO_GRILLA
+    ruta_esquema = directorio / "esquema.json"
+    if not ruta_esquema.exists():
+        return None
+    with open(ruta_esquema, "r", encoding="utf-8") as f:
+        esquema = json.load(f)
+    if esquema["version"] != VERSION_GRILLA:
+        return None
+
+    grilla = {"esquema": esquema}
+    for nombre, info in esquema["arrays"].items():
+        grilla[nombre] = np.load(directorio / info["archivo"], mmap_mode="r")
+    return grilla
+
+
+def _indice(eje: dict, valor: int):
+    desplazamiento = valor - eje["inicio"]
+    if desplazamiento % eje["paso"]:
+        return None
+    indice = desplazamiento // eje["paso"]
+    return indice if 0 <= indice < eje["n"] else None
+
+
+def consultar(grilla: dict, matricula_base: int, descuento: int, mensual: int, costo_vuelo: int,
+              vuelos_por_ano: int, pct_emergencias: int, inflacion: int, anos: int):
+    """
+    Proyeccion por indice, con montos en centimos y tasas en puntos basicos
+    (como motor_proyeccion.estado_canonico). Devuelve tuplas por ano
+    (matricula, gastos_vida, emergencias) o None si el estado no esta en la grilla.
+    """
+    esquema = grilla["esquema"]
+    if (matricula_base, costo_vuelo, anos) != (esquema["matricula_base"], esquema["costo_vuelo"],
+                                               esquema["duracion_anos"]):
+        return None
+    ejes = esquema["ejes"]
+    if descuento not in ejes["descuento"]:
+        return None
+    d = ejes["descuento"].index(descuento)
+    m = _indice(ejes["mensual"], mensual)
+    v = _indice(ejes["viajes"], vuelos_por_ano)
+    p = _indice(ejes["emergencias"], pct_emergencias)
+    i = _indice(ejes["inflacion"], inflacion)
+    if m is None or v is None or p is None or i is None:
+        return None
+    return (tuple(grilla["matricula"][d, i].tolist()), tuple(grilla["gastos_vida"][m, v, i].tolist()),
+            tuple(grilla["emergencias"][m, v, d, p, i].tolist()))
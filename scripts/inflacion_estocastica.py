@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Inflacion estocastica - trayectorias de inflacion por ano y por categoria.
+En vez de un solo inflacion_espana compuesto todos los anos, cada ano se
+sortea un choque general y, opcionalmente, un diferencial por grupo de
+categorias (el alquiler no sube igual que el supermercado):
+
+  inflacion[g, t] = centro + choque_general[t] + diferencial[g] + desviacion[g] * e[g, t]
+
+acotada a [minimo, maximo]. Los choques estandarizados se sortean una vez;
+cambiar el centro (el slider de inflacion del dashboard) solo rehace la
+suma y el producto acumulado, asi que recalcular las bandas de un escenario
+es un par de operaciones sobre una matriz (trayectorias x anos x grupos).
+Como en el modelo deterministico, el ano 1 usa precios actuales (factor 1).
+La referencia con inflacion constante sale del nucleo en centimos
+(evaluar_centimos): es el total publicado en escenarios_paulina.json.
+Genera: inflacion_paulina.json
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+
+from centimos import a_euros
+from generar_datos import (PERFIL, SUPUESTOS, PRESETS, COSTOS_BASE, OUTPUT_DIR,
+                           evaluar_centimos, mascara_opcionales, parametros_lote)
+
+# ============================================================
+# DISTRIBUCIONES
+# ============================================================
+
+# Choque comun a todas las categorias (desvio anual del IPC respecto al centro)
+INFLACION_GENERAL = {
+    "distribucion": "t",      # "normal" o "t" (colas gruesas)
+    "grados_libertad": 5,
+    "desviacion": 0.012,
+    "minimo": -0.01,
+    "maximo": 0.12
+}
+
+# Grupos de categorias: diferencial medio respecto al IPC y ruido propio anual
+GRUPOS_INFLACION = {
+    "vivienda": {"categorias": ["vivienda"], "diferencial": 0.010, "desviacion": 0.015},
+    "alimentacion": {"categorias": ["supermercado"], "diferencial": 0.005, "desviacion": 0.012},
+    "energia": {"categorias": ["electricidad", "gas_calefaccion", "agua"], "diferencial": 0.0, "desviacion": 0.040},
+    "telecomunicaciones": {"categorias": ["internet", "celular"], "diferencial": -0.010, "desviacion": 0.010},
+    "transporte": {"categorias": ["transporte"], "diferencial": 0.0, "desviacion": 0.010},
+    "educacion": {"categorias": ["matricula", "materiales_estudio"], "diferencial": 0.010, "desviacion": 0.008},
+    "vuelos": {"categorias": ["vuelos_colombia"], "diferencial": 0.0, "desviacion": 0.050},
+    "general": {"categorias": [], "diferencial": 0.0, "desviacion": 0.005}  # Todo lo demas
+}
+
+GRUPOS = tuple(GRUPOS_INFLACION)
+GRUPO_POR_CATEGORIA = {c: g for g, datos in GRUPOS_INFLACION.items() for c in datos["categorias"]}
+
+PERCENTILES = (10, 50, 90)
+TRAYECTORIAS = 2_000  # Suficiente para P10/P90 estables y barato en cada rerun
+
+
+def grupo_de(categoria: str) -> str:
+    return GRUPO_POR_CATEGORIA.get(categoria, "general")
+
+# ============================================================
+# TRAYECTORIAS
+# ============================================================
+
+def sortear_choques(n: int, anos: int, semilla: int = None, general: dict = None) -> dict:
+    """
+    Choques estandarizados para anos-1 cambios de precio:
+    {"general": (n x anos-1), "grupos": (n x anos-1 x grupos)}.
+    No dependen del centro, asi que se reusan para cualquier inflacion media.
+    """
+    general = general or INFLACION_GENERAL
+    rng = np.random.default_rng(semilla)
+    pasos = max(anos - 1, 0)
+    if general["distribucion"] == "t":
+        gl = general["grados_libertad"]
+        # Escalada a varianza 1 para que "desviacion" signifique lo mismo en ambas
+        comun = rng.standard_t(gl, size=(n, pasos)) * np.sqrt((gl - 2) / gl)
+    elif general["distribucion"] == "normal":
+        comun = rng.standard_normal((n, pasos))
+    else:
+        raise ValueError(f"Distribucion desconocida: {general['distribucion']}")
+    return {"general": comun, "grupos": rng.standard_normal((n, pasos, len(GRUPOS)))}
+
+
+def tasas_inflacion(choques: dict, centro: float, por_categoria: bool = True,
+                    general: dict = None, grupos: dict = None) -> np.ndarray:
+    """(n x anos-1 x grupos) inflacion de cada ano; sin por_categoria todas comparten el choque general"""
+    general = general or INFLACION_GENERAL
+    grupos = grupos or GRUPOS_INFLACION
+    tasas = centro + general["desviacion"] * choques["general"][:, :, None]
+    if por_categoria:
+        diferencial = np.array([grupos[g]["diferencial"] for g in GRUPOS])
+        desviacion = np.array([grupos[g]["desviacion"] for g in GRUPOS])
+        tasas = tasas + diferencial + desviacion * choques["grupos"]
+    else:
+        tasas = np.broadcast_to(tasas, choques["grupos"].shape)
+    return np.clip(tasas, general["minimo"], general["maximo"])
+
+
+def factores_acumulados(tasas: np.ndarray) -> np.ndarray:
+    """(n x anos x grupos) factor de precio de cada ano respecto al ano 1"""
+    n, pasos, k = tasas.shape
+    factores = np.ones((n, pasos + 1, k))
+    np.cumprod(1 + tasas, axis=1, out=factores[:, 1:])
+    return factores
+
+# ============================================================
+# PROYECCION
+# ============================================================
+
+def componentes_por_grupo(mensuales: dict, matricula_anual: float, vuelos_anual: float) -> np.ndarray:
+    """Gasto del ano 1 (EUR, sin emergencias) agregado por grupo de inflacion"""
+    componentes = np.zeros(len(GRUPOS))
+    for categoria, valor in mensuales.items():
+        componentes[GRUPOS.index(grupo_de(categoria))] += valor * SUPUESTOS["meses_por_ano"]
+    componentes[GRUPOS.index(grupo_de("matricula"))] += matricula_anual
+    componentes[GRUPOS.index(grupo_de("vuelos_colombia"))] += vuelos_anual
+    return componentes
+
+
+def proyectar_trayectorias(factores: np.ndarray, componentes, pct_emergencias: float) -> np.ndarray:
+    """
+    (n x anos) total anual por trayectoria. Las emergencias son un porcentaje
+    del resto, asi que heredan la inflacion de cada grupo.
+    """
+    return (factores @ np.asarray(componentes, dtype=np.float64)) * (1 + pct_emergencias)
+
+
+def bandas(totales_por_ano: np.ndarray, percentiles=PERCENTILES) -> dict:
+    """Percentiles por ano y del total acumulado"""
+    return {
+        "por_ano": {f"p{q}": v for q, v in zip(percentiles, np.percentile(totales_por_ano, percentiles, axis=0))},
+        "total": {f"p{q}": float(v) for q, v in zip(percentiles, np.percentile(totales_por_ano.sum(axis=1), percentiles))},
+        "media_total": float(totales_por_ano.sum(axis=1).mean())
+    }
+
+# ============================================================
+# ESCENARIOS PREDEFINIDOS
+# ============================================================
+
+def total_constante_preset(preset: str, inflacion: float) -> float:
+    """Total 4 anos en EUR con inflacion constante, al centimo como calcular_escenario"""
+    config = PRESETS[preset]
+    parametros = parametros_lote(config["nivel"], config["descuento_matricula"],
+                                 mascara_opcionales(config["incluir_opcionales"]), config["viajes_por_ano"])
+    c = evaluar_centimos(float(parametros["mensuales"].sum()), float(parametros["costo_vuelo"]),
+                         int(parametros["viajes_por_ano"]), float(parametros["descuento"]),
+                         float(parametros["pct_emergencias"]), inflacion)
+    return a_euros(c["total_4_anos_eur"])
+
+
+def componentes_preset(preset: str) -> tuple:
+    """(componentes por grupo, pct_emergencias) de un preset, con los valores del modelo vectorizado"""
+    config = PRESETS[preset]
+    parametros = parametros_lote(config["nivel"], config["descuento_matricula"],
+                                 mascara_opcionales(config["incluir_opcionales"]), config["viajes_por_ano"])
+    mensuales = dict(zip(parametros["categorias"], parametros["mensuales"].tolist()))
+    matricula_anual = COSTOS_BASE["matricula"]["anual_base"] * (1 - float(parametros["descuento"]))
+    vuelos_anual = float(parametros["costo_vuelo"] * parametros["viajes_por_ano"])
+    return componentes_por_grupo(mensuales, matricula_anual, vuelos_anual), float(parametros["pct_emergencias"])
+
+
+def generar_inflacion(n_trayectorias: int = TRAYECTORIAS, semilla: int = None, centro: float = None,
+                      por_categoria: bool = True) -> dict:
+    """Bandas de cada preset con las mismas trayectorias de inflacion"""
+    centro = SUPUESTOS["inflacion_espana"] if centro is None else centro
+    anos = PERFIL["duracion_anos"]
+    tasas = tasas_inflacion(sortear_choques(n_trayectorias, anos, semilla), centro, por_categoria)
+    factores = factores_acumulados(tasas)
+
+    escenarios = {}
+    for preset in PRESETS:
+        componentes, pct_emergencias = componentes_preset(preset)
+        resultado = bandas(proyectar_trayectorias(factores, componentes, pct_emergencias))
+        escenarios[preset] = {
+            "total_4_anos_eur": {k: round(v, 2) for k, v in resultado["total"].items()},
+            "media_4_anos_eur": round(resultado["media_total"], 2),
+            "inflacion_constante_eur": total_constante_preset(preset, centro),
+            "por_ano": [
+                {"ano": PERFIL["ano_inicio"] + i, "numero_ano": i + 1,
+                 **{k: round(float(v[i]), 2) for k, v in resultado["por_ano"].items()}}
+                for i in range(anos)
+            ]
+        }
+
+    return {
+        "metadata": {
+            "fecha_generacion": datetime.now().isoformat(),
+            "descripcion": "Bandas de percentiles con inflacion estocastica por ano y categoria",
+            "percentiles": list(PERCENTILES)
+        },
+        "configuracion": {
+            "trayectorias": n_trayectorias,
+            "semilla": semilla,
+            "centro": centro,
+            "por_categoria": por_categoria,
+            "general": INFLACION_GENERAL,
+            "grupos": GRUPOS_INFLACION
+        },
+        "inflacion_por_grupo": {
+            g: {f"p{q}": round(float(v), 4) for q, v in zip(PERCENTILES, np.percentile(tasas[:, :, j], PERCENTILES))}
+            for j, g in enumerate(GRUPOS)
+        },
+        "escenarios": escenarios
+    }
+
+
+def guardar_inflacion(resumen: dict, ruta=None):
+    ruta = ruta or OUTPUT_DIR / "inflacion_paulina.json"
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(resumen, f, indent=2, ensure_ascii=False)
+    return ruta
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Modo lote - escenarios para muchos estudiantes en una sola corrida.
+Lee un archivo de perfiles (.jsonl o .csv, un estudiante por fila), calcula
+los escenarios predefinidos de cada uno y escribe una linea JSON por perfil a
+medida que avanza, asi que la memoria no crece con el tamano de la cohorte.
+Con trabajadores > 1 reparte grupos de perfiles en un pool de procesos,
+conservando el orden de entrada y un numero acotado de grupos en vuelo.
+
+Campos del perfil (todos opcionales, por defecto los de PERFIL):
+  id, nombre, edad, menor_26 (si falta se deduce de la edad), ano_inicio,
+  duracion_anos, pais_origen, moneda_origen (EUR/USD/COP),
+  tasa_origen (EUR -> moneda de origen, obligatoria para otras monedas),
+  descuento_elegible (si/no)
+Genera: escenarios_lote.jsonl
+"""
+
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from centimos import a_centimos, a_euros, convertir
+from generar_datos import PERFIL, SUPUESTOS, PRESETS, OUTPUT_DIR, calcular_escenario
+
+# ============================================================
+# LECTURA DE PERFILES
+# ============================================================
+
+TIPOS_CAMPOS = {
+    "edad": int,
+    "ano_inicio": int,
+    "duracion_anos": int,
+    "tasa_origen": float,
+    "menor_26": bool,
+    "descuento_elegible": bool
+}
+
+VALORES_VERDADEROS = {"1", "si", "sí", "true", "yes", "x"}
+
+# Moneda de origen -> clave de SUPUESTOS["tasas_cambio"] (None = EUR)
+TASAS_ORIGEN = {"EUR": None, "USD": "EUR_USD", "COP": "EUR_COP"}
+
+PERFILES_POR_TAREA = 64   # Perfiles que procesa cada tarea del pool
+TAREAS_EN_VUELO = 4       # Tareas pendientes por trabajador (acota la memoria)
+
+
+def _convertir(campo: str, valor: str):
+    tipo = TIPOS_CAMPOS.get(campo)
+    if tipo is bool:
+        return valor.strip().lower() in VALORES_VERDADEROS
+    return tipo(valor) if tipo else valor
+
+
+def leer_perfiles(ruta):
+    """Genera los perfiles del archivo uno a uno (CSV con encabezado o JSONL)"""
+    ruta = Path(ruta)
+    with open(ruta, "r", encoding="utf-8", newline="") as f:
+        if ruta.suffix.lower() == ".csv":
+            for fila in csv.DictReader(f):
+                yield {campo: _convertir(campo, valor) for campo, valor in fila.items() if valor not in ("", None)}
+        else:
+            for linea in f:
+                if linea.strip():
+                    yield json.loads(linea)
+
+
+def normalizar_perfil(datos: dict, indice: int) -> dict:
+    """
+    Completa el perfil con los valores por defecto de PERFIL. Valida la moneda
+    aqui, al leer, para que un perfil invalido falle con su id antes de
+    repartirlo al pool.
+    """
+    perfil = {**PERFIL, "id": indice, "moneda_origen": "COP", "descuento_elegible": True}
+    perfil.update(datos)
+    if "menor_26" not in datos and "edad" in datos:
+        perfil["menor_26"] = perfil["edad"] < 26
+    if "tasa_origen" not in perfil and perfil["moneda_origen"] not in TASAS_ORIGEN:
+        raise ValueError(f"Perfil {perfil['id']} ({perfil['nombre']}): moneda_origen desconocida "
+                         f"{perfil['moneda_origen']!r} (opciones: {', '.join(TASAS_ORIGEN)}, "
+                         f"o indicar tasa_origen)")
+    return perfil
+
+# ============================================================
+# EVALUACION
+# ============================================================
+
+def tasa_origen(perfil: dict) -> float:
+    if "tasa_origen" in perfil:
+        return perfil["tasa_origen"]
+    clave = TASAS_ORIGEN[perfil["moneda_origen"]]
+    return SUPUESTOS["tasas_cambio"][clave] if clave else 1
+
+
+def evaluar_perfil(perfil: dict) -> dict:
+    """Escenarios predefinidos de un estudiante, con totales en su moneda de origen"""
+    escenarios = {}
+    for clave, preset in PRESETS.items():
+        config = {**preset, "descuento_matricula": preset["descuento_matricula"] and perfil["descuento_elegible"]}
+        escenarios[clave] = calcular_escenario(**config, perfil=perfil)
+
+    tasa = tasa_origen(perfil)
+    comparativa = {}
+    for clave, esc in escenarios.items():
+        total = a_centimos(esc["totales"]["total_4_anos_eur"])
+        comparativa[clave] = {
+            "total_eur": esc["totales"]["total_4_anos_eur"],
+            "total_origen": a_euros(convertir(total, tasa)),
+            "promedio_mensual": esc["totales"]["promedio_mensual"],
+            "ahorro_beca": a_euros(a_centimos(esc["resumen_ano_1"]["ahorro_por_descuento"]) * perfil["duracion_anos"])
+        }
+
+    return {"perfil": perfil, "moneda_origen": perfil["moneda_origen"], "tasa_origen": tasa,
+            "escenarios": escenarios, "comparativa": comparativa}
+
+
+def _evaluar_grupo(perfiles: list) -> list:
+    """Tarea del pool: devuelve las lineas ya serializadas"""
+    return [json.dumps(evaluar_perfil(p), ensure_ascii=False) for p in perfiles]
+
+
+def _grupos(iterable, tamano: int):
+    grupo = []
+    for elemento in iterable:
+        grupo.append(elemento)
+        if len(grupo) == tamano:
+            yield grupo
+            grupo = []
+    if grupo:
+        yield grupo
+
+
+def _lineas_en_paralelo(perfiles, trabajadores: int):
+    """Resultados en orden de entrada, con a lo sumo TAREAS_EN_VUELO tareas por trabajador"""
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        pendientes = deque()
+        for grupo in _grupos(perfiles, PERFILES_POR_TAREA):
+            pendientes.append(pool.submit(_evaluar_grupo, grupo))
+            if len(pendientes) >= trabajadores * TAREAS_EN_VUELO:
+                yield from pendientes.popleft().result()
+        while pendientes:
+            yield from pendientes.popleft().result()
+
+
+def generar_lote(ruta_perfiles, ruta_salida=None, trabajadores: int = 1) -> dict:
+    """
+    Procesa el archivo de perfiles y escribe escenarios_lote.jsonl (una linea
+    por perfil, en el orden de entrada). trabajadores=0 usa todos los nucleos.
+    """
+    ruta_salida = Path(ruta_salida or OUTPUT_DIR / "escenarios_lote.jsonl")
+    trabajadores = trabajadores or os.cpu_count()
+    perfiles = (normalizar_perfil(datos, i) for i, datos in enumerate(leer_perfiles(ruta_perfiles), 1))
+
+    if trabajadores > 1:
+        lineas = _lineas_en_paralelo(perfiles, trabajadores)
+    else:
+        lineas = (json.dumps(evaluar_perfil(p), ensure_ascii=False) for p in perfiles)
+
+    n = 0
+    with open(ruta_salida, "w", encoding="utf-8") as f:
+        for linea in lineas:
+            f.write(linea + "\n")
+            n += 1
+    return {"perfiles": n, "ruta": ruta_salida}
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Simulador Monte Carlo de incertidumbre de costos - Paulina en Madrid.
+Usa los rangos (min, medio, max) de COSTOS_BASE como distribuciones triangulares
+y resume el total de 4 anos en bandas de percentiles (P10/P50/P90).
+Los resultados se acumulan en sketches combinables (t-digest + media/varianza
+corrientes), por lo que la memoria no crece con el numero de trayectorias.
+Genera: montecarlo_paulina.json
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from estadisticas_streaming import EstadisticasCorrientes, TDigest
+from generar_datos import (COSTOS_BASE, SUPUESTOS, PERFIL, PRESETS, OPCIONALES,
+                           MASCARA_TODOS, OUTPUT_DIR, mascara_opcionales)
+
+# ============================================================
+# CONFIGURACION DE LA SIMULACION
+# ============================================================
+
+PERCENTILES = (10, 50, 90)
+TAM_BLOQUE = 50_000  # Trayectorias por bloque: acota la memoria de trabajo
+BINS_HISTOGRAMA = 40
+COMPRESION = 200  # Parametro delta del t-digest (~100 centroides por sketch)
+
+# Gastos contratados: un valor por trayectoria que se mantiene todos los meses
+CATEGORIAS_CONTRATO = ["vivienda", "internet", "celular", "transporte", "seguro_medico"]
+
+# Consumos que se mueven con una categoria ancla (mezcla comonotona:
+# con probabilidad "correlacion" el mes usa el mismo cuantil que el ancla)
+GRUPOS_CORRELACIONADOS = {
+    "vivienda": {
+        "categorias": ["electricidad", "gas_calefaccion", "agua"],
+        "correlacion": 0.6
+    }
+}
+
+# ============================================================
+# DISTRIBUCIONES
+# ============================================================
+
+def triangular_inversa(u, minimo, moda, maximo):
+    """Inversa de la CDF triangular, vectorizada (u en [0, 1))"""
+    minimo = np.asarray(minimo, dtype=np.float64)
+    moda = np.asarray(moda, dtype=np.float64)
+    maximo = np.asarray(maximo, dtype=np.float64)
+    rango = maximo - minimo
+    corte = np.divide(moda - minimo, rango, out=np.zeros_like(rango), where=rango > 0)
+    izquierda = minimo + np.sqrt(u * rango * (moda - minimo))
+    derecha = maximo - np.sqrt((1 - u) * rango * (maximo - moda))
+    return np.where(u < corte, izquierda, derecha)
+
+
+def _rango(categoria: str) -> tuple:
+    """(min, moda, max) de una categoria mensual"""
+    datos = COSTOS_BASE[categoria]
+    if categoria == "transporte":
+        # Precio fijo segun edad (Abono Joven), no es una incertidumbre
+        valor = datos["min"] if PERFIL["menor_26"] else datos["max"]
+        return valor, valor, valor
+    medio = datos.get("medio", 0)
+    return datos.get("min", medio), medio, datos.get("max", medio)
+
+
+def _categorias_incluidas(mascara: int) -> list:
+    categorias = []
+    for categoria, datos in COSTOS_BASE.items():
+        if categoria in ("matricula", "emergencias", "vuelos_colombia"):
+            continue
+        if categoria in OPCIONALES and not mascara & (1 << OPCIONALES.index(categoria)):
+            continue
+        categorias.append(categoria)
+    return categorias
+
+# ============================================================
+# SIMULACION POR BLOQUES
+# ============================================================
+
+def _preparar(opcionales: int, viajes_por_ano: int) -> dict:
+    """Precalcula indices y rangos comunes a todos los bloques"""
+    categorias = _categorias_incluidas(opcionales)
+    contrato = [c for c in categorias if c in CATEGORIAS_CONTRATO]
+    variables = [c for c in categorias if c not in CATEGORIAS_CONTRATO]
+
+    grupos = []
+    for ancla, grupo in GRUPOS_CORRELACIONADOS.items():
+        if ancla not in contrato:
+            continue
+        columnas = [variables.index(c) for c in grupo["categorias"] if c in variables]
+        if columnas:
+            grupos.append((contrato.index(ancla), columnas, grupo["correlacion"]))
+
+    vuelo = COSTOS_BASE["vuelos_colombia"]
+    incluir_vuelos = bool(opcionales & (1 << OPCIONALES.index("vuelos_colombia")))
+    emerg = COSTOS_BASE["emergencias"]
+    incluir_emergencias = bool(opcionales & (1 << OPCIONALES.index("emergencias")))
+
+    return {
+        "categorias": contrato + variables,
+        "rango_contrato": np.array([_rango(c) for c in contrato], dtype=np.float64).reshape(-1, 3).T,
+        "rango_variables": np.array([_rango(c) for c in variables], dtype=np.float64).reshape(-1, 3).T,
+        "grupos": grupos,
+        "viajes": viajes_por_ano if incluir_vuelos else 0,
+        "rango_vuelo": (vuelo["min"], vuelo["medio"], vuelo["max"]),
+        "rango_emergencias": ((emerg["min_porcentaje"], emerg["porcentaje_del_total"],
+                               emerg["max_porcentaje"]) if incluir_emergencias else None)
+    }
+
+
+def simular_bloque(rng, n: int, config: dict, matricula_anual: float, factores) -> dict:
+    """
+    Simula n trayectorias. Devuelve el total anual por trayectoria (n x anos)
+    y el total de 4 anos por categoria (n x categorias_resumen).
+    Contratos: un sorteo por trayectoria. Consumos: un sorteo por mes.
+    Vuelos: un sorteo por viaje. Emergencias: un porcentaje por trayectoria.
+    """
+    meses = SUPUESTOS["meses_por_ano"]
+    anos = len(factores)
+    a_c, m_c, b_c = config["rango_contrato"]
+    a_v, m_v, b_v = config["rango_variables"]
+    n_contrato, n_variables = len(a_c), len(a_v)
+
+    u_contrato = rng.random((n, n_contrato))
+    contrato_anual = triangular_inversa(u_contrato, a_c, m_c, b_c) * meses
+
+    if config["rango_emergencias"] is not None:
+        pct_emergencias = triangular_inversa(rng.random(n), *config["rango_emergencias"])
+    else:
+        pct_emergencias = np.zeros(n)
+
+    totales = np.empty((n, anos))
+    # Columnas: categorias mensuales, vuelos, matricula, emergencias
+    por_categoria = np.zeros((n, n_contrato + n_variables + 3))
+    for i, factor in enumerate(factores):
+        u = rng.random((n, meses, n_variables))
+        for ancla, columnas, correlacion in config["grupos"]:
+            comun = rng.random((n, meses, len(columnas))) < correlacion
+            u[:, :, columnas] = np.where(comun, u_contrato[:, ancla, None, None], u[:, :, columnas])
+        variables_anual = triangular_inversa(u, a_v, m_v, b_v).sum(axis=1)
+
+        vuelos_anual = np.zeros(n)
+        if config["viajes"]:
+            vuelos = triangular_inversa(rng.random((n, config["viajes"])), *config["rango_vuelo"])
+            vuelos_anual = vuelos.sum(axis=1)
+
+        gastos_vida = contrato_anual.sum(axis=1) + variables_anual.sum(axis=1) + vuelos_anual
+        emergencias = (matricula_anual + gastos_vida) * pct_emergencias
+        totales[:, i] = (matricula_anual + gastos_vida + emergencias) * factor
+
+        por_categoria[:, :n_contrato] += contrato_anual * factor
+        por_categoria[:, n_contrato:-3] += variables_anual * factor
+        por_categoria[:, -3] += vuelos_anual * factor
+        por_categoria[:, -2] += matricula_anual * factor
+        por_categoria[:, -1] += emergencias * factor
+
+    return {"totales_por_ano": totales, "por_categoria": por_categoria}
+
+# ============================================================
+# RESUMENES EN STREAMING
+# ============================================================
+
+def nuevo_resumen(anos: int, n_categorias: int) -> dict:
+    """Sketches combinables: tamano constante sin importar las trayectorias"""
+    return {
+        "total": TDigest(COMPRESION),
+        "por_ano": [TDigest(COMPRESION) for _ in range(anos)],
+        "stats_total": EstadisticasCorrientes(),
+        "stats_ano": EstadisticasCorrientes((anos,)),
+        "stats_categoria": EstadisticasCorrientes((n_categorias,))
+    }
+
+
+def resumir_bloque(bloque: dict) -> dict:
+    totales = bloque["totales_por_ano"]
+    total = totales.sum(axis=1)
+    resumen = nuevo_resumen(totales.shape[1], bloque["por_categoria"].shape[1])
+    resumen["total"].agregar(total)
+    for i, digest in enumerate(resumen["por_ano"]):
+        digest.agregar(totales[:, i])
+    resumen["stats_total"].agregar(total)
+    resumen["stats_ano"].agregar(totales)
+    resumen["stats_categoria"].agregar(bloque["por_categoria"])
+    return resumen
+
+
+def combinar_resumenes(resumen: dict, otro: dict) -> dict:
+    resumen["total"].combinar(otro["total"])
+    for digest, digest_otro in zip(resumen["por_ano"], otro["por_ano"]):
+        digest.combinar(digest_otro)
+    for clave in ("stats_total", "stats_ano", "stats_categoria"):
+        resumen[clave].combinar(otro[clave])
+    return resumen
+
+
+def resumen_a_dict(resumen: dict) -> dict:
+    return {
+        "total": resumen["total"].a_dict(),
+        "por_ano": [d.a_dict() for d in resumen["por_ano"]],
+        "stats_total": resumen["stats_total"].a_dict(),
+        "stats_ano": resumen["stats_ano"].a_dict(),
+        "stats_categoria": resumen["stats_categoria"].a_dict()
+    }
+
+
+def resumen_desde_dict(datos: dict) -> dict:
+    """Reconstruye los sketches guardados (p. ej. para combinar varias corridas)"""
+    return {
+        "total": TDigest.desde_dict(datos["total"]),
+        "por_ano": [TDigest.desde_dict(d) for d in datos["por_ano"]],
+        "stats_total": EstadisticasCorrientes.desde_dict(datos["stats_total"]),
+        "stats_ano": EstadisticasCorrientes.desde_dict(datos["stats_ano"]),
+        "stats_categoria": EstadisticasCorrientes.desde_dict(datos["stats_categoria"])
+    }
+
+# ============================================================
+# EJECUCION EN PARALELO (MEMORIA COMPARTIDA)
+# ============================================================
+
+# Estado de cada proceso trabajador (se fija una vez en el inicializador)
+_TRABAJADOR = {}
+
+
+def _inicializar_trabajador(config: dict, matricula_anual: float, factores: list,
+                            nombre_memoria: str = None, forma: tuple = None):
+    _TRABAJADOR.update({"config": config, "matricula_anual": matricula_anual,
+                        "factores": factores, "totales": None})
+    if nombre_memoria:
+        # Los trabajadores comparten el resource_tracker del padre, que es quien
+        # libera el bloque al terminar
+        memoria = shared_memory.SharedMemory(name=nombre_memoria)
+        _TRABAJADOR["memoria"] = memoria
+        _TRABAJADOR["totales"] = np.ndarray(forma, dtype=np.float64, buffer=memoria.buf)
+
+
+def _simular_tarea(tarea: tuple) -> dict:
+    """
+    Simula un bloque y devuelve solo sus sketches. Si se conservan las
+    trayectorias, se escriben directamente en la memoria compartida.
+    """
+    inicio, fin, semilla_bloque = tarea
+    rng = np.random.default_rng(semilla_bloque)
+    bloque = simular_bloque(rng, fin - inicio, _TRABAJADOR["config"],
+                            _TRABAJADOR["matricula_anual"], _TRABAJADOR["factores"])
+    if _TRABAJADOR["totales"] is not None:
+        _TRABAJADOR["totales"][inicio:fin] = bloque["totales_por_ano"]
+    return resumir_bloque(bloque)
+
+
+def _ejecutar(tareas: list, forma: tuple, config: dict, matricula_anual: float, factores: list,
+              trabajadores: int, conservar_trayectorias: bool):
+    """
+    Ejecuta los bloques (en serie o en un pool de procesos) y combina sus
+    sketches en orden de bloque, de modo que el resultado es el mismo con
+    cualquier numero de trabajadores.
+    """
+    memoria = None
+    if conservar_trayectorias:
+        tamano = int(np.prod(forma)) * np.dtype(np.float64).itemsize
+        memoria = shared_memory.SharedMemory(create=True, size=max(tamano, 1))
+    initargs = (config, matricula_anual, factores,
+                memoria.name if memoria else None, forma)
+    try:
+        if trabajadores > 1 and len(tareas) > 1:
+            with ProcessPoolExecutor(max_workers=trabajadores, initializer=_inicializar_trabajador,
+                                     initargs=initargs) as pool:
+                resumenes = pool.map(_simular_tarea, tareas)
+                resumen = _combinar_en_orden(resumenes, forma[1], config)
+        else:
+            _inicializar_trabajador(config, matricula_anual, factores)
+            if memoria:
+                _TRABAJADOR["totales"] = np.ndarray(forma, dtype=np.float64, buffer=memoria.buf)
+            resumen = _combinar_en_orden(map(_simular_tarea, tareas), forma[1], config)
+            _TRABAJADOR["totales"] = None
+
+        totales = None
+        if memoria:
+            totales = np.ndarray(forma, dtype=np.float64, buffer=memoria.buf).copy()
+        return resumen, totales
+    finally:
+        if memoria:
+            memoria.close()
+            memoria.unlink()
+
+
+def _combinar_en_orden(resumenes, anos: int, config: dict) -> dict:
+    resumen = nuevo_resumen(anos, len(categorias_resumen(config)))
+    for resumen_bloque in resumenes:
+        combinar_resumenes(resumen, resumen_bloque)
+    return resumen
+
+
+def categorias_resumen(config: dict) -> list:
+    return config["categorias"] + ["vuelos_colombia", "matricula", "emergencias"]
+
+
+def simular(n_trayectorias: int, descuento_matricula: bool = True, opcionales: int = MASCARA_TODOS,
+            viajes_por_ano: int = 2, inflacion: float = None, semilla: int = None,
+            tam_bloque: int = TAM_BLOQUE, trabajadores: int = 1,
+            conservar_trayectorias: bool = False) -> dict:
+    """
+    Ejecuta la simulacion completa por bloques de tam_bloque trayectorias.
+    Cada bloque usa su propio generador derivado de la semilla, de modo que
+    el resultado depende solo de (semilla, tam_bloque) y no del numero de
+    trabajadores. trabajadores=0 usa todos los nucleos disponibles.
+
+    Por defecto solo se conservan sketches (memoria constante); con
+    conservar_trayectorias=True tambien se devuelve el total anual de cada
+    trayectoria.
+    """
+    if inflacion is None:
+        inflacion = SUPUESTOS["inflacion_espana"]
+    if trabajadores <= 0:
+        trabajadores = os.cpu_count() or 1
+
+    config = _preparar(opcionales, viajes_por_ano)
+    descuento = SUPUESTOS["descuento_matricula_disponible"] if descuento_matricula else 0
+    matricula_anual = COSTOS_BASE["matricula"]["anual_base"] * (1 - descuento)
+    factores = [(1 + inflacion) ** i for i in range(PERFIL["duracion_anos"])]
+
+    n_bloques = -(-n_trayectorias // tam_bloque)
+    semillas = np.random.SeedSequence(semilla).spawn(n_bloques)
+    tareas = [(b * tam_bloque, min((b + 1) * tam_bloque, n_trayectorias), semilla_bloque)
+              for b, semilla_bloque in enumerate(semillas)]
+    forma = (n_trayectorias, len(factores))
+
+    resumen, totales_por_ano = _ejecutar(tareas, forma, config, matricula_anual, factores,
+                                         min(trabajadores, n_bloques), conservar_trayectorias)
+
+    resultado = {
+        "configuracion": {
+            "trayectorias": n_trayectorias,
+            "semilla": semilla,
+            "tam_bloque": tam_bloque,
+            "descuento_matricula": descuento_matricula,
+            "opcionales": {c: bool(opcionales & (1 << j)) for j, c in enumerate(OPCIONALES)},
+            "viajes_por_ano": config["viajes"],
+            "inflacion": inflacion
+        },
+        "categorias": categorias_resumen(config),
+        "resumen": resumen
+    }
+    if conservar_trayectorias:
+        resultado["totales_por_ano"] = totales_por_ano
+        resultado["total_4_anos"] = totales_por_ano.sum(axis=1)
+    return resultado
+
+# ============================================================
+# RESUMEN
+# ============================================================
+
+def _bandas(digest: TDigest, media: float, desviacion: float) -> dict:
+    bandas = {f"p{q}": round(float(v), 2) for q, v in zip(PERCENTILES, digest.percentil(PERCENTILES))}
+    bandas["media"] = round(float(media), 2)
+    bandas["desviacion"] = round(float(desviacion), 2)
+    return bandas
+
+
+def resumir(resultado: dict) -> dict:
+    """
+    Resumen compacto para el dashboard: percentiles, histograma y los
+    sketches serializados (combinables con los de otras corridas)
+    """
+    resumen = resultado["resumen"]
+    tasas = SUPUESTOS["tasas_cambio"]
+    stats_total = resumen["stats_total"]
+    bandas_eur = _bandas(resumen["total"], stats_total.media, stats_total.desviacion)
+
+    digest = resumen["total"]
+    bordes = np.linspace(digest.minimo, digest.maximo, BINS_HISTOGRAMA + 1)
+    conteos = np.diff(np.round(digest.cdf(bordes) * digest.n)).astype(np.int64)
+
+    stats_ano = resumen["stats_ano"]
+    stats_cat = resumen["stats_categoria"]
+
+    return {
+        "metadata": {
+            "fecha_generacion": datetime.now().isoformat(),
+            "descripcion": "Bandas de percentiles del costo total (simulacion Monte Carlo)",
+            "percentiles": list(PERCENTILES)
+        },
+        "configuracion": resultado["configuracion"],
+        "total_4_anos_eur": bandas_eur,
+        "total_4_anos_usd": {k: round(v * tasas["EUR_USD"], 2) for k, v in bandas_eur.items()},
+        "total_4_anos_cop": {k: round(v * tasas["EUR_COP"], 2) for k, v in bandas_eur.items()},
+        "por_ano": [
+            {"ano": PERFIL["ano_inicio"] + i, "numero_ano": i + 1,
+             **_bandas(d, stats_ano.media[i], stats_ano.desviacion[i])}
+            for i, d in enumerate(resumen["por_ano"])
+        ],
+        "por_categoria": {
+            cat: {"media": round(float(stats_cat.media[j]), 2),
+                  "desviacion": round(float(stats_cat.desviacion[j]), 2)}
+            for j, cat in enumerate(resultado["categorias"])
+        },
+        "histograma": {
+            "bordes": [round(float(b), 2) for b in bordes],
+            "conteos": conteos.tolist()
+        },
+        "sketches": resumen_a_dict(resumen)
+    }
+
+
+def generar_montecarlo(n_trayectorias: int, preset: str = "moderado", semilla: int = None,
+                       tam_bloque: int = TAM_BLOQUE, trabajadores: int = 1) -> dict:
+    """Simula la configuracion de un preset y devuelve el resumen"""
+    config = PRESETS[preset]
+    resultado = simular(
+        n_trayectorias,
+        descuento_matricula=config["descuento_matricula"],
+        opcionales=mascara_opcionales(config["incluir_opcionales"]),
+        viajes_por_ano=config["viajes_por_ano"],
+        semilla=semilla,
+        tam_bloque=tam_bloque,
+        trabajadores=trabajadores
+    )
+    resumen = resumir(resultado)
+    resumen["configuracion"]["preset"] = preset
+    return resumen
+
+
+def guardar_montecarlo(resumen: dict, ruta=None):
+    ruta = ruta or OUTPUT_DIR / "montecarlo_paulina.json"
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(resumen, f, indent=2, ensure_ascii=False)
+    return ruta
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Busqueda de objetivo - cuanto puede gastar Paulina en una o varias categorias
+sin pasar de un presupuesto total de 4 anos (en EUR, USD o COP).
+El total de 4 anos es afin en el gasto mensual (inflacion, emergencias y tasa
+de cambio solo multiplican), asi que dos evaluaciones vectorizadas del modelo
+dan la solucion para todos los escenarios a la vez, sin iterar. El modelo
+redondea al centimo en cada paso, por eso la pendiente se mide con un paso
+grande (PASO_PENDIENTE) y la solucion se trunca al centimo y se comprueba
+contra el modelo: el total resultante nunca pasa del presupuesto.
+"""
+
+import numpy as np
+
+from centimos import a_centimos, a_euros
+from generar_datos import (SUPUESTOS, PRESETS, NIVELES, mascara_opcionales, parametros_lote,
+                           evaluar_centimos, evaluar_parametros)
+
+# Tasa para pasar de EUR a cada moneda (None = EUR)
+TASA_MONEDA = {"EUR": None, "USD": "EUR_USD", "COP": "EUR_COP"}
+
+INFLACIONES_TABLA = (0.02, 0.03, 0.05)
+
+PASO_PENDIENTE = 1000.0  # EUR/mes entre los dos puntos de la recta
+
+
+def presupuesto_en_eur(presupuesto, moneda: str = "EUR", tasas_cambio: dict = None):
+    tasas = tasas_cambio or SUPUESTOS["tasas_cambio"]
+    clave = TASA_MONEDA[moneda]
+    return np.asarray(presupuesto, dtype=np.float64) / (tasas[clave] if clave else 1)
+
+
+def monto_mensual_maximo(presupuesto_eur, otros_mensual, costo_vuelo, viajes_por_ano, descuento,
+                         pct_emergencias, inflacion) -> np.ndarray:
+    """
+    Gasto mensual maximo (combinado) de las categorias libres, dejando el resto
+    del modelo fijo. Con total(D) = a + b*D se evalua el modelo en D = 0 y
+    D = PASO_PENDIENTE y se despeja D. Negativo si el presupuesto no cubre ni el resto.
+    D se trunca al centimo y, como el modelo redondea en cada paso, se
+    ajusta de a un centimo contra evaluar_centimos: el resultado es el mayor
+    D cuyo total no pasa del presupuesto.
+    """
+    otros_mensual = np.asarray(otros_mensual, dtype=np.float64)
+    comunes = dict(costo_vuelo=costo_vuelo, viajes_por_ano=viajes_por_ano, descuento=descuento,
+                   pct_emergencias=pct_emergencias, inflacion=inflacion)
+    a = evaluar_parametros(total_mensual_base=otros_mensual, **comunes)["total_4_anos_eur"]
+    b = (evaluar_parametros(total_mensual_base=otros_mensual + PASO_PENDIENTE, **comunes)["total_4_anos_eur"] - a) / PASO_PENDIENTE
+    estimado = (presupuesto_eur - a) / b
+
+    otros_centimos = a_centimos(otros_mensual)
+
+    def total(disponible):
+        return a_euros(evaluar_centimos(a_euros(otros_centimos + disponible), **comunes)["total_4_anos_eur"])
+
+    disponible = np.floor(np.asarray(estimado, dtype=np.float64) * 100).astype(np.int64)
+    sube = total(disponible + 1) <= presupuesto_eur
+    while np.any(sube):
+        disponible = disponible + sube
+        sube = total(disponible + 1) <= presupuesto_eur
+    excede = total(disponible) > presupuesto_eur
+    while np.any(excede):
+        disponible = disponible - excede
+        excede = total(disponible) > presupuesto_eur
+    return a_euros(disponible)
+
+
+def repartir(disponible, referencia) -> np.ndarray:
+    """
+    Reparte el monto combinado entre las categorias en proporcion a los
+    valores de referencia (ultimo eje); en partes iguales si todos son 0.
+    Se reparte en centimos enteros por mayor resto: cada parte es el piso de
+    su cuota y los centimos que faltan van a los restos mas grandes (a igual
+    resto, a la primera categoria), asi las partes suman exactamente disponible.
+    """
+    totales = a_centimos(np.asarray(disponible, dtype=np.float64))
+    pesos = a_centimos(np.asarray(referencia, dtype=np.float64))
+    pesos = np.where(pesos.sum(axis=-1, keepdims=True) > 0, pesos, 1)
+    partes, restos = np.divmod(totales[..., None] * pesos, pesos.sum(axis=-1, keepdims=True))
+    faltan = totales - partes.sum(axis=-1)
+    orden = np.argsort(-restos, axis=-1, kind="stable")
+    puesto = np.empty_like(orden)
+    np.put_along_axis(puesto, orden, np.arange(orden.shape[-1]), axis=-1)
+    return a_euros(partes + (puesto < faltan[..., None]))
+
+
+def maximo_por_escenario(presupuesto, categorias, moneda: str = "EUR", niveles="medio",
+                         descuento_matricula=True, opcionales=None, viajes_por_ano=2,
+                         inflacion=None, tasas_cambio: dict = None) -> dict:
+    """
+    Maximo mensual de las categorias dadas para escenarios definidos por
+    nivel/flags (mismos parametros y broadcasting que calcular_escenarios_lote).
+    Las demas categorias quedan en el valor de su nivel; el monto se reparte
+    en proporcion a esos mismos valores.
+    """
+    if opcionales is None:
+        opcionales = mascara_opcionales({})
+    parametros = parametros_lote(niveles, descuento_matricula, opcionales, viajes_por_ano, inflacion)
+    indices = [parametros["categorias"].index(c) for c in categorias]
+    seleccion = parametros["mensuales"][..., indices]
+    otros = parametros["mensuales"].sum(axis=-1) - seleccion.sum(axis=-1)
+
+    disponible = monto_mensual_maximo(
+        presupuesto_en_eur(presupuesto, moneda, tasas_cambio), otros,
+        costo_vuelo=parametros["costo_vuelo"], viajes_por_ano=parametros["viajes_por_ano"],
+        descuento=parametros["descuento"], pct_emergencias=parametros["pct_emergencias"],
+        inflacion=parametros["inflacion"]
+    )
+    por_categoria = repartir(disponible, seleccion)
+    return {
+        "disponible_mensual": disponible,
+        "actual_mensual": seleccion.sum(axis=-1),
+        "alcanza": disponible >= 0,
+        "por_categoria": {c: por_categoria[..., j] for j, c in enumerate(categorias)}
+    }
+
+
+def tabla_presets(presupuesto, categorias, moneda: str = "EUR", inflaciones=INFLACIONES_TABLA,
+                  tasas_cambio: dict = None) -> list:
+    """Respuesta para cada preset x (con/sin descuento) x inflacion en una sola evaluacion"""
+    claves = list(PRESETS)
+    i_preset, descuento, inflacion = np.meshgrid(np.arange(len(claves)), [True, False],
+                                                 np.asarray(inflaciones, dtype=np.float64), indexing="ij")
+    i_preset, descuento, inflacion = i_preset.ravel(), descuento.ravel(), inflacion.ravel()
+    presets = [PRESETS[c] for c in claves]
+
+    resultado = maximo_por_escenario(
+        presupuesto, categorias, moneda,
+        niveles=np.array([NIVELES.index(p["nivel"]) for p in presets])[i_preset],
+        descuento_matricula=descuento,
+        opcionales=np.array([mascara_opcionales(p["incluir_opcionales"]) for p in presets])[i_preset],
+        viajes_por_ano=np.array([p["viajes_por_ano"] for p in presets])[i_preset],
+        inflacion=inflacion,
+        tasas_cambio=tasas_cambio
+    )
+
+    filas = []
+    for i in range(len(i_preset)):
+        filas.append({
+            "preset": claves[i_preset[i]],
+            "descuento_matricula": bool(descuento[i]),
+            "inflacion": float(inflacion[i]),
+            "disponible_mensual": float(resultado["disponible_mensual"][i]),
+            "actual_mensual": float(resultado["actual_mensual"][i]),
+            "alcanza": bool(resultado["alcanza"][i]),
+            "por_categoria": {c: float(v[i]) for c, v in resultado["por_categoria"].items()}
+        })
+    return filas
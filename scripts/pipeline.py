@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Pipeline incremental de output/ - un solo punto de entrada para regenerar todo.
+Cada artefacto tiene una huella (sha256) de sus entradas: las constantes del
+modelo que usa (PERFIL, SUPUESTOS, COSTOS_BASE, PRESETS, leidas del codigo
+fuente sin importarlo), el codigo de los scripts que lo generan y las huellas
+de los artefactos de los que depende. Solo se reconstruye lo que cambio; los
+artefactos independientes se construyen en paralelo en un pool de procesos.
+Una corrida sin cambios no importa numpy ni openpyxl y termina en milisegundos.
+
+grilla_sliders (~65 MB) es opcional: no entra en la corrida por defecto y
+solo se construye si se pide por nombre.
+
+informe_familiar_paulina.html se mantiene a mano (no tiene generador) y el
+pipeline no lo toca.
+
+Uso: python scripts/pipeline.py [artefacto ...] [--forzar] [--trabajadores N]
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+OUTPUT_DIR = SCRIPTS_DIR.parent / "output"
+MANIFIESTO = OUTPUT_DIR / ".pipeline.json"
+
+CONSTANTES_MODELO = ("PERFIL", "SUPUESTOS", "COSTOS_BASE", "PRESETS")
+
+# ============================================================
+# ARTEFACTOS
+# ============================================================
+
+# modelo: constantes de generar_datos.py que afectan al artefacto
+# codigo: scripts que lo generan (incluidos los que importan)
+# depende: artefactos que lee; archivos: otros archivos de output/ que lee si existen
+# opcional: fuera de la corrida por defecto, solo se construye si se pide por nombre
+ARTEFACTOS = {
+    "datos": {
+        "salidas": ["datos_paulina.json"],
+        "modelo": ["PERFIL", "SUPUESTOS", "COSTOS_BASE"],
+        "codigo": ["generar_datos.py"],
+        "depende": [],
+        "archivos": []
+    },
+    "escenarios": {
+        "salidas": ["escenarios_paulina.json"],
+        "modelo": ["PERFIL", "SUPUESTOS", "COSTOS_BASE", "PRESETS"],
+        "codigo": ["generar_datos.py", "centimos.py"],
+        "depende": [],
+        "archivos": []
+    },
+    "columnar": {
+        "salidas": ["escenarios_columnar/esquema.json"],
+        "modelo": ["PERFIL", "SUPUESTOS", "COSTOS_BASE", "PRESETS"],
+        "codigo": ["generar_datos.py", "centimos.py", "almacen_columnar.py"],
+        "depende": [],
+        "archivos": []
+    },
+    "grilla_sliders": {
+        "salidas": ["grilla_sliders/esquema.json"],
+        "modelo": ["PERFIL", "SUPUESTOS", "COSTOS_BASE"],
+        "codigo": ["generar_datos.py", "centimos.py", "almacen_columnar.py", "grilla_sliders.py"],
+        "depende": [],
+        "archivos": [],
+        "opcional": True
+    },
+    "excel": {
+        "salidas": ["resumen_paulina.xlsx"],
+        "modelo": ["PERFIL", "SUPUESTOS", "COSTOS_BASE", "PRESETS"],
+        "codigo": ["generar_excel.py", "flujo_mensual.py", "generar_datos.py"],
+        "depende": ["datos", "escenarios"],
+        "archivos": ["sensibilidad_paulina.json"]
+    }
+}
+
+POR_DEFECTO = [nombre for nombre, artefacto in ARTEFACTOS.items() if not artefacto.get("opcional")]
+
+# ============================================================
+# HUELLAS
+# ============================================================
+
+def _sha(contenido: bytes) -> str:
+    return hashlib.sha256(contenido).hexdigest()
+
+
+def _asignaciones_modelo(fuente: str):
+    """Nodos de asignacion de CONSTANTES_MODELO en un codigo fuente"""
+    for nodo in ast.parse(fuente).body:
+        if (isinstance(nodo, ast.Assign) and len(nodo.targets) == 1 and isinstance(nodo.targets[0], ast.Name)
+                and nodo.targets[0].id in CONSTANTES_MODELO):
+            yield nodo
+
+
+def constantes_modelo(ruta=None) -> dict:
+    """Valores literales de CONSTANTES_MODELO en generar_datos.py, sin ejecutarlo"""
+    fuente = (ruta or SCRIPTS_DIR / "generar_datos.py").read_text(encoding="utf-8")
+    return {nodo.targets[0].id: ast.literal_eval(nodo.value) for nodo in _asignaciones_modelo(fuente)}
+
+
+def huella_codigo(ruta) -> str:
+    """
+    Huella del script sin las lineas de CONSTANTES_MODELO: esas tienen su
+    propia huella, asi editar PRESETS no invalida lo que solo usa COSTOS_BASE.
+    """
+    fuente = ruta.read_text(encoding="utf-8")
+    lineas = fuente.splitlines()
+    for nodo in _asignaciones_modelo(fuente):
+        lineas[nodo.lineno - 1:nodo.end_lineno] = [""] * (nodo.end_lineno - nodo.lineno + 1)
+    return _sha("\n".join(lineas).encode())
+
+
+def huellas_entradas() -> dict:
+    """Huella de cada entrada posible: constantes, scripts y archivos opcionales"""
+    huellas = {nombre: _sha(json.dumps(valor, sort_keys=True).encode())
+               for nombre, valor in constantes_modelo().items()}
+    for artefacto in ARTEFACTOS.values():
+        for script in artefacto["codigo"]:
+            if script not in huellas:
+                huellas[script] = huella_codigo(SCRIPTS_DIR / script)
+        for archivo in artefacto["archivos"]:
+            ruta = OUTPUT_DIR / archivo
+            huellas[archivo] = _sha(ruta.read_bytes()) if ruta.exists() else None
+    return huellas
+
+
+def huellas_artefactos(entradas: dict) -> dict:
+    """{artefacto: {"huella": sha, "entradas": {nombre: sha}}} en orden de dependencias"""
+    resultado = {}
+    for nombre in _orden_topologico(ARTEFACTOS):
+        artefacto = ARTEFACTOS[nombre]
+        usadas = {e: entradas[e] for e in artefacto["modelo"] + artefacto["codigo"] + artefacto["archivos"]}
+        usadas.update({f"@{d}": resultado[d]["huella"] for d in artefacto["depende"]})
+        resultado[nombre] = {"huella": _sha(json.dumps(usadas, sort_keys=True).encode()), "entradas": usadas}
+    return resultado
+
+
+def _orden_topologico(artefactos: dict) -> list:
+    orden, visitados = [], set()
+
+    def visitar(nombre):
+        if nombre not in visitados:
+            visitados.add(nombre)
+            for dependencia in artefactos[nombre]["depende"]:
+                visitar(dependencia)
+            orden.append(nombre)
+
+    for nombre in artefactos:
+        visitar(nombre)
+    return orden
+
+# ============================================================
+# CONSTRUCCION (cada funcion corre en un proceso del pool)
+# ============================================================
+
+def construir_datos():
+    from almacen_columnar import reemplazar
+    from generar_datos import generar_datos_base, guardar_json
+    ruta = guardar_json(generar_datos_base(), "datos_paulina.json.tmp")
+    reemplazar(ruta, OUTPUT_DIR / "datos_paulina.json")
+
+
+def construir_escenarios():
+    from almacen_columnar import reemplazar
+    from generar_datos import generar_escenarios, guardar_json
+    ruta = guardar_json(generar_escenarios(), "escenarios_paulina.json.tmp")
+    reemplazar(ruta, OUTPUT_DIR / "escenarios_paulina.json")
+
+
+def construir_columnar():
+    from almacen_columnar import guardar_almacen
+    guardar_almacen()  # Escribe en un temporal y lo pone en su lugar
+
+
+def construir_grilla_sliders():
+    from grilla_sliders import guardar_grilla
+    guardar_grilla()  # Escribe en un temporal y lo pone en su lugar
+
+
+def construir_excel():
+    from almacen_columnar import reemplazar
+    from generar_excel import cargar_datos, cargar_sensibilidad, crear_libro
+    datos, escenarios = cargar_datos()
+    temporal = OUTPUT_DIR / "resumen_paulina.tmp.xlsx"
+    crear_libro(datos, escenarios, cargar_sensibilidad()).save(temporal)
+    reemplazar(temporal, OUTPUT_DIR / "resumen_paulina.xlsx")
+
+
+CONSTRUCTORES = {
+    "datos": construir_datos,
+    "escenarios": construir_escenarios,
+    "columnar": construir_columnar,
+    "grilla_sliders": construir_grilla_sliders,
+    "excel": construir_excel
+}
+
+
+def _ejecutar(nombre: str) -> float:
+    inicio = time.perf_counter()
+    CONSTRUCTORES[nombre]()
+    return time.perf_counter() - inicio
+
+# ============================================================
+# PLANIFICACION
+# ============================================================
+
+def leer_manifiesto() -> dict:
+    if not MANIFIESTO.exists():
+        return {}
+    with open(MANIFIESTO, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def planificar(objetivos=None, forzar: bool = False) -> tuple:
+    """
+    Devuelve (pendientes, huellas, motivos): artefactos a reconstruir en
+    orden de dependencias, huellas actuales y por que cambia cada uno.
+    """
+    huellas = huellas_artefactos(huellas_entradas())
+    anterior = leer_manifiesto()
+
+    incluidos = set()
+    for objetivo in objetivos or POR_DEFECTO:
+        pila = [objetivo]
+        while pila:
+            nombre = pila.pop()
+            incluidos.add(nombre)
+            pila.extend(ARTEFACTOS[nombre]["depende"])
+
+    pendientes, motivos = [], {}
+    for nombre in _orden_topologico(ARTEFACTOS):
+        if nombre not in incluidos:
+            continue
+        previo = anterior.get(nombre, {})
+        faltan = [s for s in ARTEFACTOS[nombre]["salidas"] if not (OUTPUT_DIR / s).exists()]
+        if forzar:
+            motivos[nombre] = ["--forzar"]
+        elif faltan:
+            motivos[nombre] = [f"falta {s}" for s in faltan]
+        elif previo.get("huella") != huellas[nombre]["huella"]:
+            entradas_previas = previo.get("entradas", {})
+            motivos[nombre] = [e for e, h in huellas[nombre]["entradas"].items()
+                               if entradas_previas.get(e) != h] or ["sin manifiesto"]
+        else:
+            continue
+        pendientes.append(nombre)
+    return pendientes, huellas, motivos
+
+
+def construir(objetivos=None, forzar: bool = False, trabajadores: int = None) -> dict:
+    """
+    Reconstruye los artefactos pendientes. Cada uno se lanza en cuanto sus
+    dependencias terminaron; el manifiesto se actualiza tras cada exito.
+    Devuelve {artefacto: segundos} de lo reconstruido.
+    """
+    pendientes, huellas, motivos = planificar(objetivos, forzar)
+    if not pendientes:
+        return {}
+
+    manifiesto = leer_manifiesto()
+    tiempos = {}
+
+    def registrar(nombre, segundos):
+        tiempos[nombre] = segundos
+        manifiesto[nombre] = huellas[nombre]
+        with open(MANIFIESTO, "w", encoding="utf-8") as f:
+            json.dump(manifiesto, f, indent=2)
+        print(f"  {nombre:<11} reconstruido en {segundos:.2f} s ({', '.join(motivos[nombre])})")
+
+    trabajadores = trabajadores or min(len(pendientes), os.cpu_count() or 1)
+    if trabajadores <= 1 or len(pendientes) == 1:
+        for nombre in pendientes:
+            registrar(nombre, _ejecutar(nombre))
+        return tiempos
+
+    restantes = list(pendientes)
+    en_curso = {}
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        while restantes or en_curso:
+            for nombre in list(restantes):
+                if not any(d in restantes or d in en_curso.values() for d in ARTEFACTOS[nombre]["depende"]):
+                    restantes.remove(nombre)
+                    en_curso[pool.submit(_ejecutar, nombre)] = nombre
+            listos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                registrar(en_curso.pop(futuro), futuro.result())
+    return tiempos
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenera solo los artefactos de output/ cuyas entradas cambiaron")
+    parser.add_argument("objetivos", nargs="*", metavar="artefacto",
+                        help=f"Artefactos a construir (por defecto: {', '.join(POR_DEFECTO)}; "
+                             f"opcionales: {', '.join(n for n in ARTEFACTOS if n not in POR_DEFECTO)})")
+    parser.add_argument("--forzar", action="store_true", help="Reconstruir aunque nada haya cambiado")
+    parser.add_argument("--trabajadores", type=int, default=None,
+                        help="Procesos en paralelo (por defecto uno por artefacto pendiente)")
+    args = parser.parse_args(argv)
+    desconocidos = [o for o in args.objetivos if o not in ARTEFACTOS]
+    if desconocidos:
+        parser.error(f"artefacto desconocido: {', '.join(desconocidos)}")
+
+    inicio = time.perf_counter()
+    print("PIPELINE DE ARTEFACTOS - PAULINA MADRID")
+    tiempos = construir(args.objetivos or None, forzar=args.forzar, trabajadores=args.trabajadores)
+    total = time.perf_counter() - inicio
+    if tiempos:
+        print(f"{len(tiempos)} artefacto(s) reconstruido(s) en {total:.2f} s")
+    else:
+        print(f"Todo al dia ({total * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Analisis de sensibilidad del costo total de 4 anos - Paulina en Madrid.
+- Tornado (uno a la vez): cada variable recorre su rango min-max mientras las
+  demas se mantienen en su valor medio, en una sola llamada vectorizada.
+- Sobol (global): indices de primer orden y totales por muestreo de Saltelli,
+  evaluado por bloques de memoria acotada y reproducible con semilla.
+Genera: sensibilidad_paulina.json
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+
+from generar_datos import PERFIL, COSTOS_BASE, SUPUESTOS, PRESETS, OUTPUT_DIR, evaluar_parametros
+
+# ============================================================
+# VARIABLES DE ENTRADA
+# ============================================================
+
+# Supuestos sin rango en COSTOS_BASE (min, max); el medio es el valor de SUPUESTOS
+RANGOS_SUPUESTOS = {
+    "inflacion_espana": {"etiqueta": "Inflacion Espana", "unidad": "%", "min": 0.015, "max": 0.06},
+    "EUR_COP": {"etiqueta": "Tasa EUR/COP", "unidad": "COP", "min": 3800, "max": 5200},
+    "EUR_USD": {"etiqueta": "Tasa EUR/USD", "unidad": "USD", "min": 1.00, "max": 1.20}
+}
+
+# Categorias con precio determinado por el perfil (no son una incertidumbre):
+# transporte es el Abono Joven (min) antes de los 26 anos y el precio normal (max) despues
+CATEGORIAS_FIJAS = ("transporte",)
+
+METRICAS = ("eur", "usd", "cop")
+TAM_BLOQUE_SOBOL = 4096  # Filas base por bloque (cada bloque evalua (d + 2) x filas)
+
+
+def preparar_modelo(preset: str = "moderado") -> dict:
+    """
+    Lista de variables (clave, etiqueta, unidad, min, medio, max) para un
+    preset, mas los valores que quedan fijos en el analisis.
+    """
+    config = PRESETS[preset]
+    opcionales = config["incluir_opcionales"]
+    variables = []
+    mensual_fijo = 0
+
+    for categoria, datos in COSTOS_BASE.items():
+        if datos.get("tipo") != "mensual":
+            continue
+        if datos.get("opcional", False) and not opcionales.get(categoria, True):
+            continue
+        if categoria in CATEGORIAS_FIJAS:
+            mensual_fijo += datos["min"] if PERFIL["menor_26"] else datos["max"]
+            continue
+        variables.append({"clave": categoria, "etiqueta": datos["descripcion"], "tipo": "mensual",
+                          "unidad": "EUR/mes", "min": datos["min"], "medio": datos["medio"],
+                          "max": datos["max"]})
+
+    if opcionales.get("vuelos_colombia", True):
+        vuelo = COSTOS_BASE["vuelos_colombia"]
+        variables.append({"clave": "vuelos_colombia", "etiqueta": vuelo["descripcion"], "tipo": "vuelo",
+                          "unidad": "EUR/viaje", "min": vuelo["min"], "medio": vuelo["medio"],
+                          "max": vuelo["max"]})
+
+    descuento = SUPUESTOS["descuento_matricula_disponible"]
+    variables.append({"clave": "descuento_matricula", "etiqueta": "Descuento matricula", "tipo": "descuento",
+                      "unidad": "%", "min": 0.0, "medio": descuento if config["descuento_matricula"] else 0.0,
+                      "max": descuento})
+
+    if opcionales.get("emergencias", True):
+        emerg = COSTOS_BASE["emergencias"]
+        variables.append({"clave": "emergencias", "etiqueta": emerg["descripcion"], "tipo": "emergencias",
+                          "unidad": "%", "min": emerg["min_porcentaje"],
+                          "medio": emerg["porcentaje_del_total"], "max": emerg["max_porcentaje"]})
+
+    medios_supuestos = {"inflacion_espana": SUPUESTOS["inflacion_espana"], **SUPUESTOS["tasas_cambio"]}
+    for clave, rango in RANGOS_SUPUESTOS.items():
+        variables.append({"clave": clave, "etiqueta": rango["etiqueta"], "tipo": "supuesto",
+                          "unidad": rango["unidad"], "min": rango["min"],
+                          "medio": medios_supuestos[clave], "max": rango["max"]})
+
+    return {
+        "preset": preset,
+        "variables": variables,
+        "mensual_fijo": mensual_fijo,
+        "viajes_por_ano": config["viajes_por_ano"] if opcionales.get("vuelos_colombia", True) else 0
+    }
+
+
+def evaluar_matriz(X, modelo: dict) -> dict:
+    """
+    Evalua el modelo para una matriz X (escenarios x variables) con las
+    columnas en el orden de modelo["variables"]. Devuelve el total de 4 anos
+    en cada moneda.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    columnas = {v["clave"]: X[:, j] for j, v in enumerate(modelo["variables"])}
+    cero = np.zeros(len(X))
+
+    total_mensual = modelo["mensual_fijo"] + cero
+    for v in modelo["variables"]:
+        if v["tipo"] == "mensual":
+            total_mensual = total_mensual + columnas[v["clave"]]
+
+    resultado = evaluar_parametros(
+        total_mensual_base=total_mensual,
+        costo_vuelo=columnas.get("vuelos_colombia", cero),
+        viajes_por_ano=modelo["viajes_por_ano"],
+        descuento=columnas["descuento_matricula"],
+        pct_emergencias=columnas.get("emergencias", cero),
+        inflacion=columnas["inflacion_espana"],
+        tasas_cambio={"EUR_USD": columnas["EUR_USD"], "EUR_COP": columnas["EUR_COP"]}
+    )
+    return {
+        "eur": resultado["total_4_anos_eur"],
+        "usd": resultado["total_4_anos_usd"],
+        "cop": resultado["total_4_anos_cop"]
+    }
+
+# ============================================================
+# TORNADO (UNO A LA VEZ)
+# ============================================================
+
+def tornado(preset: str = "moderado") -> dict:
+    """
+    Barrido uno a la vez: fila 0 = todo en medio, filas 2j+1 / 2j+2 = variable j
+    en su min / max. Una sola evaluacion de (2 x variables + 1) escenarios.
+    """
+    modelo = preparar_modelo(preset)
+    variables = modelo["variables"]
+    medios = np.array([v["medio"] for v in variables], dtype=np.float64)
+
+    X = np.tile(medios, (2 * len(variables) + 1, 1))
+    for j, v in enumerate(variables):
+        X[2 * j + 1, j] = v["min"]
+        X[2 * j + 2, j] = v["max"]
+
+    totales = evaluar_matriz(X, modelo)
+
+    barras = {}
+    for metrica in METRICAS:
+        base = totales[metrica][0]
+        filas = []
+        for j, v in enumerate(variables):
+            bajo = float(totales[metrica][2 * j + 1])
+            alto = float(totales[metrica][2 * j + 2])
+            filas.append({
+                "variable": v["clave"],
+                "etiqueta": v["etiqueta"],
+                "unidad": v["unidad"],
+                "valor_min": v["min"],
+                "valor_medio": v["medio"],
+                "valor_max": v["max"],
+                "total_min": round(bajo, 2),
+                "total_max": round(alto, 2),
+                "impacto": round(abs(alto - bajo), 2)
+            })
+        filas.sort(key=lambda f: f["impacto"], reverse=True)
+        barras[metrica] = {"base": round(float(base), 2), "barras": filas}
+
+    return {"preset": preset, "tornado": barras}
+
+
+# ============================================================
+# SOBOL (VARIANZA GLOBAL)
+# ============================================================
+
+def sobol(preset: str = "moderado", n_base: int = 2 ** 14, semilla: int = None,
+          tam_bloque: int = TAM_BLOQUE_SOBOL) -> dict:
+    """
+    Indices de Sobol con muestreo de Saltelli: matrices A y B con entradas
+    uniformes en [min, max] y, para cada variable i, AB_i = A con la columna
+    i tomada de B. Estimadores de Saltelli (2010) para primer orden y de
+    Jansen para el total. Cada bloque evalua [A; B; AB_1..AB_d] en una sola
+    llamada y solo acumula sumas, asi que la memoria depende del bloque y no
+    de n_base. El resultado depende solo de (semilla, n_base, tam_bloque).
+    """
+    modelo = preparar_modelo(preset)
+    variables = modelo["variables"]
+    d = len(variables)
+    minimos = np.array([v["min"] for v in variables], dtype=np.float64)
+    anchos = np.array([v["max"] for v in variables], dtype=np.float64) - minimos
+
+    # Las sumas se acumulan centradas en el caso medio para no perder precision
+    centro = evaluar_matriz(np.array([[v["medio"] for v in variables]]), modelo)
+    sumas = {m: {"f": 0.0, "f2": 0.0, "primer": np.zeros(d), "total": np.zeros(d)} for m in METRICAS}
+
+    n_bloques = -(-n_base // tam_bloque)
+    for b, semilla_bloque in enumerate(np.random.SeedSequence(semilla).spawn(n_bloques)):
+        m = min(tam_bloque, n_base - b * tam_bloque)
+        rng = np.random.default_rng(semilla_bloque)
+        A = minimos + rng.random((m, d)) * anchos
+        B = minimos + rng.random((m, d)) * anchos
+
+        AB = np.repeat(A[None, :, :], d, axis=0)
+        AB[np.arange(d), :, np.arange(d)] = B.T
+        X = np.concatenate([A, B, AB.reshape(d * m, d)])
+
+        totales = evaluar_matriz(X, modelo)
+        for metrica in METRICAS:
+            f = totales[metrica] - centro[metrica][0]
+            f_a, f_b = f[:m], f[m:2 * m]
+            f_ab = f[2 * m:].reshape(d, m)
+            acum = sumas[metrica]
+            acum["f"] += f_a.sum() + f_b.sum()
+            acum["f2"] += (f_a ** 2).sum() + (f_b ** 2).sum()
+            acum["primer"] += (f_b * (f_ab - f_a)).sum(axis=1)
+            acum["total"] += ((f_a - f_ab) ** 2).sum(axis=1)
+
+    indices = {}
+    for metrica in METRICAS:
+        acum = sumas[metrica]
+        media = acum["f"] / (2 * n_base)
+        varianza = acum["f2"] / (2 * n_base) - media ** 2
+        if varianza <= 0:
+            primer = total = np.zeros(d)
+        else:
+            primer = acum["primer"] / n_base / varianza
+            total = acum["total"] / (2 * n_base) / varianza
+        filas = [{"variable": v["clave"], "etiqueta": v["etiqueta"],
+                  "primer_orden": round(float(primer[j]), 4), "total": round(float(total[j]), 4)}
+                 for j, v in enumerate(variables)]
+        filas.sort(key=lambda f: f["total"], reverse=True)
+        indices[metrica] = {
+            "desviacion": round(float(np.sqrt(max(varianza, 0))), 2),
+            "interacciones": round(float(total.sum() - primer.sum()), 4),
+            "indices": filas
+        }
+
+    return {
+        "n_base": n_base,
+        "semilla": semilla,
+        "tam_bloque": tam_bloque,
+        "evaluaciones": n_base * (d + 2),
+        "distribucion": "uniforme [min, max]",
+        "metricas": indices
+    }
+
+
+def generar_sensibilidad(preset: str = "moderado", n_sobol: int = 0, semilla: int = None) -> dict:
+    sensibilidad = {
+        "metadata": {
+            "fecha_generacion": datetime.now().isoformat(),
+            "descripcion": "Sensibilidad del costo total de 4 anos a cada variable de entrada"
+        },
+        **tornado(preset)
+    }
+    if n_sobol:
+        sensibilidad["sobol"] = sobol(preset, n_base=n_sobol, semilla=semilla)
+    return sensibilidad
+
+
+def guardar_sensibilidad(sensibilidad: dict, ruta=None):
+    ruta = ruta or OUTPUT_DIR / "sensibilidad_paulina.json"
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(sensibilidad, f, indent=2, ensure_ascii=False)
+    return ruta
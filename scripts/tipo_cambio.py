@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Simulacion de tasas de cambio EUR/COP y EUR/USD - Paulina en Madrid.
+La familia paga en pesos, asi que el costo en COP de los 4 anos depende tanto
+de la tasa como de los euros. Se simulan trayectorias mensuales de ambas tasas
+(vectorizadas sobre miles de trayectorias), se aplican al flujo de caja en EUR
+de flujo_mensual y se resumen en bandas de percentiles.
+
+Metodos:
+  gbm        movimiento browniano geometrico con la deriva, volatilidad y
+             correlacion de los rendimientos logaritmicos mensuales historicos
+  bootstrap  remuestreo por bloques de LARGO_BLOQUE meses de los rendimientos
+             historicos (conserva colas gruesas, correlacion y rachas)
+
+Funciona sin conexion: el historico viene en datos/tasas_cambio_mensuales.csv
+(promedios mensuales aproximados 2015-2025, EUR_COP = EUR_USD x USD_COP).
+Cada trayectoria parte de SUPUESTOS["tasas_cambio"]; el primer mes usa esa tasa.
+La referencia "tasa_fija" se convierte en centimos (centimos.convertir), asi
+que coincide con total_4_anos_usd/cop de escenarios_paulina.json.
+Genera: cambio_paulina.json
+"""
+
+import csv
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from centimos import a_centimos, a_euros, convertir
+from flujo_mensual import MESES_POR_ANO, flujo_escenarios_lote, totales_mensuales
+from generar_datos import SUPUESTOS, PERFIL, PRESETS, OUTPUT_DIR, mascara_opcionales
+
+# ============================================================
+# CONFIGURACION
+# ============================================================
+
+RUTA_HISTORICO = Path(__file__).parent / "datos" / "tasas_cambio_mensuales.csv"
+
+PARES = ("EUR_USD", "EUR_COP")
+MONEDA_PAR = {"EUR_USD": "usd", "EUR_COP": "cop"}
+METODOS = ("gbm", "bootstrap")
+
+PERCENTILES = (5, 10, 50, 90, 95)
+TAM_BLOQUE = 20_000   # Trayectorias por bloque: (bloque x meses x pares) float64 ~15 MB
+LARGO_BLOQUE = 6      # Meses consecutivos por bloque del bootstrap
+
+# ============================================================
+# HISTORICO
+# ============================================================
+
+def cargar_historico(ruta=None) -> dict:
+    """{"fechas": ['AAAA-MM', ...], "tasas": array (meses x PARES)}"""
+    fechas, tasas = [], []
+    with open(ruta or RUTA_HISTORICO, "r", encoding="utf-8", newline="") as f:
+        for fila in csv.DictReader(f):
+            fechas.append(fila["fecha"])
+            tasas.append([float(fila[par]) for par in PARES])
+    return {"fechas": fechas, "tasas": np.array(tasas, dtype=np.float64)}
+
+
+def estimar_modelo(historico: dict) -> dict:
+    """
+    Rendimientos logaritmicos mensuales y sus momentos. La deriva es la media
+    de log-rendimientos (ya incluye la correccion -sigma^2/2 del GBM).
+    """
+    rendimientos = np.diff(np.log(historico["tasas"]), axis=0)
+    covarianza = np.atleast_2d(np.cov(rendimientos, rowvar=False))
+    return {
+        "rendimientos": rendimientos,
+        "deriva": rendimientos.mean(axis=0),
+        "volatilidad": np.sqrt(np.diag(covarianza)),
+        "correlacion": np.corrcoef(rendimientos, rowvar=False),
+        "cholesky": np.linalg.cholesky(covarianza)
+    }
+
+# ============================================================
+# TRAYECTORIAS
+# ============================================================
+
+def rendimientos_simulados(rng, n: int, pasos: int, modelo: dict, metodo: str = "gbm",
+                           deriva: bool = True) -> np.ndarray:
+    """(n x pasos x pares) log-rendimientos mensuales"""
+    if metodo == "gbm":
+        choques = rng.standard_normal((n, pasos, len(modelo["deriva"]))) @ modelo["cholesky"].T
+        return choques + modelo["deriva"] if deriva else choques
+
+    if metodo == "bootstrap":
+        historicos = modelo["rendimientos"] if deriva else modelo["rendimientos"] - modelo["deriva"]
+        largo = min(LARGO_BLOQUE, len(historicos))
+        n_bloques = -(-pasos // largo)
+        inicios = rng.integers(0, len(historicos) - largo + 1, size=(n, n_bloques))
+        indices = (inicios[:, :, None] + np.arange(largo)).reshape(n, -1)[:, :pasos]
+        return historicos[indices]
+
+    raise ValueError(f"Metodo desconocido: {metodo} (opciones: {', '.join(METODOS)})")
+
+
+def trayectorias_tasas(rng, n: int, meses: int, modelo: dict, tasas_iniciales,
+                       metodo: str = "gbm", deriva: bool = True) -> np.ndarray:
+    """(n x meses x pares) tasa de cada mes; el mes 0 es la tasa inicial"""
+    rendimientos = rendimientos_simulados(rng, n, meses - 1, modelo, metodo, deriva)
+    log_tasas = np.zeros((n, meses, rendimientos.shape[2]))
+    np.cumsum(rendimientos, axis=1, out=log_tasas[:, 1:])
+    np.exp(log_tasas, out=log_tasas)
+    log_tasas *= np.asarray(tasas_iniciales, dtype=np.float64)
+    return log_tasas
+
+# ============================================================
+# SIMULACION
+# ============================================================
+
+def flujo_preset_eur(preset: str = "moderado", inflacion: float = None) -> np.ndarray:
+    """Salida de caja mensual en EUR (meses,) de un preset"""
+    config = PRESETS[preset]
+    flujo = flujo_escenarios_lote(
+        niveles=config["nivel"],
+        descuento_matricula=config["descuento_matricula"],
+        opcionales=mascara_opcionales(config["incluir_opcionales"]),
+        viajes_por_ano=config["viajes_por_ano"],
+        inflacion=inflacion
+    )
+    return totales_mensuales(flujo)[0]
+
+
+def simular_cambio(n_trayectorias: int, flujo_eur, metodo: str = "gbm", semilla: int = None,
+                   tasas_iniciales: dict = None, deriva: bool = True, historico: dict = None,
+                   tam_bloque: int = TAM_BLOQUE) -> dict:
+    """
+    Aplica n_trayectorias de tasas al flujo mensual en EUR, por bloques de
+    tam_bloque con un generador por bloque derivado de la semilla.
+    Devuelve el costo por ano en cada moneda (n x anos x pares) y las tasas
+    del primer bloque para las bandas mensuales.
+    """
+    flujo_eur = np.asarray(flujo_eur, dtype=np.float64)
+    meses = len(flujo_eur)
+    anos = meses // MESES_POR_ANO
+    tasas = tasas_iniciales or SUPUESTOS["tasas_cambio"]
+    iniciales = np.array([tasas[par] for par in PARES])
+    modelo = estimar_modelo(historico or cargar_historico())
+
+    n_bloques = -(-n_trayectorias // tam_bloque)
+    semillas = np.random.SeedSequence(semilla).spawn(n_bloques)
+    costo_por_ano = np.empty((n_trayectorias, anos, len(PARES)))
+    muestra_tasas = None
+    for b, semilla_bloque in enumerate(semillas):
+        inicio, fin = b * tam_bloque, min((b + 1) * tam_bloque, n_trayectorias)
+        rng = np.random.default_rng(semilla_bloque)
+        tasas_bloque = trayectorias_tasas(rng, fin - inicio, meses, modelo, iniciales, metodo, deriva)
+        costo_mes = tasas_bloque * flujo_eur[:, None]
+        costo_por_ano[inicio:fin] = costo_mes.reshape(fin - inicio, anos, MESES_POR_ANO, -1).sum(axis=2)
+        if muestra_tasas is None:
+            muestra_tasas = tasas_bloque
+
+    return {
+        "configuracion": {
+            "trayectorias": n_trayectorias,
+            "metodo": metodo,
+            "semilla": semilla,
+            "tam_bloque": tam_bloque,
+            "deriva": deriva,
+            "tasas_iniciales": {par: float(v) for par, v in zip(PARES, iniciales)}
+        },
+        "modelo": modelo,
+        "flujo_eur": flujo_eur,
+        "costo_por_ano": costo_por_ano,
+        "muestra_tasas": muestra_tasas
+    }
+
+# ============================================================
+# RESUMEN
+# ============================================================
+
+def _bandas(valores, referencia: float = None) -> dict:
+    bandas = {f"p{q}": round(float(v), 2) for q, v in zip(PERCENTILES, np.percentile(valores, PERCENTILES))}
+    bandas["media"] = round(float(np.mean(valores)), 2)
+    if referencia is not None:
+        bandas["tasa_fija"] = round(float(referencia), 2)
+        bandas["prob_supera_tasa_fija"] = round(float(np.mean(valores > referencia)), 4)
+    return bandas
+
+
+def resumir_cambio(resultado: dict, historico: dict = None) -> dict:
+    """Bandas del total y por ano en USD/COP, bandas mensuales de cada tasa y el modelo estimado"""
+    conf = resultado["configuracion"]
+    modelo = resultado["modelo"]
+    flujo_eur = resultado["flujo_eur"]
+    costo_por_ano = resultado["costo_por_ano"]
+    anos = costo_por_ano.shape[1]
+    # Totales en EUR y referencias a tasa fija en centimos, como el nucleo del modelo
+    centimos_por_ano = a_centimos(flujo_eur).reshape(anos, MESES_POR_ANO).sum(axis=1)
+    centimos_total = int(centimos_por_ano.sum())
+    historico = historico or cargar_historico()
+
+    resumen = {
+        "metadata": {
+            "fecha_generacion": datetime.now().isoformat(),
+            "descripcion": "Bandas de percentiles del costo en USD/COP con tasas de cambio simuladas",
+            "percentiles": list(PERCENTILES),
+            "historico": {"desde": historico["fechas"][0], "hasta": historico["fechas"][-1],
+                          "meses": len(historico["fechas"])}
+        },
+        "configuracion": conf,
+        "modelo": {
+            par: {"deriva_anual": round(float(modelo["deriva"][j] * MESES_POR_ANO), 4),
+                  "volatilidad_anual": round(float(modelo["volatilidad"][j] * np.sqrt(MESES_POR_ANO)), 4)}
+            for j, par in enumerate(PARES)
+        },
+        "correlacion": round(float(modelo["correlacion"][0, 1]), 4),
+        "total_4_anos_eur": a_euros(centimos_total)
+    }
+    for j, par in enumerate(PARES):
+        fija = conf["tasas_iniciales"][par]
+        resumen[f"total_4_anos_{MONEDA_PAR[par]}"] = _bandas(costo_por_ano[:, :, j].sum(axis=1),
+                                                             a_euros(convertir(centimos_total, fija)))
+
+    resumen["por_ano"] = []
+    for i in range(anos):
+        centimos_ano = int(centimos_por_ano[i])
+        fila = {"ano": PERFIL["ano_inicio"] + i, "numero_ano": i + 1, "eur": a_euros(centimos_ano)}
+        for j, par in enumerate(PARES):
+            fila[MONEDA_PAR[par]] = _bandas(costo_por_ano[:, i, j],
+                                            a_euros(convertir(centimos_ano, conf["tasas_iniciales"][par])))
+        resumen["por_ano"].append(fila)
+
+    # Bandas de la tasa mes a mes (primer bloque: suficiente para graficar)
+    muestra = resultado["muestra_tasas"]
+    percentiles_mes = np.percentile(muestra, PERCENTILES, axis=0)
+    resumen["tasas_mensuales"] = {
+        "trayectorias": len(muestra),
+        **{par: {f"p{q}": np.round(percentiles_mes[k, :, j], 4).tolist() for k, q in enumerate(PERCENTILES)}
+           for j, par in enumerate(PARES)}
+    }
+    return resumen
+
+
+def generar_cambio(n_trayectorias: int, preset: str = "moderado", metodo: str = "gbm",
+                   semilla: int = None, deriva: bool = True) -> dict:
+    """Simula las tasas sobre el flujo mensual de un preset y devuelve el resumen"""
+    historico = cargar_historico()
+    resultado = simular_cambio(n_trayectorias, flujo_preset_eur(preset), metodo=metodo, semilla=semilla,
+                               deriva=deriva, historico=historico)
+    resumen = resumir_cambio(resultado, historico)
+    resumen["configuracion"]["preset"] = preset
+    return resumen
+
+
+def guardar_cambio(resumen: dict, ruta=None):
+    ruta = ruta or OUTPUT_DIR / "cambio_paulina.json"
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(resumen, f, indent=2, ensure_ascii=False)
+    return ruta
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Instrumentacion liviana - tramos (spans) de tiempo para el pipeline y el dashboard.
+
+  with tramo("excel:guardar", "excel"):
+      wb.save(ruta)
+
+  @medido("supabase:load_user_data", "supabase")
+  def load_user_data(email): ...
+
+Se activa con la variable de entorno PRESUPUESTO_TRAZAS:
+  1 / true       registra en memoria (tramos(), resumen(), exportar())
+  <ruta>         ademas exporta al salir del proceso
+Formato de exportacion con PRESUPUESTO_TRAZAS_FORMATO:
+  chrome (defecto)  Trace Event Format: abrir en chrome://tracing o ui.perfetto.dev
+  json              lista plana de tramos + resumen por nombre
+
+Desactivada, tramo() devuelve un objeto nulo compartido y medido() solo
+agrega una comprobacion de un booleano por llamada. Los tramos se guardan
+en un buffer acotado (MAX_TRAMOS) para no crecer sin limite en un
+servidor de Streamlit de larga vida.
+
+Ademas, sin la variable de entorno, un hilo puede recolectar sus propios
+tramos (iniciar_recoleccion / terminar_recoleccion): es lo que usa el panel
+de rendimiento del dashboard, ya que cada rerun de una sesion corre
+completo en un hilo. etapa() parte un script lineal en tramos consecutivos.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+ENV_TRAZAS = "PRESUPUESTO_TRAZAS"
+ENV_FORMATO = "PRESUPUESTO_TRAZAS_FORMATO"
+FORMATOS = ("chrome", "json")
+MAX_TRAMOS = 100_000
+
+_reloj = time.perf_counter_ns
+_estado = {"activo": False, "origen": _reloj()}
+_tramos = deque(maxlen=MAX_TRAMOS)
+_local = threading.local()  # recolector y etapa abierta de cada hilo
+_contadores = {}
+
+# ============================================================
+# TRAMOS
+# ============================================================
+
+class _Tramo:
+    __slots__ = ("nombre", "categoria", "args", "inicio")
+
+    def __init__(self, nombre, categoria, args):
+        self.nombre = nombre
+        self.categoria = categoria
+        self.args = args
+
+    def __enter__(self):
+        self.inicio = _reloj()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        fin = _reloj()
+        registro = {
+            "nombre": self.nombre,
+            "categoria": self.categoria,
+            "inicio_ns": self.inicio - _estado["origen"],
+            "duracion_ns": fin - self.inicio,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": dict(self.args, error=tipo.__name__) if tipo else self.args
+        }
+        if _estado["activo"]:
+            _tramos.append(registro)
+        recolector = getattr(_local, "recolector", None)
+        if recolector is not None:
+            recolector.append(registro)
+        return False
+
+
+class _TramoNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        return False
+
+
+_NULO = _TramoNulo()
+
+
+def _registrando() -> bool:
+    return _estado["activo"] or getattr(_local, "recolector", None) is not None
+
+
+def tramo(nombre: str, categoria: str = "general", **args):
+    """Context manager que mide el bloque; args van al evento exportado"""
+    if not _registrando():
+        return _NULO
+    return _Tramo(nombre, categoria, args)
+
+
+def medido(nombre: str = None, categoria: str = "general", contar_llamadas: bool = False):
+    """
+    Decorador: un tramo por llamada (nombre por defecto: modulo.funcion).
+    contar_llamadas suma siempre al contador "<nombre>:llamadas", aunque no
+    se registren tramos (p. ej. para la tasa de aciertos de una cache).
+    """
+    def decorar(funcion):
+        etiqueta = nombre or f"{funcion.__module__}.{funcion.__qualname__}"
+        contador = f"{etiqueta}:llamadas"
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if contar_llamadas:
+                contar(contador)
+            if not _registrando():
+                return funcion(*args, **kwargs)
+            with _Tramo(etiqueta, categoria, {}):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorar
+
+
+def etapa(nombre: str = None, categoria: str = "etapa"):
+    """Cierra la etapa abierta en este hilo y, si nombre no es None, abre otra"""
+    abierta = getattr(_local, "etapa", None)
+    if abierta is not None:
+        _local.etapa = None
+        abierta.__exit__(None, None, None)
+    if nombre is not None and _registrando():
+        _local.etapa = _Tramo(nombre, categoria, {}).__enter__()
+
+# ============================================================
+# RECOLECCION POR HILO Y CONTADORES
+# ============================================================
+
+def iniciar_recoleccion():
+    """Registra los tramos de este hilo (aunque la traza global este apagada)"""
+    _local.etapa = None  # Descarta una etapa de un run interrumpido
+    _local.recolector = []
+    _local.inicio_recoleccion = _reloj()
+
+
+def recolectando() -> bool:
+    return getattr(_local, "recolector", None) is not None
+
+
+def terminar_recoleccion() -> dict:
+    """Cierra la etapa abierta y devuelve {"duracion_ms", "tramos"} de este hilo"""
+    etapa(None)
+    lista = getattr(_local, "recolector", None) or []
+    inicio = getattr(_local, "inicio_recoleccion", _reloj())
+    _local.recolector = None
+    return {"duracion_ms": (_reloj() - inicio) / 1e6, "tramos": lista}
+
+
+def contar(nombre: str, cantidad: int = 1):
+    """Contador de proceso (siempre activo, sin registro de tiempos)"""
+    _contadores[nombre] = _contadores.get(nombre, 0) + cantidad
+
+
+def contadores() -> dict:
+    return dict(_contadores)
+
+# ============================================================
+# CONTROL
+# ============================================================
+
+def activo() -> bool:
+    return _estado["activo"]
+
+
+def activar():
+    _estado["activo"] = True
+
+
+def desactivar():
+    _estado["activo"] = False
+
+
+def tramos() -> list:
+    """Copia de los tramos registrados (mas antiguo primero)"""
+    return list(_tramos)
+
+
+def limpiar():
+    _tramos.clear()
+
+# ============================================================
+# EXPORTACION
+# ============================================================
+
+def resumen(lista: list = None) -> dict:
+    """Por nombre: llamadas, total, media y maximo en ms (ordenado por total)"""
+    agregados = {}
+    for t in tramos() if lista is None else lista:
+        a = agregados.setdefault(t["nombre"], {"categoria": t["categoria"], "llamadas": 0,
+                                               "total_ms": 0.0, "max_ms": 0.0})
+        ms = t["duracion_ns"] / 1e6
+        a["llamadas"] += 1
+        a["total_ms"] += ms
+        a["max_ms"] = max(a["max_ms"], ms)
+    for a in agregados.values():
+        a["media_ms"] = a["total_ms"] / a["llamadas"]
+    return dict(sorted(agregados.items(), key=lambda kv: -kv[1]["total_ms"]))
+
+
+def eventos_chrome(lista: list = None) -> dict:
+    """Trace Event Format con eventos completos ("X"), tiempos en microsegundos"""
+    return {
+        "traceEvents": [
+            {"name": t["nombre"], "cat": t["categoria"], "ph": "X", "ts": t["inicio_ns"] / 1e3,
+             "dur": t["duracion_ns"] / 1e3, "pid": t["pid"], "tid": t["tid"], "args": t["args"]}
+            for t in (tramos() if lista is None else lista)
+        ],
+        "displayTimeUnit": "ms"
+    }
+
+
+def exportar(ruta, formato: str = "chrome"):
+    """Escribe los tramos registrados en ruta (chrome o json)"""
+    lista = tramos()
+    if formato == "chrome":
+        contenido = eventos_chrome(lista)
+    elif formato == "json":
+        contenido = {"tramos": lista, "resumen": resumen(lista)}
+    else:
+        raise ValueError(f"Formato desconocido: {formato} (opciones: {', '.join(FORMATOS)})")
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(contenido, f, ensure_ascii=False)
+    return ruta
+
+
+def _configurar_desde_entorno():
+    valor = os.getenv(ENV_TRAZAS, "").strip()
+    if valor.lower() in ("", "0", "false", "no"):
+        return
+    activar()
+    if valor.lower() not in ("1", "true", "si", "yes"):
+        atexit.register(exportar, valor, os.getenv(ENV_FORMATO, "chrome"))
+
+
+_configurar_desde_entorno()
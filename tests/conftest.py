@@ -0,0 +1,14 @@
+"""
+Configuracion de pytest: los scripts y el dashboard importan sus modulos por
+nombre (como al correrlos desde su carpeta), asi que ambos van a sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+
+for carpeta in ("scripts", "dashboard"):
+    ruta = str(BASE_DIR / carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
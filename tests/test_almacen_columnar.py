@@ -0,0 +1,52 @@
+"""
+Almacen columnar: ida y vuelta por disco con columnas mapeadas en memoria, y
+reescritura segura mientras un lector tiene el almacen anterior mapeado.
+"""
+
+import numpy as np
+import pytest
+
+from almacen_columnar import abrir_almacen, guardar_almacen, preset_desde_almacen
+from generar_datos import NIVELES, PRESETS, calcular_escenario, calcular_escenarios_lote, mascara_opcionales
+
+INFLACIONES = (0.0, 0.03)
+
+
+@pytest.fixture
+def directorio(tmp_path):
+    return guardar_almacen(tmp_path / "escenarios_columnar", inflaciones=INFLACIONES)
+
+
+def test_ida_y_vuelta_mapeado(directorio):
+    almacen = abrir_almacen(directorio)
+    assert isinstance(almacen["grilla"]["total_4_anos_eur"], np.memmap)
+    for clave, preset in PRESETS.items():
+        leido = preset_desde_almacen(almacen, clave)
+        esperado = calcular_escenario(**preset)
+        assert leido["nivel"] == esperado["nivel"]
+        assert leido["configuracion"]["descuento_matricula"] == preset["descuento_matricula"]
+        assert leido["configuracion"]["viajes_por_ano"] == preset["viajes_por_ano"]
+        assert mascara_opcionales(leido["configuracion"]["incluir_opcionales"]) == \
+            mascara_opcionales(preset["incluir_opcionales"])
+        assert leido["totales"]["total_4_anos_eur"] == esperado["totales"]["total_4_anos_eur"]
+
+
+def test_grilla_coincide_con_el_lote(directorio):
+    grilla = abrir_almacen(directorio)["grilla"]
+    lote = calcular_escenarios_lote(grilla["nivel"], grilla["descuento_matricula"], grilla["opcionales"],
+                                    grilla["viajes_por_ano"], grilla["inflacion"])
+    np.testing.assert_array_equal(grilla["total_4_anos_eur"], lote["total_4_anos_eur"])
+    np.testing.assert_array_equal(grilla["proyeccion_total_anual"], lote["proyeccion_anual"]["total_anual"])
+    assert set(np.unique(grilla["nivel"])) == set(range(len(NIVELES)))
+
+
+def test_reescribir_no_toca_los_archivos_mapeados(directorio):
+    anterior = abrir_almacen(directorio)
+    totales = np.array(anterior["grilla"]["total_4_anos_eur"])
+    guardar_almacen(directorio, inflaciones=(0.05,))
+
+    # El mapa viejo sigue leyendo el almacen viejo (en el lugar, np.save lo truncaria: SIGBUS)
+    np.testing.assert_array_equal(anterior["grilla"]["total_4_anos_eur"], totales)
+    nuevo = abrir_almacen(directorio)
+    assert set(np.unique(nuevo["grilla"]["inflacion"])) == {0.05}
+    assert sorted(p.name for p in directorio.parent.iterdir()) == [directorio.name]
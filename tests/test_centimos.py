@@ -0,0 +1,79 @@
+"""
+Politica de redondeo de centimos.py: half-up al centimo en cada paso y las
+mismas cifras por el camino escalar (enteros de Python) y el vectorizado (int64).
+"""
+
+import numpy as np
+import pytest
+
+from centimos import (a_centimos, a_euros, a_puntos, aplicar_tasa, convertir, dividir, escalar,
+                      inflactar)
+
+
+@pytest.mark.parametrize("euros, centimos", [
+    (0.285, 29),        # 0.285 * 100 = 28.4999... en binario
+    (1.005, 101),
+    (2.675, 268),
+    (0.004, 0),
+    (0.005, 1),
+    (1234.5649, 123456),
+    (-0.005, 0),        # half-up: hacia +infinito
+    (-0.015, -1)
+])
+def test_a_centimos_half_up(euros, centimos):
+    assert a_centimos(euros) == centimos
+    assert a_centimos(np.array([euros]))[0] == centimos
+
+
+def test_a_puntos():
+    assert a_puntos(0.03) == 300
+    assert a_puntos(0.00005) == 1
+    assert a_puntos(4166.67) == 41666700
+
+
+def test_a_euros_ida_y_vuelta():
+    centimos = np.arange(-1000, 100000, 7)
+    np.testing.assert_array_equal(a_centimos(a_euros(centimos)), centimos)
+    assert a_euros(12345) == 123.45
+    assert a_euros(np.int64(5)) == 0.05
+
+
+@pytest.mark.parametrize("centimos, numerador, denominador, esperado", [
+    (1, 5000, 10000, 1),     # 0.5 -> 1
+    (3, 5000, 10000, 2),     # 1.5 -> 2
+    (1, 4999, 10000, 0),
+    (10, 1, 4, 3),           # 2.5 -> 3
+    (-1, 5000, 10000, 0),    # -0.5 -> 0
+])
+def test_escalar_half_up(centimos, numerador, denominador, esperado):
+    assert escalar(centimos, numerador, denominador) == esperado
+    assert escalar(np.array([centimos]), numerador, denominador)[0] == esperado
+
+
+def test_tasas_y_conversion():
+    assert aplicar_tasa(2_000_000, 0.1) == 200_000
+    assert aplicar_tasa(12345, 0.075) == 926             # 925.875
+    assert convertir(100, 4500.0) == 450_000
+    assert convertir(18_395_324, 1.08) == 19_866_950     # 198669.4992 USD -> 198669.50
+    assert dividir(100, 3) == 33
+    assert dividir(200, 3) == 67
+    assert dividir(18_395_324, 48) == 383_236            # 383236.0833
+
+
+def test_inflactar_paso_a_paso():
+    # Cada ano es el anterior x 1.03 redondeado, no el ano 1 x 1.03^t
+    assert inflactar(1_000_001, 0.03, 4) == (1_000_001, 1_030_001, 1_060_901, 1_092_728)
+    assert inflactar(500, 0.0, 3) == (500, 500, 500)
+
+
+def test_caminos_escalar_y_vectorizado_coinciden():
+    rng = np.random.default_rng(16)
+    montos = rng.integers(-10**9, 10**9, 2000)
+    tasas = np.round(rng.uniform(0, 0.2, 2000), 6)
+    np.testing.assert_array_equal(aplicar_tasa(montos, tasas),
+                                  [aplicar_tasa(int(m), float(t)) for m, t in zip(montos, tasas)])
+    np.testing.assert_array_equal(inflactar(montos, tasas, 4),
+                                  [inflactar(int(m), float(t), 4) for m, t in zip(montos, tasas)])
+    np.testing.assert_array_equal(convertir(montos, 4166.67),
+                                  [convertir(int(m), 4166.67) for m in montos])
+    np.testing.assert_array_equal(dividir(montos, 48), [dividir(int(m), 48) for m in montos])
@@ -0,0 +1,76 @@
+"""
+calcular_escenario contra las cifras publicadas y los caminos vectorizados
+(calcular_escenarios_lote, evaluar_parametros) contra calcular_escenario.
+"""
+
+import numpy as np
+import pytest
+
+from centimos import a_centimos
+from generar_datos import (COSTOS_BASE, PRESETS, NIVELES, OPCIONALES, calcular_escenario, calcular_escenarios_lote,
+                           calcular_gastos_mensuales, evaluar_parametros, grilla_parametros, indice_mensual,
+                           parametros_lote)
+
+# Totales de los presets con la politica de redondeo de centimos.py
+TOTALES_PRESETS = {
+    "austero": {"total_4_anos_eur": 134665.91, "total_4_anos_usd": 145439.18,
+                "total_4_anos_cop": 605996595.0, "promedio_anual": 33666.48, "promedio_mensual": 2805.54},
+    "moderado": {"total_4_anos_eur": 183953.24, "total_4_anos_usd": 198669.5,
+                 "total_4_anos_cop": 827789580.0, "promedio_anual": 45988.31, "promedio_mensual": 3832.36},
+    "comodo": {"total_4_anos_eur": 231406.46, "total_4_anos_usd": 249918.98,
+               "total_4_anos_cop": 1041329070.0, "promedio_anual": 57851.62, "promedio_mensual": 4820.97}
+}
+
+TOTALES = ("total_4_anos_eur", "total_4_anos_usd", "total_4_anos_cop", "promedio_anual", "promedio_mensual")
+
+
+def _escenario(nivel: int, descuento: bool, mascara: int, viajes: int) -> dict:
+    opcionales = {c: bool(mascara & (1 << j)) for j, c in enumerate(OPCIONALES)}
+    return calcular_escenario(nombre="prueba", nivel=NIVELES[nivel], descuento_matricula=descuento,
+                              incluir_opcionales=opcionales, viajes_por_ano=viajes)
+
+
+@pytest.mark.parametrize("preset", list(PRESETS))
+def test_totales_presets(preset):
+    assert calcular_escenario(**PRESETS[preset])["totales"] == TOTALES_PRESETS[preset]
+
+
+@pytest.mark.parametrize("preset", list(PRESETS))
+def test_proyeccion_suma_el_total(preset):
+    escenario = calcular_escenario(**PRESETS[preset])
+    anual = sum(a_centimos(fila["total_anual"]) for fila in escenario["proyeccion_anual"])
+    assert anual == a_centimos(escenario["totales"]["total_4_anos_eur"])
+
+
+def test_lote_coincide_con_calcular_escenario():
+    grilla = grilla_parametros()
+    lote = calcular_escenarios_lote(**grilla)
+    for i in range(len(grilla["niveles"])):
+        esperado = _escenario(int(grilla["niveles"][i]), bool(grilla["descuento_matricula"][i]),
+                              int(grilla["opcionales"][i]), int(grilla["viajes_por_ano"][i]))
+        for clave in TOTALES:
+            assert lote[clave][i] == esperado["totales"][clave], (i, clave)
+        anual = [fila["total_anual"] for fila in esperado["proyeccion_anual"]]
+        np.testing.assert_array_equal(lote["proyeccion_anual"]["total_anual"][i], anual)
+
+
+def test_desglose_coincide_con_indice_mensual():
+    grilla = grilla_parametros(inflaciones=(0.0, 0.03, 0.061))
+    lote = calcular_escenarios_lote(**grilla)
+    parametros = parametros_lote(grilla["niveles"], grilla["descuento_matricula"], grilla["opcionales"],
+                                 grilla["viajes_por_ano"], grilla["inflacion"])
+    mensuales = parametros.pop("mensuales").sum(axis=-1)
+    parametros.pop("categorias")
+    desglose = evaluar_parametros(total_mensual_base=mensuales, **parametros)
+    for clave in TOTALES:
+        np.testing.assert_array_equal(desglose[clave], lote[clave])
+
+
+def test_indice_mensual_sigue_a_los_costos():
+    # Una copia con los mismos costos (el JSON del dashboard) reusa el indice de COSTOS_BASE
+    copia = {categoria: dict(datos) for categoria, datos in COSTOS_BASE.items()}
+    assert indice_mensual(copia) is indice_mensual()
+    copia["vivienda"]["medio"] += 100
+    assert indice_mensual(copia) is not indice_mensual()
+    base = calcular_gastos_mensuales("medio", {})["_total_sin_emergencias"]
+    assert calcular_gastos_mensuales("medio", {}, copia)["_total_sin_emergencias"] == base + 100
@@ -0,0 +1,48 @@
+"""
+Los cuantiles de un TDigest combinado por bloques quedan dentro del error del
+t-digest respecto de np.percentile sobre todos los datos.
+"""
+
+import numpy as np
+import pytest
+
+from estadisticas_streaming import TDigest
+
+COMPRESION = 200
+CUANTILES = np.array([0.001, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999])
+
+
+def _error_rango(q):
+    # Con la escala k1 cada centroide cubre a lo sumo una unidad de k: 2*pi*sqrt(q(1-q))/delta en rango
+    return 2 * np.pi * np.sqrt(q * (1 - q)) / COMPRESION
+
+
+@pytest.fixture(scope="module")
+def datos():
+    return np.random.default_rng(11).lognormal(mean=10, sigma=0.6, size=200_000)
+
+
+@pytest.mark.parametrize("tam_bloque", [1_000, 7_919, 50_000])
+def test_cuantiles_combinados_dentro_del_error(datos, tam_bloque):
+    combinado = TDigest(COMPRESION)
+    for inicio in range(0, len(datos), tam_bloque):
+        combinado.combinar(TDigest(COMPRESION).agregar(datos[inicio:inicio + tam_bloque]))
+    assert combinado.n == len(datos)
+
+    estimados = combinado.cuantil(CUANTILES)
+    margen = _error_rango(CUANTILES) + 1 / len(datos)
+    inferior = np.percentile(datos, 100 * np.clip(CUANTILES - margen, 0, 1))
+    superior = np.percentile(datos, 100 * np.clip(CUANTILES + margen, 0, 1))
+    assert np.all((inferior <= estimados) & (estimados <= superior)), (CUANTILES, estimados)
+
+
+def test_combinar_depende_de_la_particion(datos):
+    # Misma particion, mismo digest; otra particion da cuantiles cercanos pero no identicos
+    def por_bloques(tam_bloque):
+        digest = TDigest(COMPRESION)
+        for inicio in range(0, len(datos), tam_bloque):
+            digest.combinar(TDigest(COMPRESION).agregar(datos[inicio:inicio + tam_bloque]))
+        return digest.cuantil(CUANTILES)
+
+    np.testing.assert_array_equal(por_bloques(10_000), por_bloques(10_000))
+    np.testing.assert_allclose(por_bloques(10_000), por_bloques(25_000), rtol=0.01)
@@ -0,0 +1,42 @@
+"""
+El flujo mensual reparte al centimo la proyeccion anual: los 12 meses de cada
+ano suman exactamente lo que proyectan calcular_escenario y calcular_escenarios_lote.
+"""
+
+import numpy as np
+
+from centimos import a_centimos
+from flujo_mensual import MESES_POR_ANO, flujo_escenarios_lote, flujo_presets, totales_por_ano
+from generar_datos import PRESETS, calcular_escenario, calcular_escenarios_lote, grilla_parametros
+
+
+def test_presets_suman_la_proyeccion_anual():
+    flujo = flujo_presets()
+    anual = a_centimos(totales_por_ano(flujo)).sum(axis=2)
+    for i, clave in enumerate(flujo["escenarios"]):
+        escenario = calcular_escenario(**PRESETS[clave])
+        esperado = [a_centimos(fila["total_anual"]) for fila in escenario["proyeccion_anual"]]
+        np.testing.assert_array_equal(anual[i], esperado)
+        assert anual[i].sum() == a_centimos(escenario["totales"]["total_4_anos_eur"])
+
+
+def test_lote_suma_la_proyeccion_por_componente():
+    grilla = grilla_parametros(inflaciones=(0.0, 0.03, 0.061))
+    flujo = flujo_escenarios_lote(**grilla)
+    lote = calcular_escenarios_lote(**grilla)
+    por_ano = a_centimos(totales_por_ano(flujo))
+    categorias = flujo["categorias"]
+
+    np.testing.assert_array_equal(por_ano[:, :, categorias.index("matricula")],
+                                  a_centimos(lote["proyeccion_anual"]["matricula"]))
+    np.testing.assert_array_equal(por_ano[:, :, categorias.index("emergencias")],
+                                  a_centimos(lote["proyeccion_anual"]["emergencias"]))
+    np.testing.assert_array_equal(por_ano.sum(axis=2), a_centimos(lote["proyeccion_anual"]["total_anual"]))
+    np.testing.assert_array_equal(por_ano.sum(axis=(1, 2)), a_centimos(lote["total_4_anos_eur"]))
+
+
+def test_montos_al_centimo_y_no_negativos():
+    flujo = flujo_presets()["flujo"]
+    np.testing.assert_array_equal(a_centimos(flujo) / 100, flujo)
+    assert (flujo >= 0).all()
+    assert flujo.shape[1] % MESES_POR_ANO == 0
@@ -0,0 +1,106 @@
+"""
+Grilla de sliders: cada consulta por indice devuelve lo mismo que
+evaluar_centimos, un estado fuera de la grilla devuelve None, y reescribirla
+no afecta a un lector que ya la tiene mapeada.
+"""
+
+import numpy as np
+import pytest
+
+from centimos import ESCALA_TASA, a_euros
+from generar_datos import evaluar_centimos
+from grilla_sliders import abrir_grilla, consultar, guardar_grilla
+from motor_proyeccion import info_caches, limpiar_caches, proyectar, usar_grilla
+
+MUESTRAS = 300
+
+
+@pytest.fixture(scope="module")
+def grilla(tmp_path_factory):
+    return abrir_grilla(guardar_grilla(tmp_path_factory.mktemp("salida") / "grilla_sliders"))
+
+
+def _estado(esquema, m, v, d, p, i) -> tuple:
+    """Estado canonico (sin ano_inicio) del punto (m, v, d, p, i) de la grilla"""
+    ejes = esquema["ejes"]
+    return (esquema["matricula_base"], ejes["descuento"][d],
+            ejes["mensual"]["inicio"] + m * ejes["mensual"]["paso"], esquema["costo_vuelo"],
+            ejes["viajes"]["inicio"] + v * ejes["viajes"]["paso"],
+            ejes["emergencias"]["inicio"] + p * ejes["emergencias"]["paso"],
+            ejes["inflacion"]["inicio"] + i * ejes["inflacion"]["paso"], esquema["duracion_anos"])
+
+
+def _en_vivo(estado) -> tuple:
+    matricula_base, descuento, mensual, costo_vuelo, viajes, pct, inflacion, anos = estado
+    proy = evaluar_centimos(a_euros(mensual), a_euros(costo_vuelo), viajes, descuento / ESCALA_TASA,
+                            pct / ESCALA_TASA, inflacion / ESCALA_TASA, duracion_anos=anos,
+                            matricula_base=a_euros(matricula_base))["proyeccion_anual"]
+    return tuple(proy["matricula"]), tuple(proy["gastos_vida"]), tuple(proy["emergencias"])
+
+
+def _muestras(grilla):
+    ejes = grilla["esquema"]["ejes"]
+    rng = np.random.default_rng(23)
+    tamanos = (ejes["mensual"]["n"], ejes["viajes"]["n"], len(ejes["descuento"]),
+               ejes["emergencias"]["n"], ejes["inflacion"]["n"])
+    indices = np.column_stack([rng.integers(0, n, MUESTRAS) for n in tamanos])
+    extremos = np.array([[0] * 5, [n - 1 for n in tamanos]])
+    return np.concatenate([extremos, indices]).tolist()
+
+
+def test_consulta_igual_a_evaluar_centimos(grilla):
+    for indices in _muestras(grilla):
+        estado = _estado(grilla["esquema"], *indices)
+        assert consultar(grilla, *estado) == _en_vivo(estado), indices
+
+
+def test_fuera_de_la_grilla(grilla):
+    base = _estado(grilla["esquema"], 10, 2, 1, 10, 6)
+    ejes = grilla["esquema"]["ejes"]
+    fuera = {
+        "mensual con centimos": {2: base[2] + 50},
+        "mensual bajo el minimo": {2: ejes["mensual"]["inicio"] - 100},
+        "mensual sobre el maximo": {2: ejes["mensual"]["inicio"] + ejes["mensual"]["n"] * 100},
+        "descuento sin nivel": {1: 500},
+        "emergencias fuera de rango": {5: 1600},
+        "inflacion entre pasos": {6: 325},
+        "matricula distinta": {0: base[0] + 100},
+        "vuelo distinto": {3: base[3] + 1},
+        "otra duracion": {7: base[7] + 1}
+    }
+    assert consultar(grilla, *base) is not None
+    for caso, cambios in fuera.items():
+        estado = list(base)
+        for posicion, valor in cambios.items():
+            estado[posicion] = valor
+        assert consultar(grilla, *estado) is None, caso
+
+
+def test_motor_responde_desde_la_grilla(grilla):
+    limpiar_caches()
+    usar_grilla(grilla)
+    try:
+        esquema = grilla["esquema"]
+        mensual = a_euros(esquema["ejes"]["mensual"]["inicio"]) + 250
+        descuento = esquema["ejes"]["descuento"][1] / ESCALA_TASA
+        entradas = (a_euros(esquema["matricula_base"]), descuento, mensual, a_euros(esquema["costo_vuelo"]),
+                    2, 0.1, 0.03, esquema["duracion_anos"], 2025)
+        con_grilla = proyectar(*entradas)
+        assert info_caches()["grilla"]["consultas"] == 1
+        usar_grilla(None)
+        limpiar_caches()
+        assert proyectar(*entradas) == con_grilla
+        assert info_caches()["grilla"]["en_vivo"] == 1
+    finally:
+        usar_grilla(None)
+        limpiar_caches()
+
+
+def test_reescribir_no_toca_la_grilla_mapeada(tmp_path):
+    directorio = guardar_grilla(tmp_path / "grilla_sliders")
+    anterior = abrir_grilla(directorio)
+    copia = np.array(anterior["emergencias"][:50])
+    guardar_grilla(directorio)
+    np.testing.assert_array_equal(anterior["emergencias"][:50], copia)
+    assert abrir_grilla(directorio)["esquema"]["fecha_generacion"] != anterior["esquema"]["fecha_generacion"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["grilla_sliders"]
@@ -0,0 +1,36 @@
+"""
+La simulacion Monte Carlo depende solo de (semilla, tam_bloque): el numero de
+trabajadores no cambia ni las trayectorias ni los sketches combinados.
+"""
+
+import numpy as np
+import pytest
+
+from montecarlo import resumen_a_dict, resumir, simular
+
+N_TRAYECTORIAS = 5000
+TAM_BLOQUE = 1000
+
+
+@pytest.fixture(scope="module")
+def secuencial():
+    return simular(N_TRAYECTORIAS, semilla=11, tam_bloque=TAM_BLOQUE, trabajadores=1,
+                   conservar_trayectorias=True)
+
+
+@pytest.mark.parametrize("trabajadores", [2, 3])
+def test_independiente_de_trabajadores(secuencial, trabajadores):
+    paralelo = simular(N_TRAYECTORIAS, semilla=11, tam_bloque=TAM_BLOQUE, trabajadores=trabajadores,
+                       conservar_trayectorias=True)
+    np.testing.assert_array_equal(paralelo["totales_por_ano"], secuencial["totales_por_ano"])
+    assert resumen_a_dict(paralelo["resumen"]) == resumen_a_dict(secuencial["resumen"])
+    bandas, bandas_secuencial = resumir(paralelo), resumir(secuencial)
+    del bandas["metadata"], bandas_secuencial["metadata"]  # fecha_generacion
+    assert bandas == bandas_secuencial
+
+
+def test_semilla_reproducible(secuencial):
+    otra = simular(N_TRAYECTORIAS, semilla=11, tam_bloque=TAM_BLOQUE, conservar_trayectorias=True)
+    np.testing.assert_array_equal(otra["total_4_anos"], secuencial["total_4_anos"])
+    distinta = simular(N_TRAYECTORIAS, semilla=12, tam_bloque=TAM_BLOQUE, conservar_trayectorias=True)
+    assert not np.array_equal(distinta["total_4_anos"], secuencial["total_4_anos"])
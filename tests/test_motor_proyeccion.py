@@ -0,0 +1,62 @@
+"""
+La cache del motor del dashboard se indexa por el estado canonico: entradas
+que evaluar_centimos redondea igual comparten clave y resultado.
+"""
+
+import pytest
+
+from centimos import a_euros
+from generar_datos import COSTOS_BASE, PERFIL, PRESETS, calcular_escenario, mascara_opcionales, parametros_lote
+from motor_proyeccion import estado_canonico, info_caches, limpiar_caches, proyectar, usar_grilla
+
+MATRICULA = COSTOS_BASE["matricula"]["anual_base"]
+GASTOS = [170.39, 383.24, 262.12, 424.72, 439.88, 50.54]  # Suman 1730.89 +/- 1 ulp segun el orden
+
+
+@pytest.fixture(autouse=True)
+def caches_limpias():
+    usar_grilla(None)
+    limpiar_caches()
+    yield
+    limpiar_caches()
+
+
+def _entradas(preset: str) -> tuple:
+    config = PRESETS[preset]
+    p = parametros_lote(config["nivel"], config["descuento_matricula"],
+                        mascara_opcionales(config["incluir_opcionales"]), config["viajes_por_ano"])
+    return (MATRICULA, float(p["descuento"]), float(p["mensuales"].sum()), float(p["costo_vuelo"]),
+            int(p["viajes_por_ano"]), float(p["pct_emergencias"]), float(p["inflacion"]),
+            PERFIL["duracion_anos"], PERFIL["ano_inicio"])
+
+
+def test_estados_equivalentes_misma_clave():
+    a = estado_canonico(MATRICULA, 0.1, sum(GASTOS), 900, 2, 0.1, 0.03, 4, 2025)
+    b = estado_canonico(MATRICULA, 0.30 / 3, sum(reversed(GASTOS)), 900.0, 2.0, 0.1, 0.01 + 0.02, 4.0, 2025)
+    assert sum(GASTOS) != sum(reversed(GASTOS))  # los floats difieren...
+    assert a == b                                # ...el estado no
+    assert hash(a) == hash(b)
+
+
+def test_estados_distintos_distinta_clave():
+    base = estado_canonico(MATRICULA, 0.1, 1234.56, 900, 2, 0.1, 0.03, 4, 2025)
+    assert estado_canonico(MATRICULA, 0.1, 1234.57, 900, 2, 0.1, 0.03, 4, 2025) != base
+    assert estado_canonico(MATRICULA, 0.1, 1234.56, 900, 2, 0.1, 0.0301, 4, 2025) != base
+
+
+def test_estado_equivalente_es_acierto():
+    primero = proyectar(MATRICULA, 0.1, sum(GASTOS), 900, 2, 0.1, 0.03, 4, 2025)
+    segundo = proyectar(MATRICULA, 0.1, sum(reversed(GASTOS)), 900.0, 2, 0.1, 0.01 + 0.02, 4, 2025)
+    assert segundo is primero
+    proyecciones = info_caches()["proyecciones"]
+    assert (proyecciones["hits"], proyecciones["misses"]) == (1, 1)
+
+
+@pytest.mark.parametrize("preset", list(PRESETS))
+def test_mismas_cifras_que_calcular_escenario(preset):
+    resultado = proyectar(*_entradas(preset))
+    escenario = calcular_escenario(**PRESETS[preset])
+    assert resultado["total_4_anos"] == escenario["totales"]["total_4_anos_eur"]
+    assert resultado["promedio_mensual"] == escenario["totales"]["promedio_mensual"]
+    assert [a_euros(total) for total in resultado["proyeccion_centimos"]["total"]] == \
+        [fila["total_anual"] for fila in escenario["proyeccion_anual"]]
@@ -0,0 +1,73 @@
+"""
+La busqueda de objetivo devuelve el mayor gasto mensual (al centimo) cuyo
+total de 4 anos, evaluado con el nucleo en centimos, no pasa del presupuesto.
+"""
+
+import numpy as np
+import pytest
+
+from centimos import a_centimos, a_euros
+from generar_datos import PRESETS, evaluar_centimos, parametros_lote, mascara_opcionales
+from objetivo_presupuesto import maximo_por_escenario, monto_mensual_maximo, presupuesto_en_eur, repartir, tabla_presets
+
+
+def _total(otros, disponible, **comunes):
+    mensual = a_euros(a_centimos(otros) + a_centimos(disponible))
+    return a_euros(evaluar_centimos(mensual, **comunes)["total_4_anos_eur"])
+
+
+def test_maximo_exacto_en_escenarios_aleatorios():
+    rng = np.random.default_rng(9)
+    n = 5000
+    otros = np.round(rng.uniform(500, 2000, n), 2)
+    presupuesto = np.round(rng.uniform(80_000, 300_000, n), 2)
+    comunes = dict(costo_vuelo=np.round(rng.uniform(500, 1500, n), 2), viajes_por_ano=rng.integers(0, 5, n),
+                   descuento=rng.choice([0.0, 0.1], n), pct_emergencias=rng.uniform(0.05, 0.15, n),
+                   inflacion=rng.uniform(0.0, 0.06, n))
+
+    disponible = monto_mensual_maximo(presupuesto, otros, **comunes)
+    np.testing.assert_array_equal(a_centimos(disponible) / 100, disponible)
+    assert (_total(otros, disponible, **comunes) <= presupuesto).all()
+    assert (_total(otros, disponible + 0.01, **comunes) > presupuesto).all()
+
+
+@pytest.mark.parametrize("moneda, presupuesto", [("EUR", 190_000), ("USD", 205_000), ("COP", 850_000_000)])
+def test_presets_dentro_del_presupuesto(moneda, presupuesto):
+    limite = presupuesto_en_eur(presupuesto, moneda)
+    categorias = ["vivienda", "supermercado"]
+    for clave, preset in PRESETS.items():
+        parametros = parametros_lote(preset["nivel"], preset["descuento_matricula"],
+                                     mascara_opcionales(preset["incluir_opcionales"]), preset["viajes_por_ano"])
+        indices = [parametros["categorias"].index(c) for c in categorias]
+        otros = parametros["mensuales"].sum() - parametros["mensuales"][indices].sum()
+        comunes = {k: parametros[k] for k in ("costo_vuelo", "viajes_por_ano", "pct_emergencias", "inflacion")}
+        comunes["descuento"] = parametros["descuento"]
+
+        resultado = maximo_por_escenario(presupuesto, categorias, moneda, niveles=preset["nivel"],
+                                         descuento_matricula=preset["descuento_matricula"],
+                                         opcionales=mascara_opcionales(preset["incluir_opcionales"]),
+                                         viajes_por_ano=preset["viajes_por_ano"])
+        disponible = float(resultado["disponible_mensual"])
+        assert _total(otros, disponible, **comunes) <= limite, clave
+        assert _total(otros, disponible + 0.01, **comunes) > limite, clave
+
+
+def test_tabla_presets_alcanza():
+    filas = tabla_presets(190_000, ["vivienda"])
+    assert len(filas) == len(PRESETS) * 2 * 3
+    for fila in filas:
+        assert fila["alcanza"] == (fila["disponible_mensual"] >= 0)
+        assert fila["por_categoria"]["vivienda"] == fila["disponible_mensual"]
+
+
+def test_repartir_suma_exacta_al_centimo():
+    rng = np.random.default_rng(5)
+    disponible = np.round(rng.uniform(-500, 3000, 2000), 2)
+    referencia = np.round(rng.uniform(0, 900, (2000, 4)), 2)
+    referencia[:10] = 0  # Sin referencia: partes iguales
+    partes = repartir(disponible, referencia)
+    np.testing.assert_array_equal(a_centimos(partes).sum(axis=-1), a_centimos(disponible))
+    # Cada parte queda a menos de un centimo de su cuota exacta
+    pesos = np.where(referencia.sum(axis=-1, keepdims=True) > 0, referencia, 1)
+    cuota = disponible[:, None] * pesos / pesos.sum(axis=-1, keepdims=True)
+    assert np.all(np.abs(partes - cuota) < 0.01 + 1e-9)